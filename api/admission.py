@@ -0,0 +1,137 @@
+import os
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+# Admission control for /extract. The container has a couple of CPUs, so
+# accepting every upload only means every request gets slower until they all
+# time out. A document is admitted while both the number of documents and the
+# number of pages being processed are under their caps; otherwise it waits in
+# a bounded FIFO queue, and once that is full the request is shed with 429 and
+# a Retry-After estimated from the recent page throughput.
+
+ADMISSION_MAX_DOCUMENTS = int(os.environ.get("ADMISSION_MAX_DOCUMENTS", "4"))
+ADMISSION_MAX_PAGES = int(os.environ.get("ADMISSION_MAX_PAGES", "200"))
+ADMISSION_QUEUE_SIZE = int(os.environ.get("ADMISSION_QUEUE_SIZE", "8"))
+# Used for Retry-After until a few documents have finished
+DEFAULT_SECONDS_PER_PAGE = 3.0
+THROUGHPUT_WINDOW_SECONDS = 300.0
+MAX_RETRY_AFTER_SECONDS = 600
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Service saturated, retry in {retry_after} s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_documents=ADMISSION_MAX_DOCUMENTS, max_pages=ADMISSION_MAX_PAGES,
+                 queue_size=ADMISSION_QUEUE_SIZE, workers=1):
+        self.max_documents = max_documents
+        self.max_pages = max_pages
+        self.queue_size = queue_size
+        self.workers = workers
+        self.documents = 0
+        self.pages = 0
+        self.rejected = 0
+        # (pages, future) in arrival order
+        self.waiters = deque()
+        # (finished at, pages, seconds) of recently completed documents
+        self.completed = deque()
+
+    @property
+    def queued_pages(self):
+        return sum(pages for pages, _ in self.waiters)
+
+    @property
+    def queue_full(self):
+        return len(self.waiters) >= self.queue_size
+
+    @property
+    def saturated(self):
+        return self.queue_full or self.documents >= self.max_documents or self.pages >= self.max_pages
+
+    def _fits(self, pages):
+        if self.documents == 0:
+            # A document over the page cap on its own still runs, alone
+            return True
+        return self.documents < self.max_documents and self.pages + pages <= self.max_pages
+
+    def pages_per_second(self, now=None):
+        now = time.monotonic() if now is None else now
+        while self.completed and self.completed[0][0] < now - THROUGHPUT_WINDOW_SECONDS:
+            self.completed.popleft()
+        pages = sum(pages for _, pages, _ in self.completed)
+        seconds = sum(seconds for _, _, seconds in self.completed)
+        if pages == 0 or seconds <= 0:
+            return self.workers / DEFAULT_SECONDS_PER_PAGE
+        # Per-document rates add up across the documents processed side by side
+        return pages / seconds * max(1, min(self.documents, self.max_documents))
+
+    def retry_after(self):
+        backlog = self.pages + self.queued_pages
+        seconds = math.ceil(backlog / self.pages_per_second())
+        return max(1, min(seconds, MAX_RETRY_AFTER_SECONDS))
+
+    def check(self):
+        # Cheap test before the upload is read
+        if self.queue_full:
+            self.rejected += 1
+            raise Overloaded(self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self, pages):
+        if not self.waiters and self._fits(pages):
+            self._start(pages)
+        else:
+            self.check()
+            waiter = asyncio.get_running_loop().create_future()
+            entry = (pages, waiter)
+            self.waiters.append(entry)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # The client went away while queued; if it had just been
+                # admitted, hand its slot on
+                if entry in self.waiters:
+                    self.waiters.remove(entry)
+                elif not waiter.cancelled():
+                    self._finish(pages, None)
+                raise
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._finish(pages, time.monotonic() - start)
+
+    def _start(self, pages):
+        self.documents += 1
+        self.pages += pages
+
+    def _finish(self, pages, seconds):
+        self.documents -= 1
+        self.pages -= pages
+        if seconds:
+            self.completed.append((time.monotonic(), pages, seconds))
+        while self.waiters and self._fits(self.waiters[0][0]):
+            pages, waiter = self.waiters.popleft()
+            if waiter.done():
+                continue
+            self._start(pages)
+            waiter.set_result(None)
+
+    def stats(self):
+        return {
+            "saturated": self.saturated,
+            "documents_in_flight": self.documents,
+            "pages_in_flight": self.pages,
+            "queued": len(self.waiters),
+            "queue_size": self.queue_size,
+            "max_documents": self.max_documents,
+            "max_pages": self.max_pages,
+            "rejected": self.rejected,
+            "pages_per_second": round(self.pages_per_second(), 3)
+        }
@@ -0,0 +1,118 @@
+import os
+import asyncio
+import hashlib
+import shutil
+import tempfile
+import zipfile
+
+from api import pipeline
+from api.uploads import MAX_UPLOAD_BYTES, UPLOAD_DIR, CHUNK_SIZE, UploadTooLarge
+from src.preprocessing.ocr_engine import format_page
+
+# /extract-batch schedules work per page rather than per file: every page of
+# every document is its own task on the extraction pool, so one 300-page
+# contract does not leave the other workers idle. NER then runs over all the
+# texts together with nlp.pipe.
+
+MAX_BATCH_FILES = int(os.environ.get("MAX_BATCH_FILES", "200"))
+MAX_BATCH_UPLOAD_BYTES = int(float(os.environ.get("MAX_BATCH_UPLOAD_MB", "1024")) * 1024 * 1024)
+
+
+class BatchDocument:
+    def __init__(self, filename, path, sha256, size=0):
+        self.filename = filename
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.cache_key = None
+        self.pages = 0
+        self.text = None
+        self.response = None
+        self.cache_hit = False
+
+
+def extract_zip(zip_path, directory=UPLOAD_DIR, max_files=MAX_BATCH_FILES, max_bytes=MAX_UPLOAD_BYTES,
+                max_total_bytes=MAX_BATCH_UPLOAD_BYTES):
+    # Members are copied out in chunks against the per-file and the total
+    # limits instead of trusting the sizes in the archive's directory, which a
+    # zip bomb can fake.
+    documents = []
+    total = 0
+    path = None
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            for member in archive.infolist():
+                name = os.path.basename(member.filename)
+                if member.is_dir() or not name.lower().endswith('.pdf') or member.filename.startswith('__MACOSX/'):
+                    continue
+                if len(documents) >= max_files:
+                    raise UploadTooLarge(f"Archive holds more than {max_files} PDFs")
+                fd, path = tempfile.mkstemp(suffix='.pdf', dir=directory)
+                digest = hashlib.sha256()
+                size = 0
+                with os.fdopen(fd, 'wb') as out, archive.open(member) as source:
+                    for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                        size += len(chunk)
+                        total += len(chunk)
+                        if size > max_bytes:
+                            raise UploadTooLarge(f"{name} exceeds the {max_bytes // (1024 * 1024)} MB limit")
+                        if total > max_total_bytes:
+                            raise UploadTooLarge(f"PDFs in the batch exceed the {max_total_bytes // (1024 * 1024)} MB limit")
+                        digest.update(chunk)
+                        out.write(chunk)
+                documents.append(BatchDocument(name, path, digest.hexdigest(), size))
+                path = None
+    except BaseException:
+        if path is not None:
+            os.unlink(path)
+        for document in documents:
+            os.unlink(document.path)
+        raise
+    return documents
+
+
+async def ocr_document(document, run_in_pool, work_dir, slots):
+    # Rasterized pages are large, so only a few documents are in flight at a
+    # time; their pages still spread over every worker.
+    async with slots:
+        page_dir = tempfile.mkdtemp(dir=work_dir)
+        try:
+            image_paths = await run_in_pool(pipeline.rasterize, document.path, page_dir)
+            document.pages = len(image_paths)
+            texts = await asyncio.gather(*[run_in_pool(pipeline.ocr_image, path) for path in image_paths])
+        finally:
+            shutil.rmtree(page_dir, ignore_errors=True)
+    document.text = "".join(format_page(i + 1, text) for i, text in enumerate(texts) if text is not None)
+
+
+async def extract_batch(documents, run_in_pool, documents_in_flight, work_dir=UPLOAD_DIR):
+    # documents whose response is already set (cache hits) are left alone
+    pending = [document for document in documents if document.response is None]
+    slots = asyncio.Semaphore(documents_in_flight)
+    outcomes = await asyncio.gather(
+        *[ocr_document(document, run_in_pool, work_dir, slots) for document in pending],
+        return_exceptions=True
+    )
+    readable = []
+    for document, outcome in zip(pending, outcomes):
+        if isinstance(outcome, Exception):
+            document.response = failed_response(document.filename, f"Error processing PDF: {outcome}")
+        else:
+            readable.append(document)
+
+    chunks = [readable[i:i + pipeline.NER_BATCH_SIZE] for i in range(0, len(readable), pipeline.NER_BATCH_SIZE)]
+    results = await asyncio.gather(
+        *[run_in_pool(pipeline.entities_from_texts, [document.text for document in chunk]) for chunk in chunks],
+        return_exceptions=True
+    )
+    for chunk, chunk_results in zip(chunks, results):
+        for i, document in enumerate(chunk):
+            if isinstance(chunk_results, Exception):
+                document.response = failed_response(document.filename, f"Error processing PDF: {chunk_results}")
+            else:
+                document.response = pipeline.build_response(document.filename, chunk_results[i])
+    return documents
+
+
+def failed_response(filename, message):
+    return {"success": False, "message": message, "entities": [], "metadata": {"filename": filename}}
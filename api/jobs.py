@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+from contextlib import contextmanager
+
+# Job state lives in SQLite so a submitted job survives a restart of the
+# service. Each call opens its own short-lived connection: the store is used
+# from the event loop and from forked worker processes, and SQLite connections
+# must not cross a fork.
+
+JOBS_DIR = os.environ.get("JOBS_DIR", os.path.join("var", "jobs"))
+JOBS_DB = os.path.join(JOBS_DIR, "jobs.db")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    pages_total INTEGER,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobStore:
+    def __init__(self, db_path=JOBS_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def upload_path(self, job_id):
+        return os.path.join(os.path.dirname(self.db_path), f"{job_id}.pdf")
+
+    def create(self, filename, upload_path):
+        # Takes ownership of an upload already streamed to disk
+        job_id = uuid.uuid4().hex
+        input_path = self.upload_path(job_id)
+        shutil.move(upload_path, input_path)
+        try:
+            with self.connect() as conn:
+                conn.execute(
+                    "INSERT INTO jobs (id, filename, input_path, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, filename, input_path, QUEUED, time.time())
+                )
+        except BaseException:
+            os.unlink(input_path)
+            raise
+        return job_id
+
+    def get(self, job_id):
+        with self.connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def claim_next(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two dispatchers
+        # can never claim the same job.
+        with self.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, pages_done = 0 WHERE id = ?",
+                (RUNNING, time.time(), row["id"])
+            )
+            conn.execute("COMMIT")
+        return row["id"]
+
+    def update_progress(self, job_id, pages_done, pages_total):
+        # Called from the worker after every page; raising here is how a
+        # cancellation reaches a job that is already running.
+        with self.connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET pages_done = ?, pages_total = ? WHERE id = ? AND status = ?",
+                (pages_done, pages_total, job_id, RUNNING)
+            )
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or row["status"] == CANCELLED:
+            raise JobCancelled(job_id)
+
+    def finish(self, job_id, status, result=None, error=None):
+        with self.connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id, RUNNING)
+            )
+        self.remove_upload(job_id)
+
+    def cancel(self, job_id):
+        with self.connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), job_id, *ACTIVE_STATUSES)
+            )
+        if cursor.rowcount:
+            job = self.get(job_id)
+            # A running job's worker still holds the upload; it is removed
+            # when the worker notices the cancellation.
+            if job["started_at"] is None:
+                self.remove_upload(job_id)
+        return bool(cursor.rowcount)
+
+    def delete(self, job_id):
+        with self.connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE id = ? AND status NOT IN (?, ?)", (job_id, *ACTIVE_STATUSES)
+            )
+        return bool(cursor.rowcount)
+
+    def requeue_running(self):
+        # Jobs that were running when the service stopped start again from page one
+        with self.connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, pages_done = 0 WHERE status = ?",
+                (QUEUED, RUNNING)
+            )
+        return cursor.rowcount
+
+    def counts(self):
+        with self.connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def remove_upload(self, job_id):
+        try:
+            os.unlink(self.upload_path(job_id))
+        except FileNotFoundError:
+            pass
+
+
+def job_view(job):
+    pages_total = job["pages_total"]
+    view = {
+        "job_id": job["id"],
+        "filename": job["filename"],
+        "status": job["status"],
+        "progress": {
+            "pages_done": job["pages_done"],
+            "pages_total": pages_total,
+            "percent": round(100.0 * job["pages_done"] / pages_total, 1) if pages_total else 0.0,
+        },
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+    if job["result"] is not None:
+        view["result"] = json.loads(job["result"])
+    if job["error"] is not None:
+        view["error"] = job["error"]
+    return view
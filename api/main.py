@@ -1,35 +1,300 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse, FileResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
 from contextlib import asynccontextmanager
-import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import json
+import time
+import zipfile
 import os
 import sys
-import spacy
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.preprocessing.ocr_engine import extract_text_from_pdf
-from src.postprocessing.rule_engine import apply_rules, deduplicate_entities
+from api import pipeline
+from api import metrics
+from api.admission import (
+    AdmissionController, Overloaded, ADMISSION_MAX_DOCUMENTS, ADMISSION_MAX_PAGES, ADMISSION_QUEUE_SIZE
+)
+from api.profiling import PROFILE_DIR, profile_allowed, new_profile_id, profile_path, run_profiled, server_timing
+from api.batch import BatchDocument, MAX_BATCH_FILES, MAX_BATCH_UPLOAD_BYTES, extract_batch, extract_zip
+from api.streaming import STREAM_FORMATS, MEDIA_TYPES, encode_event, stream_extraction
+from api.jobs import JobStore, JOBS_DB, FAILED, job_view
+from api.result_cache import ResultCache, cache_key
+from api.uploads import (MAX_UPLOAD_BYTES, UploadTooLarge, InvalidUpload, exceeds_limit, read_body, receive_files,
+                         openapi_upload, remove_upload)
 
-MODEL_PATH = os.path.join("models", "ner_model_v1")
+MODEL_PATH = pipeline.MODEL_PATH
+# OCR and NER are CPU-bound and run in this many worker processes, so the
+# event loop (and /health) stays responsive while documents are processed.
+EXTRACTION_WORKERS = int(os.environ.get("EXTRACTION_WORKERS", "2"))
+# Long documents go through /jobs instead, on their own pool so a 300-page
+# contract does not hold up the synchronous endpoints. 0 means this process
+# runs no jobs (api/serve.py leaves them to one of its workers).
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "1"))
+# api/serve.py divides these settings and the admission limits between its
+# worker processes before forking; they are per process.
+JOB_POLL_SECONDS = 5.0
+# api/serve.py requeues once in the parent before forking; a worker doing it
+# on startup would requeue jobs its siblings are already running.
+REQUEUE_JOBS_ON_STARTUP = True
+WARM_UP_POLL_SECONDS = 0.1
+# Pause before replacing a pool whose workers crashed while warming up
+WARM_UP_RETRY_SECONDS = 5.0
 nlp = None
+model_version = None
+result_cache = None
+executor = None
+job_executor = None
+job_store = None
+job_wakeup = None
+admission = None
+# pool name -> warmed up; a replaced pool starts cold and is warmed again
+pools_ready = {}
+warm_up_tasks = set()
+# Serializes pool replacement after a worker crash
+pool_lock = asyncio.Lock()
+warm_up_seconds = {}
+
+
+def create_executor(workers=None):
+    return ProcessPoolExecutor(
+        max_workers=workers or EXTRACTION_WORKERS,
+        initializer=pipeline.init_worker,
+        initargs=(MODEL_PATH, pipeline.WARM_UP)
+    )
+
+
+async def restart_pool(name, broken):
+    # Every task in flight on a dead pool gets BrokenProcessPool; only the
+    # first one replaces it, and never a pool a sibling has just created.
+    global executor, job_executor
+    async with pool_lock:
+        if name == "extraction" and executor is broken:
+            executor = create_executor()
+        elif name == "jobs" and job_executor is broken:
+            job_executor = create_executor(JOB_WORKERS)
+        else:
+            return
+        print(f"Warning: {name} pool crashed, restarting")
+        broken.shutdown(wait=False, cancel_futures=True)
+        start_warm_up(name)
+
+
+async def run_in_pool(fn, *args):
+    result, _ = await run_timed_in_pool(fn, *args)
+    return result
+
+
+async def run_timed_in_pool(fn, *args):
+    # Returns (result, {stage: [seconds, ...]}) as measured in the worker
+    loop = asyncio.get_running_loop()
+    pool = executor
+    metrics.POOL_TASKS.inc("extraction")
+    try:
+        result, timings, (pid, rule_caches) = await loop.run_in_executor(pool, pipeline.run_task, fn, *args)
+        metrics.record_timings(timings)
+        metrics.record_rule_caches(pid, rule_caches)
+        return result, timings
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory on a huge scan); replace the pool
+        # so later requests are not all rejected.
+        await restart_pool("extraction", pool)
+        raise
+    finally:
+        metrics.POOL_TASKS.dec("extraction")
+
+
+async def receive_uploads(request, **options):
+    start = time.perf_counter()
+    try:
+        uploads = await receive_files(request, **options)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - start, "upload")
+    return uploads
+
+
+def result_key(sha256, options=None):
+    # options: request settings that change the result, e.g. the page range
+    return cache_key(sha256, model_version, dict(pipeline.PIPELINE_CONFIG, **(options or {})))
+
+
+async def cache_lookup(sha256, filename, options=None):
+    # The cache reads and writes files; keep that off the event loop
+    key = result_key(sha256, options)
+    response = await asyncio.to_thread(result_cache.get, key)
+    metrics.CACHE_LOOKUPS.inc("miss" if response is None else "hit")
+    if response is not None:
+        # The same bytes may have been uploaded under another name
+        response["metadata"]["filename"] = filename
+        response["metadata"]["cache_hit"] = True
+    return key, response
+
+
+def overloaded_response(e):
+    metrics.REJECTED.inc()
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(e)},
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+async def cache_store(key, response):
+    if response["success"]:
+        await asyncio.to_thread(result_cache.put, key, response)
+    response["metadata"]["cache_hit"] = False
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global nlp
+    global nlp, model_version, result_cache, executor, job_executor, job_store, job_wakeup, admission
     try:
         if os.path.exists(MODEL_PATH):
-            nlp = spacy.load(MODEL_PATH)
-            print(f"Model loaded from {MODEL_PATH}")
+            # Loaded before the pool forks its workers so they inherit it;
+            # under api/serve.py this process already inherited it too
+            preloaded = pipeline.nlp is not None
+            nlp = pipeline.load_model(MODEL_PATH)
+            model_version = pipeline.model_version(MODEL_PATH)
+            print(f"Model {'inherited' if preloaded else 'loaded'} from {MODEL_PATH} (version {model_version})")
         else:
             print(f"Warning: Model not found at {MODEL_PATH}")
             print("   API will run but extraction will fail")
     except Exception as e:
         print(f"Error loading model: {e}")
     
+    result_cache = ResultCache()
+    print(f"Result cache: {result_cache.stats()['entries']} entries")
+    
+    executor = create_executor()
+    print(f"Extraction pool: {EXTRACTION_WORKERS} worker processes")
+    admission = AdmissionController(
+        ADMISSION_MAX_DOCUMENTS, ADMISSION_MAX_PAGES, ADMISSION_QUEUE_SIZE, workers=EXTRACTION_WORKERS
+    )
+    print(f"Admission: {admission.max_documents} documents, {admission.max_pages} pages, "
+          f"{admission.queue_size} queued")
+    
+    job_store = JobStore(JOBS_DB)
+    requeued = job_store.requeue_running() if REQUEUE_JOBS_ON_STARTUP else 0
+    if requeued:
+        print(f"Requeued {requeued} interrupted jobs")
+    metrics.POOL_WORKERS.set(EXTRACTION_WORKERS, "extraction")
+    metrics.POOL_WORKERS.set(JOB_WORKERS, "jobs")
+    job_wakeup = asyncio.Event()
+    start_warm_up("extraction")
+    dispatcher = None
+    if JOB_WORKERS > 0:
+        job_executor = create_executor(JOB_WORKERS)
+        dispatcher = asyncio.create_task(dispatch_jobs())
+        start_warm_up("jobs")
+    else:
+        print("Jobs are run by another API process")
+    
     yield
+    
+    if dispatcher is not None:
+        dispatcher.cancel()
+    for task in list(warm_up_tasks):
+        task.cancel()
+    # Running jobs are not waited for: they stay "running" in the store and
+    # are requeued on the next start.
+    if job_executor is not None:
+        job_executor.shutdown(wait=False, cancel_futures=True)
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def warm_up_pool(pool, workers):
+    # The warm-up runs in each worker's initializer, before it takes any task;
+    # ask until every worker has answered, i.e. has finished warming up
+    loop = asyncio.get_running_loop()
+    answered = {}
+    while len(answered) < workers:
+        statuses = await asyncio.gather(*[loop.run_in_executor(pool, pipeline.worker_status) for _ in range(workers)])
+        answered.update(statuses)
+        if len(answered) < workers:
+            await asyncio.sleep(WARM_UP_POLL_SECONDS)
+    return answered
+
+
+def current_pool(name):
+    if name == "extraction":
+        return executor, EXTRACTION_WORKERS
+    return job_executor, JOB_WORKERS
+
+
+def start_warm_up(name):
+    # /health reports ready only while every pool is warm, so traffic is not
+    # routed to a cold instance, including after a pool was replaced
+    pools_ready[name] = not (pipeline.WARM_UP and nlp is not None)
+    if not pools_ready[name]:
+        pool, workers = current_pool(name)
+        task = asyncio.create_task(warm_up(name, pool, workers))
+        warm_up_tasks.add(task)
+        task.add_done_callback(warm_up_tasks.discard)
+
+
+async def warm_up(name, pool, workers):
+    start = time.perf_counter()
+    try:
+        statuses = await warm_up_pool(pool, workers)
+    except BrokenProcessPool as e:
+        # Stays not ready; the replacement pool is warmed up in turn
+        print(f"Warning: {name} pool warm-up failed: {e}")
+        await asyncio.sleep(WARM_UP_RETRY_SECONDS)
+        await restart_pool(name, pool)
+        return
+    if current_pool(name)[0] is not pool:
+        return
+    warm_up_seconds[name] = round(time.perf_counter() - start, 3)
+    pools_ready[name] = True
+    slowest = max(seconds or 0.0 for seconds in statuses.values())
+    print(f"Warm-up of the {name} pool finished in {warm_up_seconds[name]:.1f} s "
+          f"({workers} workers, slowest {slowest:.1f} s)")
+
+
+async def dispatch_jobs():
+    # claim_next can wait up to the SQLite busy timeout for the write lock,
+    # so every JobStore call from the event loop goes through a thread
+    slots = asyncio.Semaphore(JOB_WORKERS)
+    while True:
+        await slots.acquire()
+        job_id = await asyncio.to_thread(job_store.claim_next)
+        while job_id is None:
+            job_wakeup.clear()
+            try:
+                await asyncio.wait_for(job_wakeup.wait(), JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            job_id = await asyncio.to_thread(job_store.claim_next)
+        asyncio.create_task(run_job(job_id, slots))
+
+
+async def run_job(job_id, slots):
+    loop = asyncio.get_running_loop()
+    pool = job_executor
+    metrics.POOL_TASKS.inc("jobs")
+    try:
+        status, timings, (pid, rule_caches) = await loop.run_in_executor(
+            pool, pipeline.run_task, pipeline.run_job, job_store.db_path, job_id
+        )
+        metrics.record_timings(timings)
+        metrics.record_rule_caches(pid, rule_caches)
+        metrics.DOCUMENTS.inc("/jobs", status)
+        print(f"Job {job_id}: {status}")
+    except BrokenProcessPool:
+        await asyncio.to_thread(job_store.finish, job_id, FAILED, error="worker process crashed")
+        metrics.DOCUMENTS.inc("/jobs", FAILED)
+        await restart_pool("jobs", pool)
+    finally:
+        metrics.POOL_TASKS.dec("jobs")
+        slots.release()
 
 app = FastAPI(
     title="LexiScan API",
@@ -39,6 +304,53 @@ app = FastAPI(
 )
 
 
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    limit = MAX_BATCH_UPLOAD_BYTES if request.url.path == "/extract-batch" else MAX_UPLOAD_BYTES
+    if request.method == "POST" and exceeds_limit(request.headers.get("content-length"), limit):
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Upload exceeds the {limit // (1024 * 1024)} MB limit"}
+        )
+    if request.method == "POST" and request.url.path == "/extract" and admission is not None:
+        # Shed load before the body is read when the wait queue is already full
+        try:
+            admission.check()
+        except Overloaded as e:
+            return overloaded_response(e)
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    metrics.IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # The route template, not the raw path, keeps /jobs/{job_id} to one series
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "other"
+        metrics.IN_FLIGHT.dec()
+        metrics.REQUESTS.inc(endpoint, request.method, str(status))
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+
+
+metrics.Gauge(
+    metrics.registry, "lexiscan_jobs", "Jobs in the job store by status", ("status",),
+    function=lambda: {(status,): count for status, count in job_store.counts().items()} if job_store else {}
+)
+metrics.Gauge(
+    metrics.registry, "lexiscan_admission", "Documents and pages admitted to /extract, and documents queued", ("state",),
+    function=lambda: {
+        ("documents",): admission.documents, ("pages",): admission.pages, ("queued",): len(admission.waiters)
+    } if admission else {}
+)
+
+
 class Entity(BaseModel):
     text: str
     label: str
@@ -52,6 +364,13 @@ class ExtractionResponse(BaseModel):
     metadata: Dict[str, Any]
 
 
+class BatchExtractionResponse(BaseModel):
+    success: bool
+    message: str
+    results: List[ExtractionResponse]
+    metadata: Dict[str, Any]
+
+
 @app.get("/")
 async def root():
     return {
@@ -62,22 +381,133 @@ async def root():
     }
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    # The job gauge counts rows in the job store
+    text = await asyncio.to_thread(metrics.registry.render)
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy",
         "model_loaded": nlp is not None,
         "model_path": MODEL_PATH,
-        "ready": nlp is not None
+        "model_version": model_version,
+        "result_cache": result_cache.stats() if result_cache else None,
+        "admission": admission.stats() if admission else None,
+        "saturated": admission.saturated if admission else False,
+        "warm_up_seconds": warm_up_seconds,
+        "ready": nlp is not None and bool(pools_ready) and all(pools_ready.values())
     }
 
 
-@app.post("/extract", response_model=ExtractionResponse)
-async def extract_entities(file: UploadFile = File(...)):
-    if not file.filename.lower().endswith('.pdf'):
+@app.post("/extract", response_model=ExtractionResponse, openapi_extra=openapi_upload())
+async def extract_entities(request: Request, response: Response,
+                           pages: Optional[str] = None, early_exit: bool = False, profile: bool = False):
+    # pages limits OCR to a range such as "1-5"; early_exit stops once every
+    # critical label has been found. metadata reports the pages skipped.
+    # profile=true (or an X-Profile header) runs the request under cProfile
+    # when PROFILING_ENABLED is set.
+    start = time.perf_counter()
+    profile_id = None
+    if profile or request.headers.get("x-profile", "").lower() in ("1", "true", "yes"):
+        if not profile_allowed(request.headers.get("x-profile-token")):
+            raise HTTPException(status_code=403, detail="Profiling is not enabled")
+        profile_id = new_profile_id()
+    
+    try:
+        first_page, last_page = pipeline.parse_page_range(pages)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if nlp is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not loaded. Service unavailable."
+        )
+    
+    [file] = await receive_uploads(request)
+    tmp_path, sha256 = file.path, file.sha256
+    upload_seconds = time.perf_counter() - start
+    try:
+        # Only non-default options go into the key, so full-document results
+        # are shared with /extract-batch
+        options = {}
+        if first_page or last_page:
+            options["pages"] = [first_page, last_page]
+        if early_exit:
+            options["early_exit"] = True
+        if profile_id is None:
+            key, result_response = await cache_lookup(sha256, file.filename, options)
+        else:
+            # A cache hit would leave nothing to profile
+            key, result_response = result_key(sha256, options), None
+        if result_response is None:
+            # pdfinfo runs in a thread, not on the pool, so counting pages does
+            # not queue behind the documents already being read
+            page_total = await asyncio.to_thread(pipeline.page_count, tmp_path)
+            requested = min(last_page or page_total, page_total) - (first_page or 1) + 1
+            args = (pipeline.extract_entities, tmp_path, None, first_page, last_page, early_exit)
+            async with admission.admit(max(requested, 1)):
+                print(f"Processing: {file.filename}")
+                if profile_id is None:
+                    result = await run_in_pool(*args)
+                else:
+                    result, timings = await run_timed_in_pool(run_profiled, profile_id, PROFILE_DIR, *args)
+            result_response = pipeline.build_response(file.filename, result)
+            await cache_store(key, result_response)
+        if profile_id is not None:
+            print(f"Profiled {file.filename}: {profile_id}")
+            result_response["metadata"]["profile_id"] = profile_id
+            timings["upload"] = [upload_seconds]
+            response.headers["Server-Timing"] = server_timing(timings, time.perf_counter() - start)
+            response.headers["X-Profile-Id"] = profile_id
+        metrics.DOCUMENTS.inc("/extract", "success" if result_response["success"] else "failed")
+        return ExtractionResponse(**result_response)
+    
+    except Overloaded as e:
+        metrics.REJECTED.inc()
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing PDF: {str(e)}"
+        )
+    
+    finally:
+        remove_upload(tmp_path)
+
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, request: Request, format: str = "txt"):
+    # txt: the top functions by cumulative time; prof: the raw cProfile stats
+    if not profile_allowed(request.headers.get("x-profile-token")):
+        raise HTTPException(status_code=403, detail="Profiling is not enabled")
+    if format not in ("txt", "prof"):
+        raise HTTPException(status_code=400, detail="format must be one of: txt, prof")
+    try:
+        path = profile_path(profile_id, f".{format}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "txt":
+        with open(path) as f:
+            return PlainTextResponse(f.read())
+    return FileResponse(path, media_type="application/octet-stream", filename=os.path.basename(path))
+
+
+@app.post("/extract-stream", openapi_extra=openapi_upload())
+async def extract_entities_stream(request: Request, format: str = "ndjson", include_text: bool = False):
+    # One event per page as it is read, then a summary with the deduplicated
+    # entities; format=sse for Server-Sent Events, ndjson otherwise
+    if format not in STREAM_FORMATS:
         raise HTTPException(
             status_code=400,
-            detail="Only PDF files are supported"
+            detail=f"format must be one of: {', '.join(STREAM_FORMATS)}"
         )
     
     if nlp is None:
@@ -86,88 +516,227 @@ async def extract_entities(file: UploadFile = File(...)):
             detail="Model not loaded. Service unavailable."
         )
     
+    [file] = await receive_uploads(request)
+    tmp_path = file.path
+    
+    async def events():
+        try:
+            async for event in stream_extraction(
+                file.filename, tmp_path, run_in_pool,
+                chunks_in_flight=EXTRACTION_WORKERS + 1, include_text=include_text
+            ):
+                if event["event"] == "summary":
+                    metrics.DOCUMENTS.inc("/extract-stream", "success" if event["success"] else "failed")
+                yield encode_event(event, format)
+        finally:
+            remove_upload(tmp_path)
+    
+    # The generator's finally only runs if the response starts streaming; the
+    # background task also covers a client that is gone before the first event
+    return StreamingResponse(
+        events(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(remove_upload, tmp_path)
+    )
+
+
+@app.post("/extract-batch", response_model=BatchExtractionResponse, openapi_extra=openapi_upload("files", multiple=True))
+async def extract_entities_batch(request: Request):
+    # Accepts any mix of PDFs and zip archives of PDFs
+    if nlp is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not loaded. Service unavailable."
+        )
+    
+    start = time.perf_counter()
+    files = await receive_uploads(request, field="files", suffixes=(".pdf", ".zip"),
+                                  max_bytes=MAX_BATCH_UPLOAD_BYTES, max_files=MAX_BATCH_FILES)
+    documents = []
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            contents = await file.read()
-            tmp_file.write(contents)
-            tmp_path = tmp_file.name
-        
-        print(f"Processing: {file.filename}")
-        text = extract_text_from_pdf(tmp_path)
+        for file in files:
+            if file.filename.lower().endswith('.zip'):
+                try:
+                    # The batch limit covers what the archives unpack to as well
+                    documents += await asyncio.to_thread(
+                        extract_zip, file.path, max_files=MAX_BATCH_FILES - len(documents),
+                        max_total_bytes=MAX_BATCH_UPLOAD_BYTES - sum(document.size for document in documents)
+                    )
+                except zipfile.BadZipFile:
+                    raise HTTPException(status_code=400, detail=f"Not a valid zip archive: {file.filename}")
+                except UploadTooLarge as e:
+                    raise HTTPException(status_code=413, detail=str(e))
+                finally:
+                    remove_upload(file.path)
+            else:
+                if len(documents) >= MAX_BATCH_FILES:
+                    raise HTTPException(status_code=413, detail=f"A batch holds at most {MAX_BATCH_FILES} PDFs")
+                if file.size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"{file.filename} exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit")
+                documents.append(BatchDocument(file.filename, file.path, file.sha256, file.size))
         
-        if not text or len(text.strip()) < 50:
-            os.unlink(tmp_path)
-            return ExtractionResponse(
-                success=False,
-                message="Failed to extract text from PDF. File may be corrupted or empty.",
-                entities=[],
-                metadata={"filename": file.filename}
-            )
+        if not documents:
+            raise HTTPException(status_code=400, detail="No PDF files found in the request")
         
-        doc = nlp(text)
-        raw_entities = [(ent.text, ent.label_) for ent in doc.ents]
+        for document in documents:
+            document.cache_key, document.response = await cache_lookup(document.sha256, document.filename)
+            document.cache_hit = document.response is not None
         
-        cleaned_entities = apply_rules(raw_entities)
-        final_entities = deduplicate_entities(cleaned_entities)
+        print(f"Processing batch: {len(documents)} files")
+        await extract_batch(documents, run_in_pool, documents_in_flight=EXTRACTION_WORKERS * 2)
         
-        entities = [
-            Entity(
-                text=e['text'],
-                label=e['label'],
-                original_text=e.get('original_text')
-            )
-            for e in final_entities
-        ]
+        for document in documents:
+            if not document.cache_hit:
+                await cache_store(document.cache_key, document.response)
         
-        os.unlink(tmp_path)
-        
-        metadata = {
-            "filename": file.filename,
-            "text_length": len(text),
-            "entities_found": len(entities),
-            "entities_by_type": {}
-        }
-        
-        for entity in entities:
-            label = entity.label
-            metadata["entities_by_type"][label] = metadata["entities_by_type"].get(label, 0) + 1
-        
-        return ExtractionResponse(
-            success=True,
-            message=f"Successfully extracted {len(entities)} entities",
-            entities=entities,
-            metadata=metadata
+        succeeded = sum(1 for document in documents if document.response["success"])
+        metrics.DOCUMENTS.inc("/extract-batch", "success", amount=succeeded)
+        metrics.DOCUMENTS.inc("/extract-batch", "failed", amount=len(documents) - succeeded)
+        return BatchExtractionResponse(
+            success=succeeded > 0,
+            message=f"Extracted entities from {succeeded} of {len(documents)} files",
+            results=[ExtractionResponse(**document.response) for document in documents],
+            metadata={
+                "files": len(documents),
+                "succeeded": succeeded,
+                "failed": len(documents) - succeeded,
+                "cache_hits": sum(1 for document in documents if document.cache_hit),
+                "pages_processed": sum(document.pages for document in documents),
+                "seconds": round(time.perf_counter() - start, 3)
+            }
         )
     
+    finally:
+        for document in documents:
+            remove_upload(document.path)
+        for file in files:
+            remove_upload(file.path)
+
+
+def parse_text_payload(body, content_type):
+    # text/plain: the body is one document. JSON: a string, a list of
+    # strings, {"text": ...} or {"texts": [...]}. Returns (texts, is_batch).
+    if not content_type.startswith("application/json"):
+        return [body.decode("utf-8", errors="replace")], False
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body is not valid JSON")
+    if isinstance(payload, dict):
+        payload = payload.get("texts", payload.get("text"))
+    if isinstance(payload, str):
+        return [payload], False
+    if isinstance(payload, list) and all(isinstance(text, str) for text in payload):
+        return payload, True
+    raise HTTPException(
+        status_code=400,
+        detail='Expected text, a JSON string, a JSON array of strings, {"text": ...} or {"texts": [...]}'
+    )
+
+
+@app.post("/extract-from-text")
+async def extract_entities_from_text(request: Request):
+    # For callers that already have the contract text: NER and the rule
+    # engine only, no rasterization or OCR
+    if nlp is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Model not loaded. Service unavailable."
+        )
+    
+    try:
+        body = await read_body(request)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    texts, is_batch = parse_text_payload(body, request.headers.get("content-type", ""))
+    if not texts:
+        raise HTTPException(status_code=400, detail="No texts provided")
+    if len(texts) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"A batch holds at most {MAX_BATCH_FILES} texts")
+    
+    start = time.perf_counter()
+    try:
+        results = await run_in_pool(pipeline.entities_from_texts, texts)
     except Exception as e:
-        if 'tmp_path' in locals():
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-        
         raise HTTPException(
             status_code=500,
-            detail=f"Error processing PDF: {str(e)}"
+            detail=f"Error processing text: {str(e)}"
         )
+    seconds = round(time.perf_counter() - start, 3)
+    
+    responses = []
+    for index, result in enumerate(results):
+        response = pipeline.build_response(None, result)
+        if not response["success"]:
+            response["message"] = f"Text too short to extract entities (minimum {pipeline.MIN_TEXT_LENGTH} characters)"
+        response["metadata"]["index"] = index
+        response["metadata"]["text_length"] = result["text_length"]
+        responses.append(response)
+    succeeded = sum(1 for response in responses if response["success"])
+    metrics.DOCUMENTS.inc("/extract-from-text", "success", amount=succeeded)
+    metrics.DOCUMENTS.inc("/extract-from-text", "failed", amount=len(responses) - succeeded)
+    
+    if not is_batch:
+        responses[0]["metadata"]["seconds"] = seconds
+        return ExtractionResponse(**responses[0])
+    return BatchExtractionResponse(
+        success=succeeded > 0,
+        message=f"Extracted entities from {succeeded} of {len(responses)} texts",
+        results=[ExtractionResponse(**response) for response in responses],
+        metadata={
+            "texts": len(responses),
+            "succeeded": succeeded,
+            "failed": len(responses) - succeeded,
+            "seconds": seconds
+        }
+    )
 
 
-@app.post("/extract-text")
-async def extract_text_only(file: UploadFile = File(...)):
-    if not file.filename.lower().endswith('.pdf'):
+@app.post("/jobs", status_code=202, openapi_extra=openapi_upload())
+async def submit_job(request: Request):
+    if nlp is None:
         raise HTTPException(
-            status_code=400,
-            detail="Only PDF files are supported"
+            status_code=503,
+            detail="Model not loaded. Service unavailable."
         )
     
+    [file] = await receive_uploads(request)
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            contents = await file.read()
-            tmp_file.write(contents)
-            tmp_path = tmp_file.name
-        
-        text = extract_text_from_pdf(tmp_path)
-        os.unlink(tmp_path)
+        job_id = await asyncio.to_thread(job_store.create, file.filename, file.path)
+    except BaseException:
+        remove_upload(file.path)
+        raise
+    job_wakeup.set()
+    return job_view(await asyncio.to_thread(job_store.get, job_id))
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    # Cancels a queued or running job; a finished job is deleted instead
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if await asyncio.to_thread(job_store.cancel, job_id):
+        return job_view(await asyncio.to_thread(job_store.get, job_id))
+    await asyncio.to_thread(job_store.delete, job_id)
+    return {"job_id": job_id, "deleted": True}
+
+
+@app.post("/extract-text", openapi_extra=openapi_upload())
+async def extract_text_only(request: Request):
+    [file] = await receive_uploads(request)
+    tmp_path = file.path
+    try:
+        text = await run_in_pool(pipeline.extract_text, tmp_path)
         
         return {
             "success": True,
@@ -177,16 +746,13 @@ async def extract_text_only(file: UploadFile = File(...)):
         }
     
     except Exception as e:
-        if 'tmp_path' in locals():
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-        
         raise HTTPException(
             status_code=500,
             detail=f"Error extracting text: {str(e)}"
         )
+    
+    finally:
+        remove_upload(tmp_path)
 
 
 if __name__ == "__main__":
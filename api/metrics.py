@@ -0,0 +1,231 @@
+import os
+import threading
+import multiprocessing
+
+# Minimal Prometheus text-format metrics, with no client library. Values
+# live in plain dicts behind one lock; rendering walks a few dozen series,
+# so a scrape every few seconds costs next to nothing.
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, registry, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self.registry = registry
+        self.lock = registry.lock
+        self.values = {}
+        registry.register(self)
+
+    def format_labels(self, names, values):
+        const_names, const_values = zip(*self.registry.const_labels) if self.registry.const_labels else ((), ())
+        return format_labels(const_names + tuple(names), const_values + tuple(values))
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1.0):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self):
+        lines = self.header()
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{self.format_labels(self.label_names, labels)} {format_value(value)}")
+        return lines
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, registry, name, help_text, labels=(), function=None):
+        # function: computed at scrape time instead of being set by the code
+        super().__init__(registry, name, help_text, labels)
+        self.function = function
+
+    def set(self, value, *labels):
+        with self.lock:
+            self.values[labels] = value
+
+    def inc(self, *labels, amount=1.0):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def dec(self, *labels, amount=1.0):
+        self.inc(*labels, amount=-amount)
+
+    def render(self):
+        lines = self.header()
+        values = self.function() if self.function else self.values
+        for labels, value in sorted(values.items()):
+            if value is not None:
+                lines.append(f"{self.name}{self.format_labels(self.label_names, labels)} {format_value(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help_text, labels=(), buckets=STAGE_BUCKETS):
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value, *labels):
+        with self.lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = self.header()
+        for labels, (bucket_counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                bucket_labels = self.format_labels(self.label_names + ("le",), labels + (format_value(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            base = self.format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{base} {format_value(total)}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = []
+        # ((name, value), ...) added to every series, e.g. the worker pid
+        # when api/serve.py runs several API processes
+        self.const_labels = ()
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            # Scrape-time gauges read /proc or SQLite, so not under the lock
+            if getattr(metric, "function", None):
+                lines.extend(metric.render())
+            else:
+                with self.lock:
+                    lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def resident_memory_bytes(pid="self"):
+    # /proc/<pid>/statm: size resident shared text lib data dt, in pages
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def worker_memory():
+    # The extraction pools' processes are this process's children
+    children = multiprocessing.active_children()
+    sizes = [resident_memory_bytes(child.pid) for child in children]
+    sizes = [size for size in sizes if size is not None]
+    return {(): sum(sizes)} if sizes else {}
+
+
+def live_worker_pids():
+    return {child.pid for child in multiprocessing.active_children()}
+
+
+# Each worker reports its rule engine cache stats along with every task
+# result; the gauges sum the latest report of every live worker.
+worker_rule_caches = {}
+
+
+def record_rule_caches(pid, stats):
+    with registry.lock:
+        worker_rule_caches[pid] = stats
+
+
+def rule_cache_values(field):
+    live = live_worker_pids()
+    totals = {}
+    with registry.lock:
+        for pid in [pid for pid in worker_rule_caches if pid not in live]:
+            del worker_rule_caches[pid]
+        for stats in worker_rule_caches.values():
+            for name, cache in stats.items():
+                totals[(name,)] = totals.get((name,), 0) + cache[field]
+    return totals
+
+
+registry = Registry()
+
+REQUESTS = Counter(registry, "lexiscan_requests_total", "HTTP requests handled", ("endpoint", "method", "status"))
+REQUEST_SECONDS = Histogram(registry, "lexiscan_request_seconds", "HTTP request latency until the response starts", ("endpoint",))
+IN_FLIGHT = Gauge(registry, "lexiscan_requests_in_flight", "HTTP requests being handled")
+STAGE_SECONDS = Histogram(registry, "lexiscan_stage_seconds", "Latency of one pipeline stage (per page for preprocess and ocr)", ("stage",))
+PAGES = Counter(registry, "lexiscan_pages_processed_total", "Pages OCRed")
+DOCUMENTS = Counter(registry, "lexiscan_documents_total", "Documents processed", ("endpoint", "outcome"))
+POOL_TASKS = Gauge(registry, "lexiscan_pool_tasks", "Tasks submitted to a worker pool and not yet finished", ("pool",))
+POOL_WORKERS = Gauge(registry, "lexiscan_pool_workers", "Worker processes per pool", ("pool",))
+REJECTED = Counter(registry, "lexiscan_requests_rejected_total", "/extract requests shed with 429")
+CACHE_LOOKUPS = Counter(registry, "lexiscan_result_cache_lookups_total", "Result cache lookups", ("result",))
+RESIDENT_MEMORY = Gauge(
+    registry, "process_resident_memory_bytes", "Resident memory of the API process",
+    function=lambda: {(): resident_memory_bytes()}
+)
+WORKER_MEMORY = Gauge(
+    registry, "lexiscan_worker_resident_memory_bytes", "Total resident memory of the worker processes",
+    function=worker_memory
+)
+RULE_CACHE_HITS = Gauge(
+    registry, "lexiscan_rule_cache_hits", "Rule engine normalization cache hits in the live workers", ("cache",),
+    function=lambda: rule_cache_values("hits")
+)
+RULE_CACHE_MISSES = Gauge(
+    registry, "lexiscan_rule_cache_misses", "Rule engine normalization cache misses in the live workers", ("cache",),
+    function=lambda: rule_cache_values("misses")
+)
+RULE_CACHE_ENTRIES = Gauge(
+    registry, "lexiscan_rule_cache_entries", "Entries in the rule engine normalization caches of the live workers", ("cache",),
+    function=lambda: rule_cache_values("size")
+)
+
+
+def record_timings(timings):
+    for stage_name, durations in timings.items():
+        for seconds in durations:
+            STAGE_SECONDS.observe(seconds, stage_name)
+        if stage_name == "ocr":
+            PAGES.inc(amount=len(durations))
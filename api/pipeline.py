@@ -0,0 +1,321 @@
+import os
+import sys
+import time
+import hashlib
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import spacy
+from PIL import Image, ImageDraw
+
+from src.preprocessing.ocr_engine import (
+    extract_text_from_pdf, pdf_page_count, rasterize_pdf, ocr_page, OCR_DPI, TESSERACT_CONFIG
+)
+from src.postprocessing.rule_engine import (
+    apply_rules, apply_rules_batch, deduplicate_entities, get_cache_stats, CRITICAL_LABELS
+)
+from src.utils.stage_timer import stage, collect_timings
+from api.jobs import JobStore, JobCancelled, DONE, FAILED, CANCELLED
+
+# These functions run inside the extraction process pool, never on the event
+# loop. Each worker keeps its own `nlp`; when the pool is forked from a parent
+# that already loaded the model, the worker inherits it instead of reloading.
+
+MODEL_PATH = os.environ.get("MODEL_PATH", os.path.join("models", "ner_model_v1"))
+MIN_TEXT_LENGTH = 50
+NER_BATCH_SIZE = 16
+OCR_LANGUAGES = "eng"
+# Bump when a rule or post-processing change alters results, so cached
+# responses from the old pipeline are not served.
+PIPELINE_VERSION = "2"
+# Fuzzy dedup also merges near-duplicate names, e.g. "ABC Corp." and
+# "ABC Corporation Pvt. Ltd."
+FUZZY_DEDUP = os.environ.get("FUZZY_DEDUP", "false").lower() in ("1", "true", "yes")
+PIPELINE_CONFIG = {
+    "version": PIPELINE_VERSION,
+    "ocr_dpi": OCR_DPI,
+    "tesseract_config": TESSERACT_CONFIG,
+    "languages": OCR_LANGUAGES,
+    "min_text_length": MIN_TEXT_LENGTH,
+    "fuzzy_dedup": FUZZY_DEDUP,
+}
+
+# Early exit stops OCR once this many distinct entities (default one) have
+# been found for every critical label. spaCy's NER gives no per-entity confidence, so an
+# entity counts once it has passed the rule engine's validators; contracts
+# have two parties, so one party name is not enough.
+EARLY_EXIT_MIN_COUNTS = {"PARTY_NAME": 2}
+EARLY_EXIT_CHUNK_PAGES = 2
+
+# Each worker runs a small synthetic page through OCR, preprocessing, NER and
+# the rules before taking requests. The first real document would otherwise
+# pay for spaCy's lazy allocations, Tesseract reading its traineddata and
+# OpenCV's first calls.
+WARM_UP = os.environ.get("WARM_UP", "true").lower() in ("1", "true", "yes")
+WARM_UP_LINES = [
+    "LOAN AGREEMENT",
+    "This Agreement is made on 15 January 2024 between",
+    "ABC Corporation Private Limited and XYZ Industries Ltd.",
+    "The total loan amount is INR 10,00,000 at 12.5% per annum.",
+]
+
+nlp = None
+warm_up_seconds = None
+
+
+def load_model(model_path=MODEL_PATH):
+    global nlp
+    if nlp is None and os.path.exists(model_path):
+        nlp = spacy.load(model_path)
+    return nlp
+
+
+def model_version(model_path=MODEL_PATH):
+    # Content hash of the model directory: retrained models keep the same
+    # name and "version" in meta.json, so those cannot be trusted.
+    if not os.path.isdir(model_path):
+        return None
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(model_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, model_path).encode("utf-8"))
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def init_worker(model_path=MODEL_PATH, warm=False):
+    # Tesseract's own threads would oversubscribe the CPUs the pool already uses
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    load_model(model_path)
+    if warm:
+        warm_up()
+
+
+def warm_up():
+    global warm_up_seconds
+    start = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            image_path = os.path.join(directory, "warm-up.png")
+            page = Image.new("RGB", (1275, 400), "white")
+            draw = ImageDraw.Draw(page)
+            for i, line in enumerate(WARM_UP_LINES):
+                draw.text((60, 60 + i * 40), line, fill="black")
+            page.save(image_path)
+            ocr_page(image_path, OCR_LANGUAGES)
+        # The OCR text of a synthetic page is not guaranteed to be long enough
+        # to reach NER, so the known text goes through it instead
+        entities_from_texts([" ".join(WARM_UP_LINES)])
+    except Exception as e:
+        print(f"Warning: warm-up failed in worker {os.getpid()}: {e}")
+    warm_up_seconds = time.perf_counter() - start
+    return warm_up_seconds
+
+
+def worker_status():
+    return os.getpid(), warm_up_seconds
+
+
+def run_task(fn, *args):
+    # What the API submits to its pools: the result, the stage timings and
+    # this worker's rule cache stats for /metrics
+    result, timings = collect_timings(fn, *args)
+    return result, timings, (os.getpid(), get_cache_stats())
+
+
+def extract_text(pdf_path, on_page=None, first_page=None, last_page=None):
+    return extract_text_from_pdf(
+        pdf_path, languages=OCR_LANGUAGES, verbose=False, on_page=on_page,
+        first_page=first_page, last_page=last_page
+    )
+
+
+def parse_page_range(spec):
+    # "3", "2-5", "-4" (up to 4) or "10-" (from 10 on) -> (first, last), 1-based
+    if spec is None or not spec.strip():
+        return None, None
+    first, sep, last = spec.strip().partition("-")
+    try:
+        first = int(first) if first.strip() else None
+        last = int(last) if last.strip() else None
+    except ValueError:
+        raise ValueError(f"Invalid page range: {spec!r}")
+    if not sep:
+        last = first
+    if (first is not None and first < 1) or (last is not None and last < 1) or (first and last and first > last):
+        raise ValueError(f"Invalid page range: {spec!r}")
+    return first, last
+
+
+def deduplicate(entities):
+    return deduplicate_entities(entities, fuzzy=FUZZY_DEDUP)
+
+
+def critical_labels_found(entities, min_counts=EARLY_EXIT_MIN_COUNTS):
+    # Distinct entities: the same party on every page is still one party
+    if FUZZY_DEDUP:
+        entities = deduplicate(entities)
+    counts = {}
+    for label, _ in {(entity["label"], entity["text"].strip().lower()) for entity in entities}:
+        counts[label] = counts.get(label, 0) + 1
+    return all(counts.get(label, 0) >= min_counts.get(label, 1) for label in CRITICAL_LABELS)
+
+
+def page_count(pdf_path):
+    return pdf_page_count(pdf_path)
+
+
+def rasterize(pdf_path, output_folder, first_page=None, last_page=None):
+    return rasterize_pdf(pdf_path, output_folder, first_page=first_page, last_page=last_page)
+
+
+def ocr_image(image_path):
+    # One page of a batch; the image is not needed once it has been read
+    try:
+        return ocr_page(image_path, OCR_LANGUAGES)
+    except Exception as e:
+        print(f"      Warning: Failed to read {os.path.basename(image_path)}. Error: {e}")
+        return None
+    finally:
+        try:
+            os.unlink(image_path)
+        except FileNotFoundError:
+            pass
+
+
+def entities_from_texts(texts, batch_size=NER_BATCH_SIZE):
+    # Texts too short to hold a contract get entities=None. The rest go through
+    # nlp.pipe together and then the rule engine's batch API.
+    results = [{"text_length": len(text or ""), "entities": None} for text in texts]
+    indices = [i for i, text in enumerate(texts) if text and len(text.strip()) >= MIN_TEXT_LENGTH]
+    if not indices:
+        return results
+    if nlp is None:
+        raise RuntimeError(f"Model not loaded from {MODEL_PATH}")
+    with stage("ner"):
+        docs = nlp.pipe((texts[i] for i in indices), batch_size=batch_size)
+        raw_entities = [[(ent.text, ent.label_) for ent in doc.ents] for doc in docs]
+    with stage("rules"):
+        processed = apply_rules_batch(raw_entities, fuzzy=FUZZY_DEDUP)
+    for i, entities in zip(indices, processed):
+        results[i]["entities"] = entities
+    return results
+
+
+def process_page(image_path):
+    # OCR, NER and rules for a single page, so entities can be reported as
+    # soon as that page is read
+    text = ocr_image(image_path)
+    if not text or not text.strip():
+        return {"text": text or "", "entities": []}
+    if nlp is None:
+        raise RuntimeError(f"Model not loaded from {MODEL_PATH}")
+    with stage("ner"):
+        doc = nlp(text)
+        raw_entities = [(ent.text, ent.label_) for ent in doc.ents]
+    with stage("rules"):
+        entities = deduplicate(apply_rules(raw_entities))
+    return {"text": text, "entities": entities}
+
+
+def extract_entities(pdf_path, on_page=None, first_page=None, last_page=None, early_exit=False):
+    pages_total = pdf_page_count(pdf_path)
+    first = min(first_page or 1, pages_total + 1)
+    last = min(last_page or pages_total, pages_total)
+    if early_exit:
+        result = extract_entities_until_critical(pdf_path, first, last, on_page=on_page)
+    else:
+        text = extract_text(pdf_path, on_page=on_page, first_page=first, last_page=last) if first <= last else ""
+        result = entities_from_texts([text])[0]
+        result["pages_processed"] = max(0, last - first + 1)
+        result["stopped_early"] = False
+    result["pages_total"] = pages_total
+    result["pages_skipped"] = pages_total - result["pages_processed"]
+    return result
+
+
+def extract_entities_until_critical(pdf_path, first, last, on_page=None):
+    # Pages are read a couple at a time, each through NER and the rules, until
+    # every critical label is covered; the remaining pages are never rasterized.
+    entities = []
+    text_length = 0
+    pages_processed = 0
+    stopped_early = False
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for chunk_first in range(first, last + 1, EARLY_EXIT_CHUNK_PAGES):
+            chunk_last = min(chunk_first + EARLY_EXIT_CHUNK_PAGES - 1, last)
+            for image_path in rasterize_pdf(pdf_path, temp_dir, first_page=chunk_first, last_page=chunk_last):
+                page = process_page(image_path)
+                pages_processed += 1
+                text_length += len(page["text"])
+                entities.extend(page["entities"])
+                if on_page is not None:
+                    on_page(pages_processed, last - first + 1)
+                if critical_labels_found(entities):
+                    stopped_early = True
+                    break
+            if stopped_early:
+                break
+    return {
+        "text_length": text_length,
+        "entities": deduplicate(entities) if text_length >= MIN_TEXT_LENGTH else None,
+        "pages_processed": pages_processed,
+        "stopped_early": stopped_early
+    }
+
+
+def build_response(filename, result):
+    if result["entities"] is None:
+        return {
+            "success": False,
+            "message": "Failed to extract text from PDF. File may be corrupted or empty.",
+            "entities": [],
+            "metadata": {"filename": filename}
+        }
+    entities = [
+        {"text": e['text'], "label": e['label'], "original_text": e.get('original_text')}
+        for e in result["entities"]
+    ]
+    metadata = {
+        "filename": filename,
+        "text_length": result["text_length"],
+        "entities_found": len(entities),
+        "entities_by_type": {}
+    }
+    for key in ("pages_total", "pages_processed", "pages_skipped", "stopped_early"):
+        if key in result:
+            metadata[key] = result[key]
+    for entity in entities:
+        label = entity["label"]
+        metadata["entities_by_type"][label] = metadata["entities_by_type"].get(label, 0) + 1
+    return {
+        "success": True,
+        "message": f"Successfully extracted {len(entities)} entities",
+        "entities": entities,
+        "metadata": metadata
+    }
+
+
+def run_job(db_path, job_id):
+    store = JobStore(db_path)
+    job = store.get(job_id)
+    if job is None:
+        return CANCELLED
+    try:
+        result = extract_entities(
+            job["input_path"],
+            on_page=lambda done, total: store.update_progress(job_id, done, total)
+        )
+    except JobCancelled:
+        store.remove_upload(job_id)
+        return CANCELLED
+    except Exception as e:
+        store.finish(job_id, FAILED, error=str(e))
+        return FAILED
+    store.finish(job_id, DONE, result=build_response(job["filename"], result))
+    return DONE
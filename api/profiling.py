@@ -0,0 +1,59 @@
+import os
+import io
+import time
+import pstats
+import cProfile
+import secrets
+
+# Opt-in profiling of a single /extract request, for when one tenant's
+# documents are slow and the cause is not obvious from /metrics. The request
+# runs under cProfile in the worker process that does the work, and the stats
+# are written under PROFILE_DIR: a .prof file for snakeviz/pstats and a .txt
+# summary of the top functions. Requests that do not ask for it never touch
+# this module.
+
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+# When set, the X-Profile-Token header must match it as well
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join("var", "profiles"))
+PROFILE_TOP_FUNCTIONS = 40
+
+
+def profile_allowed(token):
+    if not PROFILING_ENABLED:
+        return False
+    return not PROFILE_TOKEN or secrets.compare_digest(token or "", PROFILE_TOKEN)
+
+
+def new_profile_id():
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + secrets.token_hex(4)
+
+
+def profile_path(profile_id, suffix, directory=PROFILE_DIR):
+    # profile_id comes from the URL for downloads; never let it leave the directory
+    if os.path.basename(profile_id) != profile_id or not profile_id:
+        raise ValueError("Invalid profile id")
+    return os.path.join(directory, f"{profile_id}{suffix}")
+
+
+def run_profiled(profile_id, directory, fn, *args):
+    # Runs in the worker, so the profile covers OCR, NER and the rules rather
+    # than the event loop waiting on the pool
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args)
+    finally:
+        os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(profile_path(profile_id, ".prof", directory))
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        with open(profile_path(profile_id, ".txt", directory), "w") as f:
+            f.write(summary.getvalue())
+
+
+def server_timing(timings, total_seconds=None):
+    # Server-Timing header value: one entry per stage, summed over pages, in ms
+    entries = [f"{name};dur={sum(durations) * 1000:.1f}" for name, durations in timings.items()]
+    if total_seconds is not None:
+        entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.manifest import atomic_write_text
+
+# Whole-document results on local disk, one JSON file per key. The key covers
+# the upload's SHA-256, the model and the pipeline config, so retraining the
+# model or changing OCR settings never serves a stale result. Entries expire
+# after a TTL, and the least recently used ones are evicted once the cache
+# grows past its size bound. Several API processes (api/serve.py) may share
+# the directory: lookups go to the file rather than this process's index.
+# The index is kept up to date in memory on every put and discard, and
+# rebuilt from disk every RESULT_CACHE_RESCAN_SECONDS to pick up what the
+# other processes wrote or evicted, so the size bound covers the whole
+# directory (loosely, between rescans). get and put do file I/O; the API
+# calls them in a thread.
+
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", os.path.join("var", "cache", "results"))
+RESULT_CACHE_TTL_SECONDS = float(os.environ.get("RESULT_CACHE_TTL_HOURS", "168")) * 3600
+RESULT_CACHE_MAX_BYTES = int(float(os.environ.get("RESULT_CACHE_MAX_MB", "256")) * 1024 * 1024)
+RESULT_CACHE_RESCAN_SECONDS = float(os.environ.get("RESULT_CACHE_RESCAN_SECONDS", "60"))
+
+
+def cache_key(file_sha256, model_version, config):
+    payload = json.dumps([file_sha256, model_version, config], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory=RESULT_CACHE_DIR, ttl_seconds=RESULT_CACHE_TTL_SECONDS, max_bytes=RESULT_CACHE_MAX_BYTES,
+                 rescan_seconds=RESULT_CACHE_RESCAN_SECONDS):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.rescan_seconds = rescan_seconds
+        self.last_scan = 0.0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # key -> (size, last used); rebuilt from disk so the bound holds across restarts
+        self.index = {}
+        self.total_bytes = 0
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+            with self.lock:
+                self._load_index()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0 and self.ttl_seconds > 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self):
+        self.last_scan = time.monotonic()
+        self.index = {}
+        self.total_bytes = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json") or name.startswith(".tmp-"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            self.index[name[:-len(".json")]] = (stat.st_size, stat.st_mtime)
+            self.total_bytes += stat.st_size
+        self.evict()
+
+    def get(self, key):
+        if not self.enabled:
+            self.misses += 1
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                size = os.fstat(f.fileno()).st_size
+                entry = json.load(f)
+        except FileNotFoundError:
+            with self.lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+        except (OSError, ValueError):
+            with self.lock:
+                self._discard(key)
+                self.misses += 1
+            return None
+        if time.time() - entry["created_at"] > self.ttl_seconds:
+            with self.lock:
+                self._discard(key)
+                self.misses += 1
+            return None
+        now = time.time()
+        # The file mtime doubles as the last-used time for eviction after a restart
+        try:
+            os.utime(self._path(key), (now, now))
+        except OSError:
+            pass
+        with self.lock:
+            self._forget(key)
+            self.index[key] = (size, now)
+            self.total_bytes += size
+            self.hits += 1
+        return entry["value"]
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        text = json.dumps({"created_at": time.time(), "value": value})
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        atomic_write_text(self._path(key), text)
+        with self.lock:
+            self._forget(key)
+            self.index[key] = (size, time.time())
+            self.total_bytes += size
+            # Other processes may have added or evicted entries since
+            if time.monotonic() - self.last_scan >= self.rescan_seconds:
+                self._load_index()
+            else:
+                self.evict()
+
+    def evict(self):
+        now = time.time()
+        for key, (_, last_used) in list(self.index.items()):
+            if now - last_used > self.ttl_seconds:
+                self._discard(key)
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key in sorted(self.index, key=lambda k: self.index[k][1]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._discard(key)
+
+    def _forget(self, key):
+        size, _ = self.index.pop(key, (0, 0))
+        self.total_bytes -= size
+
+    def _discard(self, key):
+        self._forget(key)
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.index),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
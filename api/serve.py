@@ -0,0 +1,286 @@
+import os
+import gc
+import sys
+import time
+import select
+import signal
+import socket
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import uvicorn
+
+from api import main, pipeline, metrics
+from api.jobs import JobStore, JOBS_DB
+
+# Pre-fork launcher for running several API worker processes. `uvicorn
+# --workers N` starts every worker from scratch, so each one loads the spaCy
+# model in its lifespan and keeps a private copy of the weights and vocab.
+# Here the parent loads the model once, binds the socket, and forks the
+# workers, which share the model's memory pages copy-on-write. The kernel
+# spreads connections over the workers accepting on the shared socket.
+#
+# Everything else is per process, so the configured totals are divided
+# between the workers: EXTRACTION_WORKERS and the ADMISSION_* limits are
+# split evenly (at least 1 each), and only the first worker runs the job pool.
+# /metrics is per worker too; every series carries a pid label, so sum over
+# pid rather than reading one scrape as the whole service. The result cache
+# directory is shared.
+#
+#   python api/serve.py --workers 3
+#   python api/serve.py --benchmark 1,2,4        # startup time and memory per worker count
+#   python api/serve.py --benchmark 1,2,4 --no-preload
+
+API_WORKERS = int(os.environ.get("API_WORKERS", "2"))
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", "8000"))
+STARTUP_TIMEOUT_SECONDS = 300
+# A worker that dies sooner than this after starting is restarted with an
+# exponential backoff, so a lifespan that always fails does not fork in a loop
+STABLE_SECONDS = 60.0
+MAX_RESTART_DELAY_SECONDS = 60.0
+# Totals from the environment, divided between the workers by share_settings
+SHARED_SETTINGS = {
+    name: getattr(main, name)
+    for name in ("EXTRACTION_WORKERS", "ADMISSION_MAX_DOCUMENTS", "ADMISSION_MAX_PAGES", "ADMISSION_QUEUE_SIZE")
+}
+MB = 1024 * 1024
+
+
+class WorkerServer(uvicorn.Server):
+    def __init__(self, config, ready_fd):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        # Lifespan (pool, job store, ...) has finished once this returns
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            os.write(self.ready_fd, b".")
+
+
+def bind_socket(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload_model():
+    start = time.perf_counter()
+    nlp = pipeline.load_model(main.MODEL_PATH)
+    if nlp is None:
+        print(f"Warning: Model not found at {main.MODEL_PATH}")
+    # Move everything allocated so far out of the collector's reach: a
+    # collection in a worker would otherwise write to the objects' headers and
+    # un-share the model's pages one by one.
+    gc.freeze()
+    return time.perf_counter() - start
+
+
+def share_settings(workers):
+    # The forked workers inherit these module globals from the parent
+    for name, total in SHARED_SETTINGS.items():
+        setattr(main, name, max(1, total // workers))
+    print(f"Per worker: {main.EXTRACTION_WORKERS} extraction processes, admission "
+          f"{main.ADMISSION_MAX_DOCUMENTS} documents / {main.ADMISSION_MAX_PAGES} pages / "
+          f"{main.ADMISSION_QUEUE_SIZE} queued; jobs on the first worker ({main.JOB_WORKERS} processes)")
+    return main.JOB_WORKERS
+
+
+def requeue_jobs():
+    requeued = JobStore(JOBS_DB).requeue_running()
+    if requeued:
+        print(f"Requeued {requeued} interrupted jobs")
+    main.REQUEUE_JOBS_ON_STARTUP = False
+
+
+def spawn_worker(sock, host, port, ready_fd, job_workers=0):
+    pid = os.fork()
+    if pid:
+        return pid
+    code = 0
+    try:
+        main.JOB_WORKERS = job_workers
+        metrics.registry.const_labels = (("pid", str(os.getpid())),)
+        config = uvicorn.Config(main.app, host=host, port=port, lifespan="on")
+        WorkerServer(config, ready_fd).run(sockets=[sock])
+    except BaseException as e:
+        print(f"Worker {os.getpid()} failed: {e}")
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def wait_until_ready(pids, read_fd, timeout=STARTUP_TIMEOUT_SECONDS):
+    deadline = time.monotonic() + timeout
+    ready = 0
+    while ready < len(pids):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RuntimeError(f"Only {ready} of {len(pids)} workers started within {timeout} s")
+        readable, _, _ = select.select([read_fd], [], [], min(remaining, 1.0))
+        if readable:
+            ready += len(os.read(read_fd, len(pids) - ready))
+            continue
+        for pid in pids:
+            if os.waitpid(pid, os.WNOHANG)[0]:
+                raise RuntimeError(f"Worker {pid} exited during startup")
+
+
+def memory_usage(pid):
+    # From smaps_rollup: PSS splits shared pages between the processes
+    # sharing them, so unlike RSS the workers' PSS adds up to real usage.
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        return None
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+def report_memory(pids):
+    usages = []
+    for pid in pids:
+        usage = memory_usage(pid)
+        if usage is None:
+            continue
+        print(f"  worker {pid}: RSS {usage['rss'] / MB:.0f} MB, PSS {usage['pss'] / MB:.0f} MB, "
+              f"shared {usage['shared'] / MB:.0f} MB")
+        usages.append(usage)
+    return usages
+
+
+def stop_workers(pids, sig=signal.SIGTERM):
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+    for pid in pids:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+
+def restart_delay(failures):
+    return min(2 ** (failures - 1), MAX_RESTART_DELAY_SECONDS) if failures else 0.0
+
+
+def serve(workers, host, port, preload=True):
+    start = time.perf_counter()
+    if preload:
+        print(f"Model loaded in {preload_model():.1f} s")
+    job_workers = share_settings(workers)
+    requeue_jobs()
+    sock = bind_socket(host, port)
+    read_fd, write_fd = os.pipe()
+    # pid -> (index, started at); index 0 is the worker that runs jobs
+    pids = {}
+    for index in range(workers):
+        pid = spawn_worker(sock, host, port, write_fd, job_workers if index == 0 else 0)
+        pids[pid] = (index, time.monotonic())
+    try:
+        wait_until_ready(list(pids), read_fd)
+    except RuntimeError:
+        stop_workers(pids)
+        raise
+    print(f"{workers} workers ready on {host}:{port} in {time.perf_counter() - start:.1f} s")
+    report_memory(list(pids))
+
+    stopping = []
+    failures = {}
+
+    def stop(signum, frame):
+        stopping.append(signum)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while pids:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index, started = pids.pop(pid)
+        if stopping:
+            continue
+        # Replace a crashed worker; it forks from this parent, so it shares
+        # the model like the others
+        failures[index] = failures.get(index, 0) + 1 if time.monotonic() - started < STABLE_SECONDS else 1
+        delay = restart_delay(failures[index] - 1)
+        print(f"Worker {pid} exited with status {status}, restarting in {delay:.0f} s")
+        deadline = time.monotonic() + delay
+        while not stopping and time.monotonic() < deadline:
+            time.sleep(min(0.5, deadline - time.monotonic()))
+        if stopping:
+            break
+        pid = spawn_worker(sock, host, port, write_fd, job_workers if index == 0 else 0)
+        pids[pid] = (index, time.monotonic())
+    sock.close()
+
+
+def benchmark(counts, host, preload=True):
+    # Start and stop the server once per worker count, reporting how long the
+    # workers took to become ready and what they cost in memory
+    results = []
+    load_seconds = preload_model() if preload else 0.0
+    if preload:
+        print(f"Model loaded in {load_seconds:.1f} s")
+    requeue_jobs()
+    for workers in counts:
+        job_workers = share_settings(workers)
+        sock = bind_socket(host, 0)
+        port = sock.getsockname()[1]
+        read_fd, write_fd = os.pipe()
+        start = time.perf_counter()
+        pids = [spawn_worker(sock, host, port, write_fd, job_workers if index == 0 else 0) for index in range(workers)]
+        try:
+            wait_until_ready(pids, read_fd)
+            seconds = time.perf_counter() - start + load_seconds
+            print(f"{workers} workers ready in {seconds:.1f} s")
+            usages = report_memory(pids)
+        finally:
+            stop_workers(pids)
+            sock.close()
+            os.close(read_fd)
+            os.close(write_fd)
+        results.append((workers, seconds, usages))
+
+    print(f"\n{'workers':>7} {'startup s':>9} {'RSS/worker MB':>13} {'PSS/worker MB':>13} {'total PSS MB':>12}")
+    for workers, seconds, usages in results:
+        rss = sum(usage["rss"] for usage in usages) / max(len(usages), 1) / MB
+        pss = sum(usage["pss"] for usage in usages) / MB
+        print(f"{workers:>7} {seconds:>9.1f} {rss:>13.0f} {pss / max(len(usages), 1):>13.0f} {pss:>12.0f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the API in several worker processes sharing one loaded model")
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="API worker processes")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--benchmark", help="Comma-separated worker counts to start, measure and stop, e.g. 1,2,4")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="Let each worker load the model itself, as uvicorn --workers does (for comparison)")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark([int(count) for count in args.benchmark.split(",")], args.host, preload=not args.no_preload)
+    else:
+        serve(max(1, args.workers), args.host, args.port, preload=not args.no_preload)
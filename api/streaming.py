@@ -0,0 +1,103 @@
+import json
+import shutil
+import asyncio
+import tempfile
+
+from api import pipeline
+from api.uploads import UPLOAD_DIR
+
+# /extract-stream reports each page as soon as it has been OCRed and run
+# through NER and the rules, instead of waiting for the whole document.
+# Pages are rasterized in small chunks on the pool so the first page does not
+# wait for the last one to be rendered, and a few chunks are kept in flight so
+# every worker has pages to read. Events are still emitted in page order.
+
+STREAM_CHUNK_PAGES = 4
+STREAM_FORMATS = ("ndjson", "sse")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+
+def encode_event(event, fmt):
+    data = json.dumps(event)
+    if fmt == "sse":
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def process_chunk(pdf_path, first_page, last_page, run_in_pool, work_dir, slots, page_tasks):
+    # page_tasks receives one task per page as soon as the chunk is rendered,
+    # so the stream can report page 1 while the rest of its chunk is read.
+    async with slots:
+        page_dir = tempfile.mkdtemp(dir=work_dir)
+        try:
+            image_paths = await run_in_pool(pipeline.rasterize, pdf_path, page_dir, first_page, last_page)
+            tasks = [asyncio.ensure_future(run_in_pool(pipeline.process_page, path)) for path in image_paths]
+            page_tasks.set_result(tasks)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except BaseException as e:
+            if not page_tasks.done():
+                if isinstance(e, Exception):
+                    page_tasks.set_exception(e)
+                else:
+                    page_tasks.cancel()
+            raise
+        finally:
+            shutil.rmtree(page_dir, ignore_errors=True)
+
+
+async def stream_extraction(filename, pdf_path, run_in_pool, chunks_in_flight, include_text=False, work_dir=UPLOAD_DIR):
+    try:
+        page_total = await run_in_pool(pipeline.page_count, pdf_path)
+    except Exception as e:
+        yield {"event": "error", "detail": f"Error reading PDF: {e}"}
+        return
+    yield {"event": "start", "filename": filename, "pages": page_total}
+
+    slots = asyncio.Semaphore(chunks_in_flight)
+    chunks = [
+        (first, min(first + STREAM_CHUNK_PAGES - 1, page_total))
+        for first in range(1, page_total + 1, STREAM_CHUNK_PAGES)
+    ]
+    loop = asyncio.get_running_loop()
+    chunk_pages = [loop.create_future() for _ in chunks]
+    tasks = [
+        asyncio.ensure_future(process_chunk(pdf_path, first, last, run_in_pool, work_dir, slots, pages))
+        for (first, last), pages in zip(chunks, chunk_pages)
+    ]
+    all_entities = []
+    text_length = 0
+    try:
+        for (first, _), pages in zip(chunks, chunk_pages):
+            try:
+                page_tasks = await pages
+            except Exception as e:
+                yield {"event": "error", "detail": f"Error rendering pages from {first}: {e}"}
+                return
+            for offset, page_task in enumerate(page_tasks):
+                try:
+                    page = await page_task
+                except Exception as e:
+                    yield {"event": "error", "detail": f"Error processing page {first + offset}: {e}"}
+                    return
+                text_length += len(page["text"])
+                all_entities.extend(page["entities"])
+                event = {"event": "page", "page": first + offset, "pages": page_total, "entities": page["entities"]}
+                if include_text:
+                    event["text"] = page["text"]
+                yield event
+    finally:
+        # The client may go away mid-stream; do not keep OCRing for nobody
+        for task in tasks:
+            task.cancel()
+        for pages in chunk_pages:
+            if pages.done() and not pages.cancelled() and pages.exception() is None:
+                for page_task in pages.result():
+                    page_task.cancel()
+
+    result = {"text_length": text_length, "entities": None}
+    if text_length >= pipeline.MIN_TEXT_LENGTH:
+        result["entities"] = pipeline.deduplicate(all_entities)
+    summary = pipeline.build_response(filename, result)
+    summary["event"] = "summary"
+    summary["metadata"]["pages"] = page_total
+    yield summary
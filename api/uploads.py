@@ -0,0 +1,181 @@
+import os
+import hashlib
+import tempfile
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+    from python_multipart.exceptions import FormParserError
+except ImportError:
+    # python-multipart < 0.0.13
+    import multipart
+    from multipart.multipart import parse_options_header
+    from multipart.exceptions import FormParserError
+
+# Uploads are parsed straight off the request stream and each file part is
+# written to its own file under UPLOAD_DIR as it arrives, so the extraction
+# workers (separate processes) can open it by path. Starlette's form parser
+# would spool the part to a temporary file first, which then had to be copied
+# again. The body is counted as it streams in, so a request without
+# Content-Length (chunked) is cut off at the limit as well.
+
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", os.path.join("var", "uploads"))
+MAX_UPLOAD_BYTES = int(float(os.environ.get("MAX_UPLOAD_MB", "200")) * 1024 * 1024)
+CHUNK_SIZE = 1024 * 1024
+# Room for the multipart boundaries and headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class InvalidUpload(Exception):
+    pass
+
+
+class SavedUpload:
+    def __init__(self, filename, path):
+        self.filename = filename
+        self.path = path
+        self.size = 0
+        self.sha256 = None
+
+
+class MultipartReceiver:
+    # python-multipart callbacks: file parts of `field` go to disk, every
+    # other part is skipped
+    def __init__(self, field, suffixes, max_bytes, max_files, directory):
+        self.field = field
+        self.suffixes = suffixes
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.directory = directory
+        self.saved = []
+        self.file = None
+        self.digest = None
+        self.disposition = b""
+        self.header_name = b""
+        self.header_value = b""
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self.disposition = b""
+
+    def on_header_field(self, data, start, end):
+        self.header_name += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        if self.header_name.lower() == b"content-disposition":
+            self.disposition = self.header_value
+        self.header_name = self.header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self.disposition)
+        if options.get(b"name", b"").decode("utf-8", errors="replace") != self.field or b"filename" not in options:
+            return
+        filename = options[b"filename"].decode("utf-8", errors="replace")
+        if not filename.lower().endswith(self.suffixes):
+            names = " and ".join(suffix.lstrip(".").upper() for suffix in self.suffixes)
+            raise InvalidUpload(f"Only {names} files are supported: {filename}")
+        if len(self.saved) >= self.max_files:
+            raise UploadTooLarge(f"A request holds at most {self.max_files} files")
+        fd, path = tempfile.mkstemp(suffix=os.path.splitext(filename)[1].lower(), dir=self.directory)
+        self.saved.append(SavedUpload(filename, path))
+        self.file = os.fdopen(fd, "wb")
+        # Hashed while streaming so the result cache does not read the file again
+        self.digest = hashlib.sha256()
+
+    def on_part_data(self, data, start, end):
+        if self.file is None:
+            return
+        upload = self.saved[-1]
+        upload.size += end - start
+        if upload.size > self.max_bytes:
+            raise UploadTooLarge(f"Upload exceeds the {self.max_bytes // (1024 * 1024)} MB limit")
+        chunk = data[start:end]
+        self.digest.update(chunk)
+        self.file.write(chunk)
+
+    def on_part_end(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.saved[-1].sha256 = self.digest.hexdigest()
+
+
+def exceeds_limit(content_length, max_bytes=MAX_UPLOAD_BYTES):
+    # Early check on the request header, before any of the body is read
+    return content_length is not None and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD
+
+
+async def limited_stream(request, max_bytes=MAX_UPLOAD_BYTES):
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+        yield chunk
+
+
+async def read_body(request, max_bytes=MAX_UPLOAD_BYTES):
+    return b"".join([chunk async for chunk in limited_stream(request, max_bytes)])
+
+
+async def receive_files(request, field="file", suffixes=(".pdf",), max_bytes=MAX_UPLOAD_BYTES,
+                        max_files=1, directory=UPLOAD_DIR):
+    # Returns the SavedUploads of `field` in request order. max_bytes bounds
+    # each file and, with MULTIPART_OVERHEAD, the whole body.
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise InvalidUpload("Expected a multipart/form-data upload")
+    os.makedirs(directory, exist_ok=True)
+    receiver = MultipartReceiver(field, tuple(suffixes), max_bytes, max_files, directory)
+    try:
+        parser = multipart.MultipartParser(params[b"boundary"], receiver.callbacks())
+        async for chunk in limited_stream(request, max_bytes + MULTIPART_OVERHEAD):
+            parser.write(chunk)
+        parser.finalize()
+        if receiver.file is not None:
+            raise InvalidUpload("Upload ended in the middle of a file")
+        if not receiver.saved:
+            raise InvalidUpload(f"No file uploaded in the '{field}' field")
+    except BaseException as e:
+        if receiver.file is not None:
+            receiver.file.close()
+        for upload in receiver.saved:
+            remove_upload(upload.path)
+        if isinstance(e, FormParserError):
+            raise InvalidUpload("Invalid multipart data") from e
+        raise
+    return receiver.saved
+
+
+def openapi_upload(field="file", multiple=False):
+    # The endpoints read the body themselves, so FastAPI cannot describe it
+    schema = {"type": "string", "format": "binary"}
+    if multiple:
+        schema = {"type": "array", "items": schema}
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+        "type": "object", "required": [field], "properties": {field: schema}
+    }}}}}
+
+
+def remove_upload(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
@@ -6,7 +6,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(__file__))
 
 from src.preprocessing.ocr_engine import extract_text_from_pdf
-from src.postprocessing.rule_engine import apply_rules, deduplicate_entities
+from src.postprocessing.rule_engine import apply_rules, deduplicate_entities, CRITICAL_LABELS
 import spacy
 
 
@@ -121,10 +121,9 @@ def analyze_results(entities):
         if entity.get('original_text') and entity['original_text'] != entity['text']:
             print(f"      (cleaned from: {entity['original_text']})")
     
-    critical_entities = ['EFFECTIVE_DATE', 'TOTAL_AMOUNT', 'PARTY_NAME']
-    found_critical = [e for e in entities if e['label'] in critical_entities]
+    found_critical = [e for e in entities if e['label'] in CRITICAL_LABELS]
     
-    print(f"\nCritical Entities Found: {len(found_critical)}/{len(critical_entities)}")
+    print(f"\nCritical Entities Found: {len(found_critical)}/{len(CRITICAL_LABELS)}")
     
     return len(found_critical) > 0
 
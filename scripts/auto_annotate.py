@@ -2,13 +2,70 @@ import spacy
 import re
 import os
 import json
+import sys
+import time
+import argparse
+from bisect import bisect_left
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.postprocessing.span_resolver import resolve_overlaps
+from src.postprocessing.keyword_matcher import KeywordMatcher
+from src.utils.manifest import file_sha256, atomic_write_text, load_manifest, save_manifest
 
 INPUT_DIR = os.path.join("data", "interim")
 OUTPUT_FILE = os.path.join("data", "processed", "train_data.jsonl")
+MANIFEST_FILE = os.path.join("data", "processed", "annotation_manifest.json")
+# Bump when the patterns or the label mapping change so every file is redone.
+ANNOTATOR_VERSION = "3"
+CHECKPOINT_EVERY = 25
+SPACY_MODEL = "en_core_web_sm"
+# Only the entity recognizer is used; everything else is dead weight per document.
+DISABLED_PIPES = ["tagger", "parser", "attribute_ruler", "lemmatizer"]
+N_PROCESS = 1
+BATCH_SIZE = 16
+
+DATE_PATTERNS = [
+    re.compile(r'\b\d{1,2}(?:st|nd|rd|th)?\s+(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{4}\b', re.IGNORECASE),
+    re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', re.IGNORECASE),
+    re.compile(r'\b\d{4}-\d{2}-\d{2}\b', re.IGNORECASE)
+]
+MONEY_PATTERNS = [
+    re.compile(r'(?:Rs\.?|INR|USD|\$|€|£|EUR)\s*\d[\d,]*(?:\.\d{2})?(?:\s*(?:crore|lakh|thousand|million|billion))?', re.IGNORECASE),
+    re.compile(r'\d[\d,]*(?:\.\d{2})?\s*(?:crore|lakh|thousand|million|billion)\s*(?:rupees|dollars|euros)', re.IGNORECASE),
+    re.compile(r'(?:rupees|dollars)\s+\d[\d,]*(?:\.\d{2})?', re.IGNORECASE)
+]
+
+# Phrases that introduce the governing law or the forum. A place spaCy finds
+# is only labeled JURISDICTION when one of them ends at most
+# JURISDICTION_ANCHOR_WINDOW characters before it; elsewhere (registered
+# offices, addresses, places of signing) it is not a jurisdiction. One
+# Aho-Corasick pass over the document finds all of them.
+JURISDICTION_ANCHORS = KeywordMatcher([
+    "laws of", "construed in accordance with",
+    "courts at", "courts of", "courts in", "court at", "court of", "court in",
+    "jurisdiction of", "jurisdiction at", "jurisdiction in",
+    "arbitration at", "arbitration in", "seat of arbitration", "venue of arbitration",
+    "seat of the arbitration", "venue of the arbitration", "place of arbitration",
+], whole_words=True)
+JURISDICTION_ANCHOR_WINDOW = 40
+
+nlp = None
 
-nlp = spacy.load("en_core_web_sm")
+def load_nlp():
+    global nlp
+    if nlp is None:
+        nlp = spacy.load(SPACY_MODEL, disable=DISABLED_PIPES)
+    return nlp
 
-BLACKLIST = {
+def annotator_version():
+    try:
+        model_version = spacy.util.get_package_version(SPACY_MODEL)
+    except Exception:
+        model_version = None
+    return f"{ANNOTATOR_VERSION}/{SPACY_MODEL}-{model_version or 'unknown'}"
+
+BLACKLIST = frozenset({
     "company", "party", "annexes", "agreement", "contract", "hereinafter",
     "schedule", "page", "section", "clause", "eur", "usd", "inr", "jpy",
     "rupees", "rs", "date", "place", "signed", "signature",
@@ -17,7 +74,7 @@ BLACKLIST = {
     "client", "board of directors", "act", "rule", "regulations", "courts",
     "ministry", "department", "state", "central", "herein", "thereof",
     "whereas", "witnesseth", "parties", "undersigned", "executed"
-}
+})
 
 def is_valid_entity(text, label):
     clean = text.lower().strip().replace(".", "").replace(",", "")
@@ -30,46 +87,30 @@ def is_valid_entity(text, label):
         return False
     return True
 
-def find_entities(text):
+def find_entities(text, doc=None):
     labels = []
-    date_patterns = [
-        r'\b\d{1,2}(?:st|nd|rd|th)?\s+(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{4}\b',
-        r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
-        r'\b\d{4}-\d{2}-\d{2}\b'
-    ]
-    for pattern in date_patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
+    for pattern in DATE_PATTERNS:
+        for match in pattern.finditer(text):
             labels.append([match.start(), match.end(), "EFFECTIVE_DATE"])
-    money_patterns = [
-        r'(?:Rs\.?|INR|USD|\$|€|£|EUR)\s*\d[\d,]*(?:\.\d{2})?(?:\s*(?:crore|lakh|thousand|million|billion))?',
-        r'\d[\d,]*(?:\.\d{2})?\s*(?:crore|lakh|thousand|million|billion)\s*(?:rupees|dollars|euros)',
-        r'(?:rupees|dollars)\s+\d[\d,]*(?:\.\d{2})?'
-    ]
-    for pattern in money_patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
+    for pattern in MONEY_PATTERNS:
+        for match in pattern.finditer(text):
             if any(c.isdigit() for c in match.group()):
                 labels.append([match.start(), match.end(), "TOTAL_AMOUNT"])
-    doc = nlp(text)
+    if doc is None:
+        doc = load_nlp()(text)
+    anchor_ends = sorted(end for _, end, _ in JURISDICTION_ANCHORS.find_all(text))
     for ent in doc.ents:
         if not is_valid_entity(ent.text, ent.label_):
             continue
         if ent.label_ in ["ORG", "PERSON"]:
             labels.append([ent.start_char, ent.end_char, "PARTY_NAME"])
-        elif ent.label_ == "GPE":
+        elif ent.label_ == "GPE" and follows_anchor(anchor_ends, ent.start_char):
             labels.append([ent.start_char, ent.end_char, "JURISDICTION"])
-    labels = sorted(labels, key=lambda x: (x[0], -(x[1] - x[0])))
-    final_labels = []
-    for label in labels:
-        start, end, label_type = label
-        is_overlap = False
-        for existing in final_labels:
-            e_start, e_end, _ = existing
-            if start < e_end and end > e_start:
-                is_overlap = True
-                break
-        if not is_overlap:
-            final_labels.append(label)
-    return final_labels
+    return resolve_overlaps(labels)
+
+def follows_anchor(anchor_ends, start):
+    index = bisect_left(anchor_ends, start - JURISDICTION_ANCHOR_WINDOW)
+    return index < len(anchor_ends) and anchor_ends[index] <= start
 
 def is_valid_document(text):
     if len(text.strip()) < 100:
@@ -85,49 +126,151 @@ def is_valid_document(text):
         return False
     return True
 
-def main():
+def read_documents(filenames, on_skip):
+    for filename in filenames:
+        file_path = os.path.join(INPUT_DIR, filename)
+        try:
+            with open(file_path, "r", encoding="utf-8") as f_in:
+                text = f_in.read()
+        except Exception as e:
+            print(f"Error reading {filename}: {e}")
+            on_skip(filename, None)
+            continue
+        
+        # Quality check
+        if not is_valid_document(text):
+            on_skip(filename, "skipped")
+            continue
+        
+        yield text, filename
+
+def find_pending(files, hashes, manifest, version):
+    pending = []
+    for filename in files:
+        entry = manifest.get(filename)
+        if entry is None or entry.get("sha256") != hashes[filename] or entry.get("annotator_version") != version:
+            pending.append(filename)
+    return pending
+
+def rewrite_kept_records(keep_sources):
+    # Records of files about to be (re-)annotated are dropped up front, together
+    # with any partial line left behind by an interrupted run, so re-appending
+    # them afterwards cannot produce duplicates.
+    if not os.path.exists(OUTPUT_FILE):
+        return 0
+    kept = []
+    with open(OUTPUT_FILE, "r", encoding="utf-8") as f_in:
+        for line in f_in:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("source") in keep_sources:
+                kept.append(json.dumps(record) + "\n")
+    atomic_write_text(OUTPUT_FILE, "".join(kept))
+    return len(kept)
+
+def main(n_process=N_PROCESS, batch_size=BATCH_SIZE, force=False):
     if not os.path.exists(INPUT_DIR):
         print(f"Error: {INPUT_DIR} does not exist.")
         return
     
-    files = [f for f in os.listdir(INPUT_DIR) if f.endswith(".txt")]
-    print(f"Auto-annotating {len(files)} documents...")
+    files = sorted(f for f in os.listdir(INPUT_DIR) if f.endswith(".txt"))
+    version = annotator_version()
+    manifest = {} if force or not os.path.exists(OUTPUT_FILE) else load_manifest(MANIFEST_FILE)
+    hashes = {filename: file_sha256(os.path.join(INPUT_DIR, filename)) for filename in files}
+    pending = find_pending(files, hashes, manifest, version)
+    removed = set(manifest) - set(files)
+    
+    if not pending and not removed:
+        print(f"All {len(files)} documents are up to date (annotator {version})")
+        return
+    
+    print(f"Auto-annotating {len(pending)} of {len(files)} documents...")
+    print(f"   Annotator: {version}")
+    print(f"   Workers: {n_process} | Batch size: {batch_size}")
     
-    processed_count = 0
-    skipped_count = 0
+    stats = {"processed": 0, "skipped": 0, "annotated": 0}
     
     # Ensure output directory exists
     output_dir = os.path.dirname(OUTPUT_FILE)
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir, exist_ok=True)
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f_out:
-        for filename in files:
-            file_path = os.path.join(INPUT_DIR, filename)
-            try:
-                with open(file_path, "r", encoding="utf-8") as f_in:
-                    text = f_in.read()
-                
-                # Quality check
-                if not is_valid_document(text):
-                    skipped_count += 1
-                    continue
-                
-                labels = find_entities(text)
-                
-                # Only save documents with entities
-                if labels:
-                    data = {"text": text, "label": labels}
-                    f_out.write(json.dumps(data) + "\n")
-                    processed_count += 1
+    for filename in removed:
+        del manifest[filename]
+    pending_set = set(pending)
+    keep_sources = {f for f in manifest if f not in pending_set}
+    kept = rewrite_kept_records(keep_sources)
+    if kept:
+        print(f"   Keeping {kept} up-to-date records")
+    for filename in pending:
+        manifest.pop(filename, None)
+    save_manifest(manifest, MANIFEST_FILE)
+    
+    def record(filename, status, entities=0):
+        manifest[filename] = {
+            "sha256": hashes[filename],
+            "annotator_version": version,
+            "status": status,
+            "entities": entities,
+            "annotated_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+        if len(manifest) % CHECKPOINT_EVERY == 0:
+            save_manifest(manifest, MANIFEST_FILE)
+    
+    def on_skip(filename, status):
+        stats["skipped"] += 1
+        # Unreadable files are left out of the manifest so they are retried
+        if status:
+            record(filename, status)
+    
+    model = load_nlp()
+    started = time.time()
+    interrupted = False
+    try:
+        with open(OUTPUT_FILE, "a", encoding="utf-8") as f_out:
+            docs = model.pipe(
+                read_documents(pending, on_skip),
+                as_tuples=True,
+                n_process=n_process,
+                batch_size=batch_size
+            )
+            for doc, filename in docs:
+                stats["annotated"] += 1
+                try:
+                    labels = find_entities(doc.text, doc)
                     
-            except Exception as e:
-                print(f"Error processing {filename}: {e}")
-                skipped_count += 1
+                    # Only save documents with entities
+                    if labels:
+                        data = {"text": doc.text, "label": labels, "source": filename}
+                        f_out.write(json.dumps(data) + "\n")
+                        f_out.flush()
+                        stats["processed"] += 1
+                    # The record is on disk before the manifest says so
+                    record(filename, "annotated" if labels else "no_entities", len(labels))
+                        
+                except Exception as e:
+                    print(f"Error processing {filename}: {e}")
+                    stats["skipped"] += 1
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\nInterrupted: progress saved, re-run to resume")
+    finally:
+        save_manifest(manifest, MANIFEST_FILE)
     
-    print(f"Annotation Complete!")
-    print(f"   Processed: {processed_count} documents")
-    print(f"   Skipped: {skipped_count} documents (low quality)")
+    elapsed = time.time() - started
+    throughput = stats["annotated"] / elapsed if elapsed > 0 else 0.0
+    print("Annotation Interrupted!" if interrupted else "Annotation Complete!")
+    print(f"   Processed: {stats['processed']} documents")
+    print(f"   Skipped: {stats['skipped']} documents (low quality)")
+    print(f"   Unchanged: {len(files) - len(pending)} documents")
+    print(f"   Throughput: {throughput:.2f} docs/sec ({stats['annotated']} docs in {elapsed:.1f}s)")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Auto-annotate OCR output for NER training")
+    parser.add_argument("--n-process", type=int, default=N_PROCESS, help="spaCy worker processes for nlp.pipe")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and re-annotate every document")
+    args = parser.parse_args()
+    main(n_process=args.n_process, batch_size=args.batch_size, force=args.force)
@@ -0,0 +1,82 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.postprocessing.keyword_matcher import KeywordMatcher
+from src.postprocessing.rule_based_processer import NOISE_WORDS, NOISE_PATTERN
+
+BLACKLIST = ["company", "party", "agreement", "contract", "hereinafter", "schedule", "page", "section",
+             "clause", "rupees", "date", "place", "signed", "signature", "business", "terms", "client",
+             "board of directors", "courts", "ministry", "department", "whereas", "witnesseth", "parties"]
+PARTY_NAMES = ["The ABC Corporation Private Limited", "XYZ Industries Ltd.", "M/s Bharat Traders Pvt. Ltd.",
+               "Sunrise Infra Company Limited", "Mr. Rajesh Kumar"]
+WORDS = ["the", "party", "shall", "pay", "amount", "within", "days", "of", "notice", "agreement", "lessee",
+         "lessor", "premises", "governed", "by", "laws", "india", "term", "renewal", "indemnify"]
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return time.perf_counter() - started
+
+
+def synthetic_phrases(count, rng):
+    phrases = set()
+    while len(phrases) < count:
+        phrases.add(" ".join(rng.choice(WORDS) + rng.choice("xyzqk") for _ in range(rng.randint(1, 3))))
+    return sorted(phrases)
+
+
+def per_entity(calls):
+    # The hot paths: one short string per entity
+    matcher = KeywordMatcher(NOISE_WORDS)
+    blacklist_set = frozenset(BLACKLIST)
+    blacklist_matcher = KeywordMatcher(BLACKLIST)
+    names = [PARTY_NAMES[i % len(PARTY_NAMES)] for i in range(calls)]
+    words = [BLACKLIST[i % len(BLACKLIST)] if i % 2 else "abc corp" for i in range(calls * 10)]
+    print(f"Per entity ({calls} party names, {calls * 10} blacklist checks)")
+    regex = timed(lambda: [NOISE_PATTERN.sub('', name) for name in names], 1)
+    automaton = timed(lambda: [matcher.remove(name) for name in names], 1)
+    print(f"  noise words:  regex {regex:.3f} s   Aho-Corasick {automaton:.3f} s")
+    lookup = timed(lambda: [word in blacklist_set for word in words], 1)
+    automaton = timed(lambda: [blacklist_matcher.is_keyword(word) for word in words], 1)
+    print(f"  blacklist:    frozenset {lookup:.3f} s   Aho-Corasick {automaton:.3f} s")
+
+
+def whole_document(sizes, document_chars, seed):
+    # Every occurrence of every phrase in a contract-length text
+    rng = random.Random(seed)
+    vocabulary = WORDS + [word + suffix for word in WORDS[:5] for suffix in "xyzqk"]
+    text = " ".join(rng.choice(vocabulary) for _ in range(document_chars // 6))
+    print(f"\nWhole document ({len(text)} chars)")
+    print(f"{'PHRASES':>8} {'N REGEX (ms)':>13} {'ALTERNATION (ms)':>17} {'AHO-CORASICK (ms)':>18}")
+    for size in sizes:
+        phrases = synthetic_phrases(size, rng)
+        patterns = [re.compile(re.escape(phrase), re.IGNORECASE) for phrase in phrases]
+        alternation = re.compile('|'.join(re.escape(p) for p in sorted(phrases, key=len, reverse=True)), re.IGNORECASE)
+        matcher = KeywordMatcher(phrases)
+        separate = timed(lambda: [m.span() for pattern in patterns for m in pattern.finditer(text)], 3) / 3
+        combined = timed(lambda: [m.span() for m in alternation.finditer(text)], 3) / 3
+        automaton = timed(lambda: matcher.find_all(text), 3) / 3
+        print(f"{size:>8} {separate * 1000:>13.1f} {combined * 1000:>17.1f} {automaton * 1000:>18.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark KeywordMatcher against regexes and set lookups")
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--document-chars", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    per_entity(args.calls)
+    whole_document(args.sizes, args.document_chars, args.seed)
+
+
+if __name__ == "__main__":
+    main()
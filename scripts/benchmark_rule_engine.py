@@ -0,0 +1,82 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.postprocessing import rule_engine
+from src.postprocessing.rule_engine import apply_rules, deduplicate_entities
+
+SAMPLE_ENTITIES = [
+    ("15th March 2024", "EFFECTIVE_DATE"),
+    ("31st December 2025", "EXPIRATION_DATE"),
+    ("15/01/2024", "EFFECTIVE_DATE"),
+    ("2024-03-15", "EFFECTIVE_DATE"),
+    ("Rs. 10 lakh", "TOTAL_AMOUNT"),
+    ("INR 5 crore", "TOTAL_AMOUNT"),
+    ("$1,000,000", "TOTAL_AMOUNT"),
+    ("Rs. 50,00,000", "TOTAL_AMOUNT"),
+    ("ABC Corporation Private Limited hereinafter referred to as the Company", "PARTY_NAME"),
+    ("XYZ Industries Ltd.", "PARTY_NAME"),
+    ("M/s Sharma Traders, represented by", "PARTY_NAME"),
+    ("Mumbai", "JURISDICTION"),
+    ("courts of New Delhi", "JURISDICTION"),
+    ("12.5% per annum", "INTEREST_RATE"),
+]
+
+
+def synthetic_documents(count, entities_per_doc, seed):
+    rng = random.Random(seed)
+    return [
+        [rng.choice(SAMPLE_ENTITIES) for _ in range(entities_per_doc)]
+        for _ in range(count)
+    ]
+
+
+def per_document(documents):
+    return [deduplicate_entities(apply_rules(entities)) for entities in documents]
+
+
+def best_of(fn, documents, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(documents)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rule-based post-processing throughput")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--entities-per-doc", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", action="store_true", help="Also print the cost of each label's rule")
+    args = parser.parse_args()
+    documents = synthetic_documents(args.docs, args.entities_per_doc, args.seed)
+    total = args.docs * args.entities_per_doc
+    paths = [("apply_rules + deduplicate_entities per document", per_document)]
+    if hasattr(rule_engine, "apply_rules_batch"):
+        paths.append(("apply_rules_batch (one call)", rule_engine.apply_rules_batch))
+    print(f"{total} entities in {args.docs} documents (best of {args.repeat})")
+    for name, fn in paths:
+        seconds = best_of(fn, documents, args.repeat)
+        print(f"   {name:<50} {total / seconds:>12,.0f} entities/sec")
+    if hasattr(rule_engine, "get_cache_stats"):
+        print("Normalization cache:")
+        for name, stats in rule_engine.get_cache_stats().items():
+            print(f"   {name:<20} hit rate {stats['hit_rate']:.1%} ({stats['size']}/{stats['maxsize']} entries)")
+    if args.profile:
+        processor = rule_engine.RuleBasedProcessor(profile=True)
+        processor.process_batch(documents)
+        print("Per-label rule cost:")
+        for label, timing in processor.rule_profile().items():
+            print(f"   {label:<28} {timing['calls']:>8} calls {timing['us_per_entity']:>8.2f} us/entity")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.postprocessing.span_resolver import resolve_overlaps
+
+LABELS = ["EFFECTIVE_DATE", "TOTAL_AMOUNT", "PARTY_NAME", "JURISDICTION"]
+
+
+def quadratic_resolve(spans):
+    spans = sorted(spans, key=lambda x: (x[0], -(x[1] - x[0])))
+    final = []
+    for span in spans:
+        start, end, _ = span
+        is_overlap = False
+        for e_start, e_end, _ in final:
+            if start < e_end and end > e_start:
+                is_overlap = True
+                break
+        if not is_overlap:
+            final.append(span)
+    return final
+
+
+def synthetic_spans(count, seed):
+    # Roughly what a long contract produces: hits spread over the text with a
+    # fair share of overlaps between regex and NER candidates.
+    rng = random.Random(seed)
+    text_length = count * 40
+    spans = []
+    for _ in range(count):
+        start = rng.randint(0, text_length)
+        spans.append([start, start + rng.randint(3, 60), rng.choice(LABELS)])
+    return spans
+
+
+def timed(fn, spans):
+    started = time.perf_counter()
+    result = fn(spans)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark span overlap resolution")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 25000, 50000, 100000])
+    parser.add_argument("--quadratic-max", type=int, default=25000,
+                        help="Largest size to also run the old quadratic resolver on")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"{'SPANS':>8} {'KEPT':>8} {'SWEEP (ms)':>12} {'QUADRATIC (ms)':>16} {'SPEEDUP':>9}")
+    for size in args.sizes:
+        spans = synthetic_spans(size, args.seed)
+        sweep_seconds, resolved = timed(resolve_overlaps, spans)
+        if size <= args.quadratic_max:
+            quadratic_seconds, expected = timed(quadratic_resolve, spans)
+            if expected != resolved:
+                print(f"MISMATCH at {size} spans")
+                sys.exit(1)
+            quadratic = f"{quadratic_seconds * 1000:>16.1f}"
+            speedup = f"{quadratic_seconds / sweep_seconds:>8.0f}x"
+        else:
+            quadratic = f"{'skipped':>16}"
+            speedup = f"{'-':>9}"
+        print(f"{size:>8} {len(resolved):>8} {sweep_seconds * 1000:>12.1f} {quadratic} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
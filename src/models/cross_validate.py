@@ -0,0 +1,172 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import spacy
+from spacy.scorer import Scorer
+
+from src.models.train_ner import load_doccano_data, build_ner_model, TRAIN_DATA_PATH, ITERATIONS, DROPOUT
+from src.models.evaluate_model import create_examples, calculate_entity_f1
+
+DEFAULT_FOLDS = 5
+DEFAULT_SEED = 42
+
+
+def document_key(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def assign_folds(data, k):
+    # Order by content hash, then deal round-robin: the assignment depends only
+    # on the documents themselves, so two model versions evaluated on the same
+    # corpus see exactly the same folds and their scores can be compared pairwise.
+    order = sorted(range(len(data)), key=lambda i: document_key(data[i][0]))
+    folds = [[] for _ in range(k)]
+    for position, index in enumerate(order):
+        folds[position % k].append(data[index])
+    return folds
+
+
+def run_fold(fold_index, folds, labels, iterations, dropout, seed):
+    random.seed(seed + fold_index)
+    spacy.util.fix_random_seed(seed + fold_index)
+    test_data = folds[fold_index]
+    train_data = [item for i, fold in enumerate(folds) if i != fold_index for item in fold]
+    started = time.time()
+    nlp = build_ner_model(train_data, iterations=iterations, dropout=dropout, verbose=False)
+    if nlp is None:
+        return {"fold": fold_index, "error": "no valid training examples"}
+    examples = create_examples(nlp, test_data)
+    if len(examples) == 0:
+        return {"fold": fold_index, "error": "no valid test examples"}
+    overall = Scorer().score(examples)
+    return {
+        "fold": fold_index,
+        "train_docs": len(train_data),
+        "test_docs": len(test_data),
+        "seconds": time.time() - started,
+        "overall": {
+            "precision": overall["ents_p"] or 0.0,
+            "recall": overall["ents_r"] or 0.0,
+            "f1": overall["ents_f"] or 0.0,
+        },
+        "per_label": calculate_entity_f1(examples, labels),
+    }
+
+
+def summarize(values):
+    mean = statistics.mean(values) if values else 0.0
+    variance = statistics.variance(values) if len(values) > 1 else 0.0
+    return {"mean": mean, "variance": variance, "std": variance ** 0.5}
+
+
+def aggregate(fold_results, labels):
+    completed = [r for r in fold_results if "error" not in r]
+    summary = {
+        "overall": {
+            metric: summarize([r["overall"][metric] for r in completed])
+            for metric in ("precision", "recall", "f1")
+        },
+        "per_label": {},
+    }
+    for label in labels:
+        summary["per_label"][label] = {
+            metric: summarize([r["per_label"][label][metric] for r in completed])
+            for metric in ("precision", "recall", "f1")
+        }
+        summary["per_label"][label]["support"] = sum(r["per_label"][label]["support"] for r in completed)
+    return summary
+
+
+def cross_validate(k=DEFAULT_FOLDS, workers=None, iterations=ITERATIONS, dropout=DROPOUT,
+                   seed=DEFAULT_SEED, data_path=TRAIN_DATA_PATH, output_path=None):
+    data = load_doccano_data(data_path)
+    if len(data) < k:
+        print(f"Error: Need at least {k} documents for {k}-fold cross-validation (found {len(data)})")
+        return None
+    labels = sorted({label for _, annots in data for _, _, label in annots["entities"]})
+    folds = assign_folds(data, k)
+    workers = workers or min(k, os.cpu_count() or 1)
+    print(f"Running {k}-fold cross-validation on {len(data)} documents")
+    print(f"   Workers: {workers}")
+    print(f"   Iterations: {iterations}")
+    print(f"   Fold sizes: {[len(f) for f in folds]}")
+    print("=" * 60)
+    started = time.time()
+    fold_results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_fold, i, folds, labels, iterations, dropout, seed)
+            for i in range(k)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            fold_results.append(result)
+            if "error" in result:
+                print(f"Fold {result['fold'] + 1}/{k}: skipped ({result['error']})")
+            else:
+                print(f"Fold {result['fold'] + 1}/{k}: F1 {result['overall']['f1']:.2%} "
+                      f"({result['test_docs']} test docs, {result['seconds']:.1f}s)")
+    fold_results.sort(key=lambda r: r["fold"])
+    summary = aggregate(fold_results, labels)
+    print("\n" + "=" * 60)
+    print("CROSS-VALIDATION SUMMARY")
+    print("=" * 60)
+    overall_f1 = summary["overall"]["f1"]
+    print(f"Overall F1: {overall_f1['mean']:.2%} (variance {overall_f1['variance']:.4f}, std {overall_f1['std']:.2%})")
+    print()
+    print(f"{'LABEL':<28} {'P mean':>8} {'R mean':>8} {'F1 mean':>8} {'F1 var':>8} {'Support':>8}")
+    for label in labels:
+        scores = summary["per_label"][label]
+        print(f"{label:<28} {scores['precision']['mean']:>8.2%} {scores['recall']['mean']:>8.2%} "
+              f"{scores['f1']['mean']:>8.2%} {scores['f1']['variance']:>8.4f} {scores['support']:>8}")
+    print(f"\nTotal time: {time.time() - started:.1f}s")
+    report = {
+        "k": k,
+        "seed": seed,
+        "iterations": iterations,
+        "dropout": dropout,
+        "documents": len(data),
+        "folds": fold_results,
+        "summary": summary,
+    }
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to: {output_path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel k-fold cross-validation of the NER model")
+    parser.add_argument("--folds", "-k", type=int, default=DEFAULT_FOLDS)
+    parser.add_argument("--workers", type=int, default=None, help="Processes to use (default: one per fold, capped at CPU count)")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--dropout", type=float, default=DROPOUT)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--data", default=TRAIN_DATA_PATH)
+    parser.add_argument("--output", default=None, help="Write per-fold scores and summary as JSON")
+    args = parser.parse_args()
+    if args.folds < 2:
+        parser.error("--folds must be at least 2")
+    cross_validate(
+        k=args.folds,
+        workers=args.workers,
+        iterations=args.iterations,
+        dropout=args.dropout,
+        seed=args.seed,
+        data_path=args.data,
+        output_path=args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
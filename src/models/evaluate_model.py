@@ -8,6 +8,7 @@ import random
 MODEL_PATH = os.path.join("models", "ner_model_v1")
 TEST_DATA_PATH = os.path.join("data", "processed", "train_data.jsonl")
 TEST_SPLIT = 0.2
+EVAL_LABELS = ["PARTY_NAME", "EFFECTIVE_DATE", "TOTAL_AMOUNT", "JURISDICTION"]
 
 def load_test_data(file_path, split_ratio=0.2):
     all_data = []
@@ -45,9 +46,9 @@ def create_examples(nlp, test_data):
             examples.append(example)
     return examples
 
-def calculate_entity_f1(examples):
+def calculate_entity_f1(examples, labels=EVAL_LABELS):
     scores_per_label = {}
-    for label in ["PARTY_NAME", "EFFECTIVE_DATE", "TOTAL_AMOUNT", "JURISDICTION"]:
+    for label in labels:
         tp = 0
         fp = 0
         fn = 0
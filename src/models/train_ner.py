@@ -57,54 +57,65 @@ def create_training_examples(nlp, train_data):
         print(f"Dropped {dropped_docs} documents with no valid entities")
     return examples
 
-def train_model():
-    TRAIN_DATA = load_doccano_data(TRAIN_DATA_PATH)
-    if len(TRAIN_DATA) == 0:
-        print("No training data found. Exiting.")
-        return
-    if len(TRAIN_DATA) < 20:
-        print("WARNING: Very small training set. Results may be poor.")
-        print("Recommended: At least 50-100 annotated documents")
+def build_ner_model(train_data, iterations=ITERATIONS, dropout=DROPOUT, verbose=True):
     nlp = spacy.blank("en")
     if "ner" not in nlp.pipe_names:
         ner = nlp.add_pipe("ner", last=True)
     else:
         ner = nlp.get_pipe("ner")
-    print("Adding entity labels...")
+    if verbose:
+        print("Adding entity labels...")
     labels_added = set()
-    for _, annotations in TRAIN_DATA:
+    for _, annotations in train_data:
         for start, end, label in annotations.get("entities"):
             if label not in labels_added:
                 ner.add_label(label)
                 labels_added.add(label)
-                print(f"   + {label}")
-    examples = create_training_examples(nlp, TRAIN_DATA)
+                if verbose:
+                    print(f"   + {label}")
+    examples = create_training_examples(nlp, train_data)
     if len(examples) == 0:
         print("CRITICAL: No valid training examples created!")
         print("This usually means entity positions don't align with text.")
-        return
-    print(f"Training on {len(examples)} valid examples...")
-    print(f"   Iterations: {ITERATIONS}")
-    print(f"   Dropout: {DROPOUT}")
+        return None
+    if verbose:
+        print(f"Training on {len(examples)} valid examples...")
+        print(f"   Iterations: {iterations}")
+        print(f"   Dropout: {dropout}")
     other_pipes = [pipe for pipe in nlp.pipe_names if pipe != "ner"]
     with nlp.disable_pipes(*other_pipes):
         optimizer = nlp.initialize()
-        print("Training Progress:")
-        print("-" * 50)
-        for iteration in range(ITERATIONS):
+        if verbose:
+            print("Training Progress:")
+            print("-" * 50)
+        for iteration in range(iterations):
             random.shuffle(examples)
             losses = {}
             batches = minibatch(examples, size=compounding(4.0, 32.0, 1.001))
             for batch in batches:
                 nlp.update(
                     batch,
-                    drop=DROPOUT,
+                    drop=dropout,
                     losses=losses
                 )
-            if (iteration + 1) % 5 == 0 or iteration == 0:
+            if verbose and ((iteration + 1) % 5 == 0 or iteration == 0):
                 loss_value = losses.get('ner', 0.0)
-                print(f"Epoch {iteration + 1:02d}/{ITERATIONS} | Loss: {loss_value:.4f}")
-        print("-" * 50)
+                print(f"Epoch {iteration + 1:02d}/{iterations} | Loss: {loss_value:.4f}")
+        if verbose:
+            print("-" * 50)
+    return nlp
+
+def train_model():
+    TRAIN_DATA = load_doccano_data(TRAIN_DATA_PATH)
+    if len(TRAIN_DATA) == 0:
+        print("No training data found. Exiting.")
+        return
+    if len(TRAIN_DATA) < 20:
+        print("WARNING: Very small training set. Results may be poor.")
+        print("Recommended: At least 50-100 annotated documents")
+    nlp = build_ner_model(TRAIN_DATA)
+    if nlp is None:
+        return
     if not os.path.exists(MODEL_OUTPUT_DIR):
         os.makedirs(MODEL_OUTPUT_DIR)
     nlp.to_disk(MODEL_OUTPUT_DIR)
@@ -113,6 +124,7 @@ def train_model():
     print(f"Next steps:")
     print(f"   1. Run: python src/models/test_model.py")
     print(f"   2. Run: python src/models/evaluate_model.py")
+    print(f"   3. Run: python src/models/cross_validate.py")
 
 if __name__ == "__main__":
     train_model()
\ No newline at end of file
@@ -0,0 +1,93 @@
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List
+
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_FUZZY_LABELS = ('PARTY_NAME',)
+
+# Legal-form words collapse to one spelling and are then set aside, so
+# "ABC Corp", "ABC Corp." and "ABC Corporation" all reduce to "abc".
+LEGAL_SUFFIXES = {
+    'corporation': 'corp', 'corp': 'corp',
+    'incorporated': 'inc', 'inc': 'inc',
+    'limited': 'ltd', 'ltd': 'ltd',
+    'private': 'pvt', 'pvt': 'pvt',
+    'company': 'co', 'co': 'co',
+    'llp': 'llp', 'llc': 'llc', 'plc': 'plc',
+}
+LEADING_NOISE = re.compile(r'^\s*(?:m/s\.?|the)\s+', re.IGNORECASE)
+NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def name_tokens(text: str) -> List[str]:
+    text = LEADING_NOISE.sub('', text.lower())
+    return [LEGAL_SUFFIXES.get(token, token) for token in NON_WORD.split(text) if token]
+
+
+def core_name(text: str) -> str:
+    tokens = name_tokens(text)
+    core = [token for token in tokens if token not in LEGAL_SUFFIXES.values()]
+    # A name made only of suffix words ("The Company") keeps them
+    return ' '.join(core or tokens)
+
+
+class _Cluster:
+    def __init__(self, key: str, index: int):
+        self.key = key
+        self.first_index = index
+        self.members = []
+
+
+def _pick_representative(members: List[Dict], keep: str) -> Dict:
+    if keep == 'frequent':
+        counts = {}
+        for entity in members:
+            counts[entity['text']] = counts.get(entity['text'], 0) + 1
+        return max(members, key=lambda e: (counts[e['text']], len(e['text'])))
+    return max(members, key=lambda e: len(e['text']))
+
+
+def fuzzy_deduplicate(entities: List[Dict], threshold: float = DEFAULT_THRESHOLD,
+                      labels: Iterable[str] = DEFAULT_FUZZY_LABELS, keep: str = 'longest') -> List[Dict]:
+    # Candidates are blocked by label and by the first word of their core
+    # name, and only compared within a block. Identical core names are matched
+    # through a dict; the similarity ratio is computed only against the few
+    # other clusters in the same block, which keeps a batch near-linear
+    # instead of comparing every pair.
+    if keep not in ('longest', 'frequent'):
+        raise ValueError(f"keep must be 'longest' or 'frequent', got {keep!r}")
+    labels = set(labels)
+    output = []
+    clusters_by_key = {}
+    blocks = {}
+    exact_seen = set()
+    for index, entity in enumerate(entities):
+        label = entity['label']
+        # A name with no word left to compare ("M/s.", "&") is kept and
+        # deduplicated on its exact text, like the labels not matched fuzzily
+        core = core_name(entity['text']) if label in labels else None
+        if not core:
+            key = (entity['text'].lower().strip(), label)
+            if key not in exact_seen:
+                exact_seen.add(key)
+                output.append((index, entity))
+            continue
+        cluster = clusters_by_key.get((label, core))
+        if cluster is None:
+            block = blocks.setdefault((label, core.split(' ', 1)[0]), [])
+            for candidate in block:
+                if SequenceMatcher(None, core, candidate.key).ratio() >= threshold:
+                    cluster = candidate
+                    break
+            if cluster is None:
+                cluster = _Cluster(core, index)
+                block.append(cluster)
+            clusters_by_key[(label, core)] = cluster
+        cluster.members.append(entity)
+    seen_clusters = set()
+    for cluster in clusters_by_key.values():
+        if id(cluster) not in seen_clusters:
+            seen_clusters.add(id(cluster))
+            output.append((cluster.first_index, _pick_representative(cluster.members, keep)))
+    output.sort(key=lambda item: item[0])
+    return [entity for _, entity in output]
@@ -0,0 +1,117 @@
+from collections import deque
+from typing import Iterable, List, Tuple
+
+from .span_resolver import resolve_overlaps
+
+
+class KeywordMatcher:
+    # Aho-Corasick automaton over a fixed phrase list: one pass over the text
+    # finds every occurrence of every phrase, however many phrases there are.
+    # Build it once (module level) and share it; matching never mutates it.
+    # The pass is pure Python, so it only pays off for scans of whole documents
+    # against more than a few dozen phrases; for short per-entity strings a
+    # compiled regex or a set lookup is faster
+    # (scripts/benchmark_keyword_matcher.py).
+    def __init__(self, phrases: Iterable[str], ignore_case: bool = True, whole_words: bool = False):
+        self.ignore_case = ignore_case
+        self.whole_words = whole_words
+        self.phrases = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        self._terminal = [None]
+        for phrase in phrases:
+            self._add(phrase)
+        self._build_failure_links()
+
+    def _normalize(self, text: str) -> str:
+        if not self.ignore_case:
+            return text
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered
+        # A few characters lowercase to two; keep offsets aligned with the input
+        return ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+    def _add(self, phrase: str):
+        key = self._normalize(phrase)
+        if not key:
+            return
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._terminal.append(None)
+            state = next_state
+        if self._terminal[state] is None:
+            self._terminal[state] = len(self.phrases)
+            self._output[state] = (len(self.phrases),)
+            self.phrases.append(phrase)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def _is_boundary(self, text: str, start: int, end: int) -> bool:
+        before = text[start - 1] if start > 0 else ' '
+        after = text[end] if end < len(text) else ' '
+        return not before.isalnum() and not after.isalnum()
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        # Every occurrence, overlapping ones included, as (start, end, phrase)
+        matches = []
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(self._normalize(text)):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                phrase = self.phrases[index]
+                start = position + 1 - len(self._normalize(phrase))
+                if self.whole_words and not self._is_boundary(text, start, position + 1):
+                    continue
+                matches.append((start, position + 1, phrase))
+        return matches
+
+    def find_longest(self, text: str) -> List[Tuple[int, int, str]]:
+        # Non-overlapping matches, leftmost and then longest first
+        return resolve_overlaps(self.find_all(text))
+
+    def contains_any(self, text: str) -> bool:
+        return bool(self.find_all(text))
+
+    def is_keyword(self, text: str) -> bool:
+        # Exact match against the phrase list: a walk down the trie
+        state = 0
+        for char in self._normalize(text):
+            state = self._goto[state].get(char)
+            if state is None:
+                return False
+        return self._terminal[state] is not None
+
+    def remove(self, text: str) -> str:
+        pieces = []
+        last = 0
+        for start, end, _ in self.find_longest(text):
+            pieces.append(text[last:start])
+            last = end
+        pieces.append(text[last:])
+        return ''.join(pieces)
@@ -0,0 +1,142 @@
+import re
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+# Declarative per-label rules. Each label maps to the validators an entity
+# must pass and the normalizer that produces (text, original_text). The table
+# is built once at import and looked up with a dict, so adding a label costs
+# nothing for the others, and every normalizer is its own function that shows
+# up separately in a profile.
+
+Validator = Callable[[str], bool]
+Normalizer = Callable[[object, str], Tuple[str, Optional[str]]]
+
+MIN_ENTITY_LENGTH = 2
+# A contract is only usable downstream once these have been found
+CRITICAL_LABELS = ['EFFECTIVE_DATE', 'TOTAL_AMOUNT', 'PARTY_NAME']
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+PERCENT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:%|percent\b|per\s*cent\b)', re.IGNORECASE)
+RATE_PERIOD_PATTERNS = [
+    (re.compile(r'per\s+annum|p\.?\s?a\b\.?|annual(?:ly)?|per\s+year', re.IGNORECASE), 'per annum'),
+    (re.compile(r'per\s+month|p\.?\s?m\b\.?|monthly', re.IGNORECASE), 'per month'),
+    (re.compile(r'per\s+day|daily', re.IGNORECASE), 'per day'),
+]
+DURATION_PATTERN = re.compile(r'(?:(\d+)|\b([a-z]+(?:[\s-][a-z]+)?))\s*(?:\(\s*\d+\s*\)\s*)?(day|week|month|year)s?\b', re.IGNORECASE)
+GOVERNING_LAW_PREFIX = re.compile(r'^.*?\blaws?\s+(?:in\s+force\s+in|of)\s+(?:the\s+)?', re.IGNORECASE)
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'fifteen': 15, 'eighteen': 18, 'twenty': 20, 'twenty-four': 24, 'thirty': 30,
+    'thirty-six': 36, 'forty-five': 45, 'sixty': 60, 'ninety': 90,
+    'a': 1, 'an': 1,
+}
+
+
+class LabelRule(NamedTuple):
+    validators: Tuple[Validator, ...]
+    normalizer: Normalizer
+
+
+def has_digit(text: str) -> bool:
+    return any(c.isdigit() for c in text)
+
+
+def has_alpha(text: str) -> bool:
+    return any(c.isalpha() for c in text)
+
+
+def min_length(length: int) -> Validator:
+    def validator(text: str) -> bool:
+        return len(text) >= length
+    validator.__name__ = f"min_length_{length}"
+    return validator
+
+
+def min_alpha_ratio(ratio: float) -> Validator:
+    def validator(text: str) -> bool:
+        return sum(c.isalpha() or c.isspace() for c in text) / len(text) >= ratio
+    validator.__name__ = f"min_alpha_ratio_{ratio}"
+    return validator
+
+
+def has_number(text: str) -> bool:
+    return has_digit(text) or any(word in NUMBER_WORDS for word in text.lower().replace('-', ' ').split())
+
+
+def keep_text(processor, text: str) -> Tuple[str, Optional[str]]:
+    return text, None
+
+
+def normalize_date(processor, text: str) -> Tuple[str, Optional[str]]:
+    return processor.normalize_date(text), text
+
+
+def normalize_amount(processor, text: str) -> Tuple[str, Optional[str]]:
+    amount_data = processor.normalize_amount(text)
+    return f"{amount_data['currency']} {amount_data['normalized']}", amount_data['raw']
+
+
+def normalize_party_name(processor, text: str) -> Tuple[str, Optional[str]]:
+    cleaned = processor.clean_party_name(text)
+    return cleaned, text if cleaned != text else None
+
+
+def normalize_interest_rate(processor, text: str) -> Tuple[str, Optional[str]]:
+    match = PERCENT_PATTERN.search(text)
+    if not match:
+        return text, None
+    normalized = f"{float(match.group(1)):g}%"
+    for pattern, period in RATE_PERIOD_PATTERNS:
+        if pattern.search(text):
+            normalized = f"{normalized} {period}"
+            break
+    return normalized, text if normalized != text else None
+
+
+def normalize_duration(processor, text: str) -> Tuple[str, Optional[str]]:
+    # "thirty (30) days", "30 days'", "a period of six months" -> "30 days", "6 months"
+    match = DURATION_PATTERN.search(text)
+    if not match:
+        return collapse_whitespace(processor, text)
+    if match.group(1):
+        value = int(match.group(1))
+    else:
+        words = match.group(2).lower().replace(' ', '-')
+        value = NUMBER_WORDS.get(words, NUMBER_WORDS.get(words.split('-')[-1]))
+        if value is None:
+            return collapse_whitespace(processor, text)
+    unit = match.group(3).lower()
+    normalized = f"{value} {unit}{'' if value == 1 else 's'}"
+    return normalized, text if normalized != text else None
+
+
+def normalize_governing_law(processor, text: str) -> Tuple[str, Optional[str]]:
+    # "governed by the laws of the Republic of India" -> "Republic of India"
+    stripped = WHITESPACE_PATTERN.sub(' ', text).strip().rstrip(',.;:')
+    cleaned = GOVERNING_LAW_PREFIX.sub('', stripped) or stripped
+    return cleaned, text if cleaned != text else None
+
+
+def collapse_whitespace(processor, text: str) -> Tuple[str, Optional[str]]:
+    cleaned = WHITESPACE_PATTERN.sub(' ', text).strip().rstrip(',;:')
+    return cleaned, text if cleaned != text else None
+
+
+DATE_RULE = LabelRule((has_digit, min_length(6)), normalize_date)
+DURATION_RULE = LabelRule((has_number,), normalize_duration)
+
+LABEL_RULES: Dict[str, LabelRule] = {
+    'PARTY_NAME': LabelRule((has_alpha, min_length(3)), normalize_party_name),
+    'EFFECTIVE_DATE': DATE_RULE,
+    'EXPIRATION_DATE': DATE_RULE,
+    'JURISDICTION': LabelRule((min_alpha_ratio(0.5),), keep_text),
+    'TOTAL_AMOUNT': LabelRule((has_digit,), normalize_amount),
+    'INTEREST_RATE': LabelRule((has_digit,), normalize_interest_rate),
+    'COLLATERAL': LabelRule((has_alpha, min_length(3)), collapse_whitespace),
+    'CONFIDENTIALITY_PERIOD': DURATION_RULE,
+    'TERMINATION_NOTICE_PERIOD': DURATION_RULE,
+    'GOVERNING_LAW': LabelRule((has_alpha, min_alpha_ratio(0.5)), normalize_governing_law),
+}
+
+# Labels the model may emit that have no entry above are only length-checked
+DEFAULT_RULE = LabelRule((), keep_text)
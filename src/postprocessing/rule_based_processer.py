@@ -1,45 +1,140 @@
+import os
 import re
+import time
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import Any, Callable, Iterable, List, Dict, Optional, Tuple
+
+from .fuzzy_dedup import fuzzy_deduplicate, DEFAULT_THRESHOLD, DEFAULT_FUZZY_LABELS
+from .label_rules import LABEL_RULES, DEFAULT_RULE, MIN_ENTITY_LENGTH
+
+DEFAULT_CACHE_SIZE = int(os.environ.get("RULE_CACHE_SIZE", "4096"))
+
+# Compiled once at import: the processor is shared (see get_processor) and
+# these run for every entity of every document.
+DATE_PATTERNS = [
+    (re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)?\s+(Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+(\d{4})\b', re.IGNORECASE), '%d %B %Y'),
+    (re.compile(r'\b(\d{1,2})[/-](\d{1,2})[/-](\d{4})\b', re.IGNORECASE), '%d/%m/%Y'),
+    (re.compile(r'\b(\d{4})-(\d{2})-(\d{2})\b', re.IGNORECASE), '%Y-%m-%d'),
+]
+
+MONTH_MAP = {
+    'jan': '01', 'january': '01',
+    'feb': '02', 'february': '02',
+    'mar': '03', 'march': '03',
+    'apr': '04', 'april': '04',
+    'may': '05',
+    'jun': '06', 'june': '06',
+    'jul': '07', 'july': '07',
+    'aug': '08', 'august': '08',
+    'sep': '09', 'september': '09',
+    'oct': '10', 'october': '10',
+    'nov': '11', 'november': '11',
+    'dec': '12', 'december': '12',
+}
+
+NOISE_WORDS = [
+    'hereinafter', 'referred to as', 'the party', 'party of',
+    'witnesseth', 'whereas', 'represented by'
+]
+
+MONTH_NAME_PATTERN = re.compile('|'.join(MONTH_MAP))
+DATE_SEPARATOR_PATTERN = re.compile('[/-]')
+NON_NUMERIC_PATTERN = re.compile(r'[^\d,.]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+NOISE_PATTERN = re.compile('|'.join(NOISE_WORDS), re.IGNORECASE)
+
+
+class NormalizationCache:
+    # Bounded LRU in front of a normalizer. Contracts repeat the same dates,
+    # amounts and counterparties over and over, so most lookups are hits.
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key: str, compute: Callable[[str], Any]) -> Any:
+        if self.maxsize <= 0:
+            return compute(key)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute(key)
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
 
 class RuleBasedProcessor:
-    def __init__(self):
-        self.date_patterns = [
-            (r'\b(\d{1,2})(?:st|nd|rd|th)?\s+(Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+(\d{4})\b', '%d %B %Y'),
-            (r'\b(\d{1,2})[/-](\d{1,2})[/-](\d{4})\b', '%d/%m/%Y'),
-            (r'\b(\d{4})-(\d{2})-(\d{2})\b', '%Y-%m-%d'),
-        ]
-        
-        self.month_map = {
-            'jan': '01', 'january': '01',
-            'feb': '02', 'february': '02',
-            'mar': '03', 'march': '03',
-            'apr': '04', 'april': '04',
-            'may': '05',
-            'jun': '06', 'june': '06',
-            'jul': '07', 'july': '07',
-            'aug': '08', 'august': '08',
-            'sep': '09', 'september': '09',
-            'oct': '10', 'october': '10',
-            'nov': '11', 'november': '11',
-            'dec': '12', 'december': '12',
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE, profile: bool = False):
+        self.date_patterns = DATE_PATTERNS
+        self.month_map = MONTH_MAP
+        self.rules = LABEL_RULES
+        self.profile = profile
+        self.rule_timings = {}
+        self.caches = {
+            'normalize_date': NormalizationCache(cache_size),
+            'normalize_amount': NormalizationCache(cache_size),
+            'clean_party_name': NormalizationCache(cache_size),
         }
     
     def normalize_date(self, date_str: str) -> str:
+        return self.caches['normalize_date'].get_or_compute(date_str, self._normalize_date)
+    
+    def normalize_amount(self, amount_str: str) -> Dict[str, str]:
+        # Callers get their own dict so they cannot alter the cached entry
+        return dict(self.caches['normalize_amount'].get_or_compute(amount_str, self._normalize_amount))
+    
+    def clean_party_name(self, party_str: str) -> str:
+        return self.caches['clean_party_name'].get_or_compute(party_str, self._clean_party_name)
+    
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: cache.stats() for name, cache in self.caches.items()}
+    
+    def clear_caches(self):
+        for cache in self.caches.values():
+            cache.clear()
+    
+    def _normalize_date(self, date_str: str) -> str:
         date_str = date_str.strip()
         
         for pattern, fmt in self.date_patterns:
-            match = re.search(pattern, date_str, re.IGNORECASE)
+            match = pattern.search(date_str)
             if match:
                 try:
-                    if any(month in date_str.lower() for month in self.month_map):
+                    if MONTH_NAME_PATTERN.search(date_str.lower()):
                         day = match.group(1)
                         month = self.month_map[match.group(2).lower()[:3]]
                         year = match.group(3)
                         return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
                     
                     if '/' in date_str or '-' in date_str:
-                        parts = re.split('[/-]', date_str)
+                        parts = DATE_SEPARATOR_PATTERN.split(date_str)
                         if len(parts) == 3:
                             if len(parts[0]) == 4:
                                 return f"{parts[0]}-{parts[1].zfill(2)}-{parts[2].zfill(2)}"
@@ -50,7 +145,7 @@ class RuleBasedProcessor:
         
         return date_str
     
-    def normalize_amount(self, amount_str: str) -> Dict[str, str]:
+    def _normalize_amount(self, amount_str: str) -> Dict[str, str]:
         amount_str = amount_str.strip()
         
         currency = 'INR'
@@ -61,7 +156,7 @@ class RuleBasedProcessor:
         elif any(x in amount_str.upper() for x in ['GBP', '£']):
             currency = 'GBP'
         
-        numeric = re.sub(r'[^\d,.]', '', amount_str)
+        numeric = NON_NUMERIC_PATTERN.sub('', amount_str)
         numeric = numeric.replace(',', '')
         
         multiplier = 1
@@ -91,87 +186,94 @@ class RuleBasedProcessor:
                 'currency': currency
             }
     
-    def clean_party_name(self, party_str: str) -> str:
-        noise_words = [
-            'hereinafter', 'referred to as', 'the party', 'party of',
-            'witnesseth', 'whereas', 'represented by'
-        ]
+    def _clean_party_name(self, party_str: str) -> str:
+        cleaned = NOISE_PATTERN.sub('', party_str.strip())
         
-        cleaned = party_str.strip()
-        for noise in noise_words:
-            cleaned = re.sub(noise, '', cleaned, flags=re.IGNORECASE)
-        
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+        cleaned = WHITESPACE_PATTERN.sub(' ', cleaned).strip()
         
         cleaned = cleaned.rstrip(',.;:')
         
         return cleaned
     
     def validate_entity(self, text: str, label: str) -> bool:
-        text = text.strip()
-        
-        if len(text) < 2:
+        return self._passes_rule(self.rules.get(label, DEFAULT_RULE), text.strip())
+    
+    def _passes_rule(self, rule, stripped: str) -> bool:
+        if len(stripped) < MIN_ENTITY_LENGTH:
             return False
         
-        if label == 'EFFECTIVE_DATE' or label == 'EXPIRATION_DATE':
-            if not any(c.isdigit() for c in text):
-                return False
-            if len(text) < 6:
+        for validator in rule.validators:
+            if not validator(stripped):
                 return False
         
-        elif label == 'TOTAL_AMOUNT':
-            if not any(c.isdigit() for c in text):
-                return False
+        return True
+    
+    def _apply_rule(self, rule, text: str, label: str) -> Optional[Dict]:
+        if not self._passes_rule(rule, text.strip()):
+            return None
         
-        elif label == 'PARTY_NAME':
-            if not any(c.isalpha() for c in text):
-                return False
-            if len(text) < 3:
-                return False
+        normalized_text, original_text = rule.normalizer(self, text)
         
-        elif label == 'JURISDICTION':
-            alpha_ratio = sum(c.isalpha() or c.isspace() for c in text) / len(text)
-            if alpha_ratio < 0.5:
-                return False
+        entity_dict = {
+            'text': normalized_text,
+            'label': label
+        }
+        if original_text:
+            entity_dict['original_text'] = original_text
         
-        return True
+        return entity_dict
+    
+    def process_entity(self, text: str, label: str) -> Optional[Dict]:
+        return self._apply_rule(self.rules.get(label, DEFAULT_RULE), text, label)
     
     def process_entities(self, entities: List[Tuple[str, str]]) -> List[Dict]:
+        if self.profile:
+            return self._process_entities_profiled(entities)
+        
+        # The attribute lookups are hoisted out of the loop; the rule itself
+        # is applied by the same _apply_rule as process_entity
         processed = []
+        rules = self.rules
+        apply_rule = self._apply_rule
         
         for text, label in entities:
-            if not self.validate_entity(text, label):
-                continue
-            
-            normalized_text = text
-            original_text = None
-            
-            if label in ['EFFECTIVE_DATE', 'EXPIRATION_DATE']:
-                normalized_text = self.normalize_date(text)
-                original_text = text
-            
-            elif label == 'TOTAL_AMOUNT':
-                amount_data = self.normalize_amount(text)
-                normalized_text = f"{amount_data['currency']} {amount_data['normalized']}"
-                original_text = amount_data['raw']
-            
-            elif label == 'PARTY_NAME':
-                normalized_text = self.clean_party_name(text)
-                if normalized_text != text:
-                    original_text = text
-            
-            entity_dict = {
-                'text': normalized_text,
-                'label': label
-            }
-            if original_text:
-                entity_dict['original_text'] = original_text
-            
-            processed.append(entity_dict)
+            entity_dict = apply_rule(rules.get(label, DEFAULT_RULE), text, label)
+            if entity_dict is not None:
+                processed.append(entity_dict)
         
         return processed
     
-    def deduplicate_entities(self, entities: List[Dict]) -> List[Dict]:
+    def _process_entities_profiled(self, entities: List[Tuple[str, str]]) -> List[Dict]:
+        processed = []
+        
+        for text, label in entities:
+            started = time.perf_counter()
+            entity_dict = self.process_entity(text, label)
+            timing = self.rule_timings.setdefault(label, [0, 0.0])
+            timing[0] += 1
+            timing[1] += time.perf_counter() - started
+            if entity_dict is not None:
+                processed.append(entity_dict)
+        
+        return processed
+    
+    def rule_profile(self) -> Dict[str, Dict[str, float]]:
+        return {
+            label: {
+                'calls': calls,
+                'seconds': seconds,
+                'us_per_entity': seconds / calls * 1e6 if calls else 0.0
+            }
+            for label, (calls, seconds) in sorted(self.rule_timings.items(), key=lambda item: -item[1][1])
+        }
+    
+    def deduplicate_entities(self, entities: List[Dict], fuzzy: bool = False,
+                             threshold: float = DEFAULT_THRESHOLD,
+                             fuzzy_labels: Iterable[str] = DEFAULT_FUZZY_LABELS,
+                             keep: str = 'longest') -> List[Dict]:
+        if fuzzy:
+            return fuzzy_deduplicate(entities, threshold=threshold, labels=fuzzy_labels, keep=keep)
+        
         seen = set()
         unique = []
         
@@ -182,16 +284,43 @@ class RuleBasedProcessor:
                 unique.append(entity)
         
         return unique
+    
+    def process_batch(self, documents: List[List[Tuple[str, str]]], deduplicate: bool = True,
+                      **dedup_options) -> List[List[Dict]]:
+        results = []
+        for entities in documents:
+            processed = self.process_entities(entities)
+            if deduplicate:
+                processed = self.deduplicate_entities(processed, **dedup_options)
+            results.append(processed)
+        return results
+
+
+_processor = None
+
+
+def get_processor() -> RuleBasedProcessor:
+    global _processor
+    if _processor is None:
+        _processor = RuleBasedProcessor()
+    return _processor
 
 
 def apply_rules(entities: List[Tuple[str, str]]) -> List[Dict]:
-    processor = RuleBasedProcessor()
-    return processor.process_entities(entities)
+    return get_processor().process_entities(entities)
 
 
-def deduplicate_entities(entities: List[Dict]) -> List[Dict]:
-    processor = RuleBasedProcessor()
-    return processor.deduplicate_entities(entities)
+def deduplicate_entities(entities: List[Dict], **dedup_options) -> List[Dict]:
+    return get_processor().deduplicate_entities(entities, **dedup_options)
+
+
+def apply_rules_batch(documents: List[List[Tuple[str, str]]], deduplicate: bool = True,
+                      **dedup_options) -> List[List[Dict]]:
+    return get_processor().process_batch(documents, deduplicate=deduplicate, **dedup_options)
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return get_processor().cache_stats()
 
 
 if __name__ == "__main__":
@@ -1,4 +1,9 @@
-from .rule_based_processer import apply_rules, deduplicate_entities
-
-__all__ = ['apply_rules', 'deduplicate_entities']
+from .rule_based_processer import (
+    RuleBasedProcessor, apply_rules, deduplicate_entities, apply_rules_batch, get_processor, get_cache_stats
+)
+from .label_rules import LABEL_RULES, CRITICAL_LABELS
 
+__all__ = [
+    'RuleBasedProcessor', 'apply_rules', 'deduplicate_entities', 'apply_rules_batch',
+    'get_processor', 'get_cache_stats', 'LABEL_RULES', 'CRITICAL_LABELS'
+]
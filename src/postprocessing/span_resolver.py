@@ -0,0 +1,26 @@
+from typing import List, Sequence, Tuple
+
+
+def span_sort_key(span: Sequence) -> Tuple[int, int]:
+    return (span[0], -(span[1] - span[0]))
+
+
+def resolve_overlaps(spans: List[Sequence], presorted: bool = False) -> List[Sequence]:
+    # Candidates arrive ordered by start, longest first, and a candidate is kept
+    # only if it does not overlap anything already kept. Kept spans are disjoint
+    # and sorted, so the only one a new candidate can overlap is the last one:
+    # comparing against its end replaces the scan over every kept span.
+    # Empty spans cannot be aligned to tokens and are dropped.
+    if not presorted:
+        spans = sorted(spans, key=span_sort_key)
+    resolved = []
+    last_end = None
+    for span in spans:
+        start, end = span[0], span[1]
+        if end <= start:
+            continue
+        if last_end is None or start >= last_end:
+            resolved.append(span)
+            last_end = end
+    return resolved
+
@@ -0,0 +1,294 @@
+import os
+import sys
+import time
+import json
+import queue
+import signal
+import argparse
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.preprocessing.run_batch import (
+    RAW_DIR, INTERIM_DIR, MANIFEST_FILE, DEFAULT_WORKERS, CHECKPOINT_SECONDS,
+    init_worker, ocr_document, output_name_for, is_up_to_date, report_result
+)
+from src.utils.manifest import atomic_write_text, file_fingerprint, load_manifest, update_manifest
+
+STATS_FILE = os.path.join(INTERIM_DIR, "ingest_stats.json")
+ANNOTATE_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "scripts", "auto_annotate.py")
+POLL_SECONDS = 2.0
+STATS_SECONDS = 10.0
+QUEUE_SIZE = 32
+ANNOTATE_DEBOUNCE_SECONDS = 30.0
+LATENCY_WINDOW = 500
+# The manifest is shared with run_batch.py and rewritten whole on every save,
+# so finished documents are saved in batches: every MANIFEST_SAVE_DOCUMENTS
+# documents or CHECKPOINT_SECONDS, whichever comes first, and on shutdown
+MANIFEST_SAVE_DOCUMENTS = 20
+
+
+def init_daemon_worker():
+    # Ctrl-C is handled by the daemon, which lets documents in progress finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    init_worker()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class IngestStats:
+    def __init__(self, work_queue, workers):
+        self.work_queue = work_queue
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counts = {"success": 0, "empty": 0, "failed": 0}
+        self.in_progress = 0
+        self.annotation_runs = 0
+        self.annotation_failures = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.processing_times = deque(maxlen=LATENCY_WINDOW)
+
+    def document_started(self):
+        with self.lock:
+            self.in_progress += 1
+
+    def document_finished(self, status, latency, processing):
+        with self.lock:
+            self.in_progress -= 1
+            self.counts[status] += 1
+            self.latencies.append(latency)
+            self.processing_times.append(processing)
+
+    def annotation_finished(self, ok):
+        with self.lock:
+            self.annotation_runs += 1
+            if not ok:
+                self.annotation_failures += 1
+
+    def snapshot(self):
+        with self.lock:
+            uptime = time.time() - self.started
+            done = sum(self.counts.values())
+            latencies = list(self.latencies)
+            processing = list(self.processing_times)
+            return {
+                "uptime_seconds": round(uptime, 1),
+                "workers": self.workers,
+                "queue_depth": self.work_queue.qsize(),
+                "queue_capacity": self.work_queue.maxsize,
+                "in_progress": self.in_progress,
+                "documents": dict(self.counts, total=done),
+                "failures": self.counts["failed"],
+                "throughput_docs_per_minute": round(done / uptime * 60, 2) if uptime > 0 else 0.0,
+                # Latency is discovery -> output written; processing excludes queue wait
+                "latency_seconds": {
+                    "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+                    "p50": round(percentile(latencies, 0.5), 2),
+                    "p95": round(percentile(latencies, 0.95), 2),
+                },
+                "processing_seconds": {
+                    "mean": round(sum(processing) / len(processing), 2) if processing else 0.0,
+                    "p95": round(percentile(processing, 0.95), 2),
+                },
+                "annotation": {"runs": self.annotation_runs, "failures": self.annotation_failures},
+            }
+
+
+class IngestDaemon:
+    def __init__(self, workers=DEFAULT_WORKERS, queue_size=QUEUE_SIZE, poll_seconds=POLL_SECONDS, annotate=False):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.annotate = annotate
+        self.work_queue = queue.Queue(maxsize=queue_size)
+        self.stats = IngestStats(self.work_queue, workers)
+        self.stop_event = threading.Event()
+        self.annotate_event = threading.Event()
+        self.manifest_lock = threading.Lock()
+        self.executor_lock = threading.Lock()
+        self.manifest = load_manifest(MANIFEST_FILE)
+        self.unsaved = {}
+        self.last_saved = time.monotonic()
+        self.pending = set()
+        self.executor = None
+
+    def scan(self, last_seen):
+        # A PDF is only picked up once its size and mtime have been stable for
+        # one poll interval, so files still being copied in are not OCRed half-written.
+        seen = {}
+        for pdf_file in sorted(os.listdir(RAW_DIR)):
+            if not pdf_file.lower().endswith('.pdf') or pdf_file in self.pending:
+                continue
+            path = os.path.join(RAW_DIR, pdf_file)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            seen[pdf_file] = (stat.st_size, stat.st_mtime_ns)
+            if last_seen.get(pdf_file) != seen[pdf_file]:
+                continue
+            with self.manifest_lock:
+                entry = self.manifest.get(pdf_file)
+            output_path = os.path.join(INTERIM_DIR, output_name_for(pdf_file))
+            fingerprint = file_fingerprint(path, entry)
+            # Failed documents are not retried in a loop; replacing the file retries it
+            if entry and entry.get("status") == "failed" and entry.get("sha256") == fingerprint["sha256"]:
+                continue
+            if is_up_to_date(entry, fingerprint, output_path):
+                continue
+            yield pdf_file, fingerprint
+        last_seen.clear()
+        last_seen.update(seen)
+
+    def watch(self):
+        last_seen = {}
+        while not self.stop_event.is_set():
+            for pdf_file, fingerprint in self.scan(last_seen):
+                self.pending.add(pdf_file)
+                item = (pdf_file, fingerprint, time.time())
+                # Back-pressure: a full queue blocks discovery instead of
+                # buffering an unbounded backlog in memory.
+                while not self.stop_event.is_set():
+                    try:
+                        self.work_queue.put(item, timeout=1.0)
+                        break
+                    except queue.Full:
+                        continue
+                if self.stop_event.is_set():
+                    return
+            self.stop_event.wait(self.poll_seconds)
+
+    def work(self):
+        while not self.stop_event.is_set():
+            try:
+                pdf_file, fingerprint, discovered = self.work_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            input_path = os.path.join(RAW_DIR, pdf_file)
+            output_path = os.path.join(INTERIM_DIR, output_name_for(pdf_file))
+            self.stats.document_started()
+            executor = self.executor
+            try:
+                result = executor.submit(ocr_document, input_path, output_path).result()
+            except BrokenProcessPool:
+                result = {"status": "failed", "error": "worker process crashed", "seconds": 0.0}
+                self.restart_executor(executor)
+            self.stats.document_finished(result["status"], time.time() - discovered, result["seconds"])
+            self.record(pdf_file, fingerprint, result)
+            print(f"[ingest] {pdf_file}: {report_result(result)} ({result['seconds']:.1f}s)")
+            self.pending.discard(pdf_file)
+            self.work_queue.task_done()
+            if self.annotate and result["status"] == "success":
+                self.annotate_event.set()
+
+    def record(self, pdf_file, fingerprint, result):
+        entry = dict(fingerprint)
+        entry.update({
+            "status": result["status"],
+            "output": output_name_for(pdf_file) if result["status"] == "success" else None,
+            "seconds": round(result["seconds"], 2),
+            "processed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        if result.get("error"):
+            entry["error"] = result["error"]
+        with self.manifest_lock:
+            self.manifest[pdf_file] = entry
+            self.unsaved[pdf_file] = entry
+            due = len(self.unsaved) >= MANIFEST_SAVE_DOCUMENTS
+        if due:
+            self.save_manifest()
+
+    def save_manifest(self):
+        # Merged into the file under its lock; the merged result also brings
+        # in what run_batch.py recorded meanwhile
+        with self.manifest_lock:
+            if self.unsaved:
+                self.manifest = update_manifest(MANIFEST_FILE, self.unsaved)
+                self.unsaved = {}
+            self.last_saved = time.monotonic()
+
+    def restart_executor(self, broken):
+        # Every worker thread waiting on the dead pool gets BrokenProcessPool;
+        # only the first one replaces it.
+        with self.executor_lock:
+            if self.executor is broken and not self.stop_event.is_set():
+                print("[ingest] Worker pool crashed, restarting")
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_daemon_worker)
+
+    def run_annotation(self):
+        # Annotation is incremental (see scripts/auto_annotate.py), so bursts of
+        # new texts are coalesced into one run after a quiet period.
+        while not self.stop_event.is_set():
+            if not self.annotate_event.wait(timeout=1.0):
+                continue
+            if self.stop_event.wait(ANNOTATE_DEBOUNCE_SECONDS):
+                return
+            self.annotate_event.clear()
+            print("[ingest] Running incremental annotation")
+            completed = subprocess.run([sys.executable, ANNOTATE_SCRIPT])
+            self.stats.annotation_finished(completed.returncode == 0)
+
+    def report(self):
+        while not self.stop_event.wait(STATS_SECONDS):
+            snapshot = self.stats.snapshot()
+            atomic_write_text(STATS_FILE, json.dumps(snapshot, indent=2))
+            print(f"[ingest] queue {snapshot['queue_depth']}/{snapshot['queue_capacity']} | "
+                  f"in progress {snapshot['in_progress']} | done {snapshot['documents']['total']} | "
+                  f"failed {snapshot['failures']} | p95 latency {snapshot['latency_seconds']['p95']}s")
+
+    def run(self):
+        os.makedirs(RAW_DIR, exist_ok=True)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_daemon_worker)
+        threads = [threading.Thread(target=self.watch, name="ingest-watch", daemon=True)]
+        threads += [threading.Thread(target=self.work, name=f"ingest-worker-{i}", daemon=True) for i in range(self.workers)]
+        threads.append(threading.Thread(target=self.report, name="ingest-stats", daemon=True))
+        if self.annotate:
+            threads.append(threading.Thread(target=self.run_annotation, name="ingest-annotate", daemon=True))
+        print(f"Watching {RAW_DIR} with {self.workers} workers (queue size {self.work_queue.maxsize})")
+        print(f"   Stats: {STATS_FILE}")
+        print(f"   Annotation: {'on' if self.annotate else 'off'}")
+        for thread in threads:
+            thread.start()
+        try:
+            while not self.stop_event.wait(0.5):
+                if time.monotonic() - self.last_saved >= CHECKPOINT_SECONDS:
+                    self.save_manifest()
+        finally:
+            print("[ingest] Stopping: waiting for documents in progress (Ctrl-C again to force)")
+            for thread in threads:
+                thread.join(timeout=None if thread.name.startswith("ingest-worker") else 1.0)
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.save_manifest()
+            atomic_write_text(STATS_FILE, json.dumps(self.stats.snapshot(), indent=2))
+
+    def stop(self, *_):
+        if self.stop_event.is_set():
+            print("[ingest] Forcing exit")
+            os._exit(1)
+        self.stop_event.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch data/raw and OCR new PDFs as they arrive")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="OCR worker processes")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="Maximum documents waiting for a worker")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="Seconds between directory scans")
+    parser.add_argument("--annotate", action="store_true", help="Run incremental auto-annotation on new texts")
+    args = parser.parse_args()
+    daemon = IngestDaemon(
+        workers=max(1, args.workers),
+        queue_size=max(1, args.queue_size),
+        poll_seconds=args.poll,
+        annotate=args.annotate
+    )
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    daemon.run()
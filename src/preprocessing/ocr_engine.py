@@ -1,10 +1,11 @@
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, convert_from_bytes, pdfinfo_from_path, pdfinfo_from_bytes
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from src.preprocessing.image_utils import preprocess_image
+from src.utils.stage_timer import stage
 import tempfile
 from PIL import Image
 
@@ -18,41 +19,90 @@ if os.name == 'nt':  # Windows
         pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe"
 # Linux/Docker: tesseract should be in PATH, no need to set
 
-def extract_text_from_pdf(pdf_path, languages="eng"):
-    if not os.path.exists(pdf_path):
+OCR_DPI = 300
+TESSERACT_CONFIG = '--psm 6'
+
+def resolve_pdf_source(pdf_path):
+    # pdf_path may also be the PDF's bytes or an open binary file, so callers
+    # that already hold the document do not have to write it to disk first.
+    if hasattr(pdf_path, 'read'):
+        file_name = getattr(pdf_path, 'name', None)
+        pdf_path = file_name if isinstance(file_name, str) and os.path.exists(file_name) else pdf_path.read()
+    if not isinstance(pdf_path, (bytes, bytearray)) and not os.path.exists(pdf_path):
         raise FileNotFoundError(f"PDF not found at: {pdf_path}")
+    return pdf_path
+
+
+def poppler_kwargs():
+    # Set poppler path only on Windows if custom path exists
+    if os.name == 'nt':
+        custom_poppler = r"C:\Users\AJIT ASHWATH R\Downloads\poppler-25.12.0\Library\bin"
+        if os.path.exists(custom_poppler):
+            return {'poppler_path': custom_poppler}
+    return {}
+
+
+def pdf_page_count(pdf_path):
+    pdf_path = resolve_pdf_source(pdf_path)
+    if isinstance(pdf_path, (bytes, bytearray)):
+        return pdfinfo_from_bytes(bytes(pdf_path), **poppler_kwargs())["Pages"]
+    return pdfinfo_from_path(pdf_path, **poppler_kwargs())["Pages"]
+
+
+def rasterize_pdf(pdf_path, output_folder, dpi=OCR_DPI, first_page=None, last_page=None):
+    # Renders pages (all, or first_page..last_page, 1-based) to image files in
+    # output_folder and returns their paths in page order. Kept apart from
+    # ocr_page so pages can be OCRed by different processes.
+    pdf_path = resolve_pdf_source(pdf_path)
+    convert_kwargs = {
+        'dpi': dpi,
+        'output_folder': output_folder,
+        'paths_only': True,
+        'first_page': first_page,
+        'last_page': last_page
+    }
+    convert_kwargs.update(poppler_kwargs())
+    
+    with stage("rasterize"):
+        if isinstance(pdf_path, (bytes, bytearray)):
+            return convert_from_bytes(bytes(pdf_path), **convert_kwargs)
+        return convert_from_path(pdf_path, **convert_kwargs)
+
+
+def ocr_page(image_path, languages="eng"):
+    with Image.open(image_path) as page_image:
+        with stage("preprocess"):
+            cleaned_image = preprocess_image(page_image)
+        with stage("ocr"):
+            return pytesseract.image_to_string(
+                cleaned_image,
+                lang=languages,
+                config=TESSERACT_CONFIG
+            )
+
+
+def format_page(page_number, text):
+    return f"\n--- PAGE {page_number} ---\n{text}"
+
+
+def extract_text_from_pdf(pdf_path, languages="eng", verbose=True, on_page=None, first_page=None, last_page=None):
+    # on_page(pages_done, page_count) is called after every page; it may raise
+    # to abandon the document (e.g. when a job is cancelled). first_page and
+    # last_page (1-based, inclusive) limit OCR to part of the document.
+    pdf_path = resolve_pdf_source(pdf_path)
     full_text = ""
     with tempfile.TemporaryDirectory() as temp_dir:
-        # Set poppler path only on Windows if custom path exists
-        poppler_path = None
-        if os.name == 'nt':
-            custom_poppler = r"C:\Users\AJIT ASHWATH R\Downloads\poppler-25.12.0\Library\bin"
-            if os.path.exists(custom_poppler):
-                poppler_path = custom_poppler
-        
-        convert_kwargs = {
-            'dpi': 300,
-            'output_folder': temp_dir,
-            'paths_only': True
-        }
-        if poppler_path:
-            convert_kwargs['poppler_path'] = poppler_path
-        
-        image_paths = convert_from_path(pdf_path, **convert_kwargs)
+        image_paths = rasterize_pdf(pdf_path, temp_dir, first_page=first_page, last_page=last_page)
+        page_offset = (first_page or 1) - 1
         for i, image_path in enumerate(image_paths):
-            print(f"   -> Cleaning and reading page {i + 1}/{len(image_paths)}...")
+            if verbose:
+                print(f"   -> Cleaning and reading page {page_offset + i + 1}/{page_offset + len(image_paths)}...")
             try:
-                with Image.open(image_path) as page_image:
-                    cleaned_image = preprocess_image(page_image)
-                    text = pytesseract.image_to_string(
-                        cleaned_image,
-                        lang=languages,
-                        config='--psm 6'
-                    )
-                    full_text += f"\n--- PAGE {i + 1} ---\n{text}"
+                full_text += format_page(page_offset + i + 1, ocr_page(image_path, languages))
             except Exception as e:
-                print(f"      Warning: Failed to read page {i+1}. Error: {e}")
-                continue
+                print(f"      Warning: Failed to read page {page_offset + i + 1}. Error: {e}")
+            if on_page is not None:
+                on_page(i + 1, len(image_paths))
     return full_text
 
 if __name__ == "__main__":
@@ -1,11 +1,25 @@
 import os
 import sys
+import time
+import glob
+import re
+import hashlib
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from src.preprocessing.ocr_engine import extract_text_from_pdf
+from src.utils.manifest import atomic_write_text, file_fingerprint, load_manifest, save_manifest, manifest_lock, update_manifest
 
 RAW_DIR = os.path.join("data", "raw")
 INTERIM_DIR = os.path.join("data", "interim")
+MANIFEST_FILE = os.path.join(INTERIM_DIR, "ocr_manifest.json")
+SHARD_MANIFEST_PATTERN = re.compile(r'^ocr_manifest\.shard-(\d+)-of-(\d+)\.json$')
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+CHECKPOINT_SECONDS = 5.0
+DONE_STATUSES = ("success", "empty")
 
 os.makedirs(INTERIM_DIR, exist_ok=True)
 
@@ -20,55 +34,193 @@ def is_valid_extraction(text):
         return False
     return True
 
-def process_pdfs():
+def output_name_for(pdf_file):
+    return pdf_file.replace('.pdf', '.txt').replace('.PDF', '.txt')
+
+def init_worker():
+    # Tesseract spawns its own OpenMP threads per page; with one process per
+    # core that oversubscribes the CPU and is slower than single-threaded OCR.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+def ocr_document(input_path, output_path):
+    started = time.time()
+    try:
+        text = extract_text_from_pdf(input_path, verbose=False)
+        if is_valid_extraction(text):
+            atomic_write_text(output_path, text)
+            return {"status": "success", "words": len(text.split()), "seconds": time.time() - started}
+        return {"status": "empty", "seconds": time.time() - started}
+    except Exception as e:
+        return {"status": "failed", "error": str(e)[:100], "seconds": time.time() - started}
+
+def parse_shard(value):
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected i/N, e.g. 0/4")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{count - 1}")
+    return index, count
+
+def shard_of(pdf_file, count):
+    # Hash the name rather than the content: every node can compute the
+    # assignment from a directory listing without reading 10k PDFs first.
+    return int(hashlib.sha1(pdf_file.encode('utf-8')).hexdigest(), 16) % count
+
+def shard_manifest_path(index, count):
+    return os.path.join(INTERIM_DIR, f"ocr_manifest.shard-{index}-of-{count}.json")
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+def is_up_to_date(entry, fingerprint, output_path):
+    if not entry or entry.get("sha256") != fingerprint["sha256"]:
+        return False
+    if entry.get("status") not in DONE_STATUSES:
+        return False
+    return entry["status"] == "empty" or os.path.exists(output_path)
+
+def report_result(result):
+    status = result["status"]
+    if status == "success":
+        return f"Success: {result['words']} words extracted"
+    if status == "empty":
+        return "Warning: Empty or low-quality extraction (image-only, encrypted or corrupted?)"
+    return f"Failed: {result.get('error', 'unknown error')}"
+
+def run_jobs(jobs, workers, on_result):
+    # Keep only a few jobs per worker in flight so a crash or Ctrl-C loses
+    # little work, and restart the pool if a worker dies (e.g. OOM on a huge
+    # scan): the documents it was holding are recorded as failed and retried
+    # on the next run.
+    queue = deque(jobs)
+    while queue:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+        in_flight = {}
+        try:
+            while queue or in_flight:
+                while queue and len(in_flight) < workers * 2:
+                    pdf_file, input_path, output_path = queue[0]
+                    future = executor.submit(ocr_document, input_path, output_path)
+                    queue.popleft()
+                    in_flight[future] = pdf_file
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pdf_file = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        result = {"status": "failed", "error": "worker process crashed", "seconds": 0.0}
+                    on_result(pdf_file, result)
+        except BrokenProcessPool:
+            for pdf_file in in_flight.values():
+                on_result(pdf_file, {"status": "failed", "error": "worker process crashed", "seconds": 0.0})
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def process_pdfs(workers=DEFAULT_WORKERS, force=False, shard=None):
     pdf_files = [f for f in os.listdir(RAW_DIR) if f.lower().endswith('.pdf')]
     if len(pdf_files) == 0:
         print(f"No PDF files found in {RAW_DIR}")
         print("Please add PDF contracts to the 'data/raw/' folder")
         return
     pdf_files.sort()
-    print(f"Found {len(pdf_files)} PDF files to process")
-    print("=" * 60)
-    success_count = 0
-    failed_count = 0
-    empty_count = 0
-    for index, pdf_file in enumerate(pdf_files, 1):
+    manifest_path = MANIFEST_FILE
+    # Entries from an earlier merged run still count as done on a sharded run
+    baseline = {}
+    if shard:
+        index, count = shard
+        pdf_files = [f for f in pdf_files if shard_of(f, count) == index]
+        manifest_path = shard_manifest_path(index, count)
+        baseline = {} if force else load_manifest(MANIFEST_FILE)
+        print(f"Shard {index}/{count}: {len(pdf_files)} documents assigned to this node")
+    manifest = {} if force else load_manifest(manifest_path)
+    fingerprints = {}
+    jobs = []
+    for pdf_file in pdf_files:
         input_path = os.path.join(RAW_DIR, pdf_file)
-        output_filename = pdf_file.replace('.pdf', '.txt').replace('.PDF', '.txt')
-        output_path = os.path.join(INTERIM_DIR, output_filename)
-        print(f"\n[{index}/{len(pdf_files)}] Processing: {pdf_file}")
-        print("-" * 40)
-        try:
-            text = extract_text_from_pdf(input_path)
-            if is_valid_extraction(text):
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(text)
-                word_count = len(text.split())
-                print(f"   Success: {word_count} words extracted")
-                success_count += 1
-            else:
-                print(f"   Warning: Empty or low-quality extraction")
-                print(f"      This PDF may be:")
-                print(f"      - Image-only with poor OCR quality")
-                print(f"      - Encrypted or password-protected")
-                print(f"      - Corrupted")
-                empty_count += 1
-        except Exception as e:
-            print(f"   Failed: {str(e)[:100]}")
-            failed_count += 1
+        output_path = os.path.join(INTERIM_DIR, output_name_for(pdf_file))
+        previous = manifest.get(pdf_file) or baseline.get(pdf_file)
+        fingerprints[pdf_file] = file_fingerprint(input_path, previous)
+        if not is_up_to_date(previous, fingerprints[pdf_file], output_path):
+            jobs.append((pdf_file, input_path, output_path))
+    skipped_count = len(pdf_files) - len(jobs)
+    print(f"Found {len(pdf_files)} PDF files ({skipped_count} unchanged, {len(jobs)} to process)")
+    print(f"Workers: {workers}")
+    print("=" * 60)
+    if not jobs:
+        print("All documents are up to date")
+        print("   Next step: python scripts/auto_annotate.py")
+        return
+    counts = {"success": 0, "empty": 0, "failed": 0}
+    started = time.time()
+    last_checkpoint = [started]
+    # Entries not yet written; merged into the file so a daemon writing the
+    # same manifest keeps its entries
+    unsaved = {}
+
+    def on_result(pdf_file, result):
+        counts[result["status"]] += 1
+        entry = dict(fingerprints[pdf_file])
+        entry.update({
+            "status": result["status"],
+            "output": output_name_for(pdf_file) if result["status"] == "success" else None,
+            "seconds": round(result["seconds"], 2),
+            "processed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        if result.get("error"):
+            entry["error"] = result["error"]
+        manifest[pdf_file] = entry
+        unsaved[pdf_file] = entry
+        done = sum(counts.values())
+        elapsed = time.time() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (len(jobs) - done) / rate if rate > 0 else 0.0
+        print(f"[{done}/{len(jobs)}] {pdf_file}: {report_result(result)} "
+              f"| {rate:.2f} docs/s | ETA {format_duration(eta)}")
+        if time.time() - last_checkpoint[0] >= CHECKPOINT_SECONDS:
+            update_manifest(manifest_path, unsaved)
+            unsaved.clear()
+            last_checkpoint[0] = time.time()
+
+    interrupted = False
+    try:
+        run_jobs(jobs, workers, on_result)
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\nInterrupted: finished documents are saved, re-run to resume")
+    finally:
+        update_manifest(manifest_path, unsaved)
+    success_count = counts["success"]
+    empty_count = counts["empty"]
+    failed_count = counts["failed"]
+    done_count = sum(counts.values())
+    elapsed = time.time() - started
+    rate = done_count / elapsed if elapsed > 0 else 0.0
     print("\n" + "=" * 60)
     print("BATCH PROCESSING SUMMARY")
     print("=" * 60)
-    print(f"Successful: {success_count}/{len(pdf_files)}")
-    print(f"Empty/Low Quality: {empty_count}/{len(pdf_files)}")
-    print(f"Failed: {failed_count}/{len(pdf_files)}")
+    print(f"Successful: {success_count}/{len(jobs)}")
+    print(f"Empty/Low Quality: {empty_count}/{len(jobs)}")
+    print(f"Failed: {failed_count}/{len(jobs)}")
+    print(f"Unchanged (skipped): {skipped_count}")
+    print(f"Throughput: {rate:.2f} docs/s ({done_count} docs in {format_duration(elapsed)})")
+    if interrupted:
+        remaining = len(jobs) - done_count
+        print(f"Remaining: {remaining} (ETA {format_duration(remaining / rate) if rate > 0 else 'unknown'})")
+        return
     if success_count == 0:
         print("\nTROUBLESHOOTING:")
         print("   1. Check if PDFs are image-based (scanned documents)")
         print("   2. Ensure Tesseract OCR is properly installed")
         print("   3. Try opening PDFs manually to verify they're not corrupted")
         print("   4. For Windows: Set tesseract path in ocr_engine.py")
-    elif success_count < len(pdf_files) * 0.5:
+    elif success_count < len(jobs) * 0.5:
         print("\nMANY FILES FAILED:")
         print("   Consider reviewing failed PDFs manually")
         print("   OCR quality may be low for scanned documents")
@@ -76,5 +228,71 @@ def process_pdfs():
         print("\nReady for annotation!")
         print("   Next step: python scripts/auto_annotate.py")
 
+def merge_shard_manifests():
+    shards = {}
+    for path in glob.glob(os.path.join(INTERIM_DIR, "ocr_manifest.shard-*-of-*.json")):
+        match = SHARD_MANIFEST_PATTERN.match(os.path.basename(path))
+        if match:
+            shards.setdefault(int(match.group(2)), {})[int(match.group(1))] = path
+    if not shards:
+        print(f"No shard manifests found in {INTERIM_DIR}")
+        return None
+    if len(shards) > 1:
+        print(f"Warning: Found shard manifests for several shard counts {sorted(shards)}, merging all of them")
+    with manifest_lock(MANIFEST_FILE):
+        merged = load_manifest(MANIFEST_FILE)
+        for count in sorted(shards):
+            for index in sorted(shards[count]):
+                for pdf_file, entry in load_manifest(shards[count][index]).items():
+                    current = merged.get(pdf_file)
+                    if current is None or entry.get("processed_at", "") >= current.get("processed_at", ""):
+                        merged[pdf_file] = entry
+        save_manifest(merged, MANIFEST_FILE)
+    count = max(shards)
+    missing_shards = [i for i in range(count) if i not in shards[count]]
+    pdf_files = sorted(f for f in os.listdir(RAW_DIR) if f.lower().endswith('.pdf'))
+    stragglers = {}
+    for pdf_file in pdf_files:
+        entry = merged.get(pdf_file)
+        output_path = os.path.join(INTERIM_DIR, output_name_for(pdf_file))
+        if entry is None:
+            reason = "not processed"
+        elif entry.get("status") == "failed":
+            reason = f"failed: {entry.get('error', 'unknown error')}"
+        elif not is_up_to_date(entry, file_fingerprint(os.path.join(RAW_DIR, pdf_file), entry), output_path):
+            reason = "source changed or output missing"
+        else:
+            continue
+        stragglers.setdefault(shard_of(pdf_file, count), []).append((pdf_file, reason))
+    print("=" * 60)
+    print("SHARD MERGE SUMMARY")
+    print("=" * 60)
+    print(f"Merged {sum(len(p) for p in shards.values())} shard manifests into {MANIFEST_FILE}")
+    print(f"Documents: {len(pdf_files)} | Done: {len(pdf_files) - sum(len(s) for s in stragglers.values())}")
+    if missing_shards:
+        print(f"Missing manifests for shards: {', '.join(f'{i}/{count}' for i in missing_shards)}")
+    if not stragglers:
+        print("No stragglers: every document has been processed")
+        return 0
+    print("\nSTRAGGLERS (re-run the listed shard to pick them up):")
+    for index in sorted(stragglers):
+        print(f"   Shard {index}/{count}: {len(stragglers[index])} documents")
+        for pdf_file, reason in stragglers[index][:10]:
+            print(f"      - {pdf_file} ({reason})")
+        if len(stragglers[index]) > 10:
+            print(f"      ... and {len(stragglers[index]) - 10} more")
+    return sum(len(s) for s in stragglers.values())
+
 if __name__ == "__main__":
-    process_pdfs()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="OCR every PDF in data/raw into data/interim")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="OCR processes to run in parallel")
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and re-OCR every document")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="i/N",
+                        help="Only process the documents hashed to shard i of N (0-based)")
+    parser.add_argument("--merge", action="store_true",
+                        help="Combine the per-shard manifests and report stragglers instead of running OCR")
+    args = parser.parse_args()
+    if args.merge:
+        stragglers = merge_shard_manifests()
+        sys.exit(0 if stragglers == 0 else 1)
+    process_pdfs(workers=max(1, args.workers), force=args.force, shard=args.shard)
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no cross-process locking, run one writer at a time
+    fcntl = None
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def atomic_write_text(path, text):
+    # Write next to the target and rename over it, so readers (and a crashed
+    # run) only ever see the old or the new file, never a truncated one.
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable manifest {path}: {e}")
+        return {}
+
+
+def save_manifest(manifest, path):
+    atomic_write_text(path, json.dumps(manifest, indent=2, sort_keys=True))
+
+
+@contextmanager
+def manifest_lock(path):
+    # Serializes read-modify-write cycles on a manifest between processes
+    # (run_batch.py, the ingest daemon). The lock is taken on a sidecar file
+    # because the manifest itself is replaced by rename on every save.
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def update_manifest(path, entries):
+    # Merges entries into the manifest on disk instead of overwriting it with
+    # this process's copy, which would drop what another writer recorded.
+    # Returns the merged manifest.
+    with manifest_lock(path):
+        manifest = load_manifest(path)
+        manifest.update(entries)
+        save_manifest(manifest, path)
+    return manifest
+
+
+def file_fingerprint(path, previous=None):
+    # Re-hashing large PDFs on every run is wasted I/O: if size and mtime match
+    # what was recorded last time, trust the recorded hash.
+    stat = os.stat(path)
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns and previous.get("sha256"):
+        sha256 = previous["sha256"]
+    else:
+        sha256 = file_sha256(path)
+    return {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
@@ -0,0 +1,33 @@
+import time
+from contextlib import contextmanager
+
+# Per-stage wall-clock timings for one unit of work (one pool task, one
+# request). Stages are only timed inside collect_timings(); everywhere else
+# stage() is a None check, so instrumented code costs nothing when no one is
+# collecting.
+
+_timings = None
+
+
+@contextmanager
+def stage(name):
+    if _timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def collect_timings(fn, *args):
+    # Returns (result, {stage: [seconds, ...]}); picklable, so it can wrap a
+    # function submitted to a process pool.
+    global _timings
+    previous, _timings = _timings, {}
+    try:
+        result = fn(*args)
+        return result, _timings
+    finally:
+        _timings = previous
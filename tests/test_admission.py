@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import time
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from api.admission import AdmissionController, Overloaded
+
+
+class TestAdmissionController(unittest.TestCase):
+    def run_async(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def test_queues_then_sheds(self):
+        async def scenario():
+            controller = AdmissionController(max_documents=1, max_pages=100, queue_size=1)
+            release = asyncio.Event()
+            order = []
+
+            async def document(name, pages):
+                async with controller.admit(pages):
+                    order.append(name)
+                    await release.wait()
+
+            first = asyncio.create_task(document("first", 10))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(document("second", 10))
+            await asyncio.sleep(0)
+            self.assertEqual(controller.documents, 1)
+            self.assertEqual(len(controller.waiters), 1)
+            self.assertTrue(controller.saturated)
+
+            with self.assertRaises(Overloaded) as raised:
+                async with controller.admit(10):
+                    pass
+            self.assertGreaterEqual(raised.exception.retry_after, 1)
+            self.assertEqual(controller.rejected, 1)
+
+            release.set()
+            await asyncio.gather(first, second)
+            self.assertEqual(order, ["first", "second"])
+            self.assertEqual(controller.documents, 0)
+            self.assertFalse(controller.saturated)
+
+        self.run_async(scenario())
+
+    def test_page_cap_admits_large_document_alone(self):
+        async def scenario():
+            controller = AdmissionController(max_documents=4, max_pages=50, queue_size=4)
+            async with controller.admit(300):
+                self.assertEqual(controller.pages, 300)
+                small = asyncio.create_task(controller.admit(5).__aenter__())
+                await asyncio.sleep(0)
+                self.assertEqual(len(controller.waiters), 1)
+                small.cancel()
+                await asyncio.sleep(0)
+            self.assertEqual(len(controller.waiters), 0)
+            self.assertEqual(controller.pages, 0)
+
+        self.run_async(scenario())
+
+    def test_retry_after_follows_backlog(self):
+        controller = AdmissionController(max_documents=1, max_pages=1000, queue_size=0, workers=2)
+        controller.pages = 30
+        # no completed documents yet: 2 workers at the default seconds per page
+        self.assertEqual(controller.retry_after(), 45)
+        controller.completed.append((time.monotonic(), 10, 5.0))
+        self.assertEqual(controller.retry_after(), 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+import unittest
+import os
+import sys
+import time
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import importlib.util
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+MODEL_PATH = os.path.join(ROOT, "models", "ner_model_v1")
+REQUIREMENTS = all(importlib.util.find_spec(name) for name in ("fastapi", "uvicorn", "requests", "spacy"))
+TOOLS = shutil.which("tesseract") and shutil.which("pdftoppm")
+
+CONTRACT_LINES = [
+    "LOAN AGREEMENT",
+    "This Agreement is made on 15 January 2024 between",
+    "ABC Corporation Private Limited and XYZ Industries Ltd.",
+    "The total loan amount is INR 10,00,000 at 12.5% per annum.",
+    "This Agreement is governed by the laws of India.",
+    "Courts at Mumbai shall have exclusive jurisdiction.",
+]
+
+
+def build_pdf(pages):
+    # Minimal hand-written PDF: one Helvetica text stream per page
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        text = " ".join(f"({line}) Tj 0 -28 Td" for line in lines)
+        stream = f"BT /F1 16 Tf 60 760 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    body = "%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n"
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return body.encode("latin-1")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@unittest.skipUnless(REQUIREMENTS, "fastapi, uvicorn, requests and spacy are required")
+@unittest.skipUnless(TOOLS, "tesseract and pdftoppm are required")
+@unittest.skipUnless(os.path.exists(MODEL_PATH), "trained model not found")
+class TestAPIConcurrency(unittest.TestCase):
+    CONCURRENT_REQUESTS = 4
+    HEALTH_LIMIT_SECONDS = 1.0
+
+    @classmethod
+    def setUpClass(cls):
+        import requests
+        cls.requests = requests
+        cls.port = free_port()
+        cls.base_url = f"http://127.0.0.1:{cls.port}"
+        # The result cache would turn repeated uploads into instant hits
+        env = dict(os.environ, MODEL_PATH=MODEL_PATH, EXTRACTION_WORKERS="2", RESULT_CACHE_MAX_MB="0")
+        cls.server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(cls.port)],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            try:
+                if requests.get(f"{cls.base_url}/health", timeout=1).json()["ready"]:
+                    break
+            except requests.RequestException:
+                time.sleep(0.5)
+        else:
+            cls.server.kill()
+            raise RuntimeError("API server did not become ready")
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.pdf_path = os.path.join(cls.tmpdir, "contract.pdf")
+        with open(cls.pdf_path, "wb") as f:
+            f.write(build_pdf([CONTRACT_LINES] * 3))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait(timeout=30)
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+    def post_extract(self, results):
+        with open(self.pdf_path, "rb") as f:
+            response = self.requests.post(
+                f"{self.base_url}/extract",
+                files={"file": ("contract.pdf", f, "application/pdf")},
+                timeout=300
+            )
+        results.append(response)
+
+    def test_health_responsive_during_extraction(self):
+        results = []
+        threads = [threading.Thread(target=self.post_extract, args=(results,))
+                   for _ in range(self.CONCURRENT_REQUESTS)]
+        for thread in threads:
+            thread.start()
+        health_times = []
+        while any(thread.is_alive() for thread in threads):
+            start = time.perf_counter()
+            response = self.requests.get(f"{self.base_url}/health", timeout=10)
+            health_times.append(time.perf_counter() - start)
+            self.assertEqual(response.status_code, 200)
+            time.sleep(0.1)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), self.CONCURRENT_REQUESTS)
+        for response in results:
+            self.assertEqual(response.status_code, 200)
+            self.assertGreater(response.json()["metadata"]["text_length"], 0)
+        self.assertTrue(health_times)
+        self.assertLess(max(health_times), self.HEALTH_LIMIT_SECONDS)
+
+    def test_ready_only_after_warm_up(self):
+        health = self.requests.get(f"{self.base_url}/health", timeout=10).json()
+        self.assertTrue(health["ready"])
+        self.assertEqual(set(health["warm_up_seconds"]), {"extraction", "jobs"})
+
+    def test_stream_emits_pages_then_summary(self):
+        import json
+        with open(self.pdf_path, "rb") as f:
+            response = self.requests.post(
+                f"{self.base_url}/extract-stream",
+                files={"file": ("contract.pdf", f, "application/pdf")},
+                stream=True,
+                timeout=300
+            )
+        self.assertEqual(response.status_code, 200)
+        events = [json.loads(line) for line in response.iter_lines() if line]
+        self.assertEqual(events[0]["event"], "start")
+        self.assertEqual(events[0]["pages"], 3)
+        self.assertEqual([e["page"] for e in events if e["event"] == "page"], [1, 2, 3])
+        self.assertEqual(events[-1]["event"], "summary")
+        self.assertIn("entities_by_type", events[-1]["metadata"])
+
+    def test_page_range_reports_skipped_pages(self):
+        with open(self.pdf_path, "rb") as f:
+            response = self.requests.post(
+                f"{self.base_url}/extract",
+                params={"pages": "2-2"},
+                files={"file": ("contract.pdf", f, "application/pdf")},
+                timeout=300
+            )
+        self.assertEqual(response.status_code, 200)
+        metadata = response.json()["metadata"]
+        self.assertEqual(metadata["pages_total"], 3)
+        self.assertEqual(metadata["pages_processed"], 1)
+        self.assertEqual(metadata["pages_skipped"], 2)
+
+    def test_invalid_page_range_is_rejected(self):
+        with open(self.pdf_path, "rb") as f:
+            response = self.requests.post(
+                f"{self.base_url}/extract",
+                params={"pages": "5-2"},
+                files={"file": ("contract.pdf", f, "application/pdf")},
+                timeout=30
+            )
+        self.assertEqual(response.status_code, 400)
+
+    def test_extract_from_text(self):
+        text = " ".join(CONTRACT_LINES)
+        single = self.requests.post(
+            f"{self.base_url}/extract-from-text", data=text,
+            headers={"Content-Type": "text/plain"}, timeout=30
+        )
+        self.assertEqual(single.status_code, 200)
+        self.assertTrue(single.json()["success"])
+
+        batch = self.requests.post(f"{self.base_url}/extract-from-text", json=[text, "too short"], timeout=30)
+        self.assertEqual(batch.status_code, 200)
+        results = batch.json()["results"]
+        self.assertEqual([r["success"] for r in results], [True, False])
+        self.assertEqual(results[0]["entities"], single.json()["entities"])
+
+
+if __name__ == '__main__':
+    unittest.main()
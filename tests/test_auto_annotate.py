@@ -0,0 +1,140 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import importlib.util
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+REQUIREMENTS = importlib.util.find_spec("spacy") is not None
+
+
+class FakeEntity:
+    def __init__(self, text, full_text, label):
+        self.text = text
+        self.start_char = full_text.index(text)
+        self.end_char = self.start_char + len(text)
+        self.label_ = label
+
+
+class FakeDoc:
+    def __init__(self, text, ents):
+        self.text = text
+        self.ents = [FakeEntity(ent, text, label) for ent, label in ents]
+
+
+class FakeNLP:
+    # Stands in for nlp.pipe; remembers which files it was given and can be
+    # interrupted after a number of documents, like Ctrl-C mid-run
+    def __init__(self, interrupt_after=None):
+        self.seen = []
+        self.interrupt_after = interrupt_after
+
+    def pipe(self, items, as_tuples, n_process, batch_size):
+        for text, filename in items:
+            if self.interrupt_after is not None and len(self.seen) >= self.interrupt_after:
+                raise KeyboardInterrupt
+            self.seen.append(filename)
+            yield FakeDoc(text, []), filename
+
+
+def contract(party):
+    return (f"This Agreement is made on 15 January 2024 between {party} and XYZ Industries Limited "
+            f"for a total consideration of INR 10,00,000 payable in equal monthly instalments.")
+
+
+@unittest.skipUnless(REQUIREMENTS, "spacy is required")
+class TestFindEntities(unittest.TestCase):
+    def setUp(self):
+        import auto_annotate
+        self.auto_annotate = auto_annotate
+
+    def test_places_are_jurisdictions_only_after_an_anchor(self):
+        text = ("ABC Corporation, having its registered office at Pune, and XYZ Industries. "
+                "This Agreement shall be subject to the exclusive jurisdiction of the Courts at Mumbai.")
+        doc = FakeDoc(text, [("ABC Corporation", "ORG"), ("Pune", "GPE"), ("XYZ Industries", "ORG"), ("Mumbai", "GPE")])
+        labels = self.auto_annotate.find_entities(text, doc)
+        found = [(text[start:end], label) for start, end, label in labels]
+        self.assertIn(("Mumbai", "JURISDICTION"), found)
+        self.assertNotIn(("Pune", "JURISDICTION"), found)
+        self.assertIn(("ABC Corporation", "PARTY_NAME"), found)
+
+
+@unittest.skipUnless(REQUIREMENTS, "spacy is required")
+class TestIncrementalAnnotation(unittest.TestCase):
+    def setUp(self):
+        import auto_annotate
+        self.auto_annotate = auto_annotate
+        self.tmpdir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.tmpdir, "interim")
+        os.makedirs(self.input_dir)
+        self.settings = (auto_annotate.INPUT_DIR, auto_annotate.OUTPUT_FILE, auto_annotate.MANIFEST_FILE,
+                         auto_annotate.ANNOTATOR_VERSION, auto_annotate.nlp)
+        auto_annotate.INPUT_DIR = self.input_dir
+        auto_annotate.OUTPUT_FILE = os.path.join(self.tmpdir, "processed", "train_data.jsonl")
+        auto_annotate.MANIFEST_FILE = os.path.join(self.tmpdir, "processed", "annotation_manifest.json")
+        for name in ("a", "b", "c"):
+            self.write(f"{name}.txt", contract(f"{name.upper()} Corporation"))
+
+    def tearDown(self):
+        (self.auto_annotate.INPUT_DIR, self.auto_annotate.OUTPUT_FILE, self.auto_annotate.MANIFEST_FILE,
+         self.auto_annotate.ANNOTATOR_VERSION, self.auto_annotate.nlp) = self.settings
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write(self, name, text):
+        with open(os.path.join(self.input_dir, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def run_annotator(self, interrupt_after=None):
+        self.auto_annotate.nlp = fake = FakeNLP(interrupt_after)
+        self.auto_annotate.main()
+        return fake.seen
+
+    def records(self):
+        with open(self.auto_annotate.OUTPUT_FILE, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def sources(self):
+        return sorted(record["source"] for record in self.records())
+
+    def test_unchanged_files_are_skipped(self):
+        self.assertEqual(self.run_annotator(), ["a.txt", "b.txt", "c.txt"])
+        self.assertEqual(self.run_annotator(), [])
+        self.assertEqual(self.sources(), ["a.txt", "b.txt", "c.txt"])
+
+    def test_changed_file_is_reannotated(self):
+        self.run_annotator()
+        self.write("b.txt", contract("B Holdings"))
+        self.assertEqual(self.run_annotator(), ["b.txt"])
+        self.assertEqual(self.sources(), ["a.txt", "b.txt", "c.txt"])
+        [record] = [record for record in self.records() if record["source"] == "b.txt"]
+        self.assertIn("B Holdings", record["text"])
+
+    def test_new_annotator_version_reannotates_everything(self):
+        self.run_annotator()
+        self.auto_annotate.ANNOTATOR_VERSION += "-next"
+        self.assertEqual(self.run_annotator(), ["a.txt", "b.txt", "c.txt"])
+        self.assertEqual(self.sources(), ["a.txt", "b.txt", "c.txt"])
+
+    def test_records_of_removed_files_are_dropped(self):
+        self.run_annotator()
+        os.remove(os.path.join(self.input_dir, "a.txt"))
+        self.assertEqual(self.run_annotator(), [])
+        self.assertEqual(self.sources(), ["b.txt", "c.txt"])
+        self.assertNotIn("a.txt", self.auto_annotate.load_manifest(self.auto_annotate.MANIFEST_FILE))
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        self.assertEqual(self.run_annotator(interrupt_after=2), ["a.txt", "b.txt"])
+        # A partial line, as if the process died mid-write
+        with open(self.auto_annotate.OUTPUT_FILE, "a", encoding="utf-8") as f:
+            f.write('{"text": "This Agre')
+        self.assertEqual(self.run_annotator(), ["c.txt"])
+        self.assertEqual(self.sources(), ["a.txt", "b.txt", "c.txt"])
+
+
+if __name__ == '__main__':
+    unittest.main()
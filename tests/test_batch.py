@@ -0,0 +1,63 @@
+import unittest
+import os
+import sys
+import shutil
+import hashlib
+import zipfile
+import tempfile
+import importlib.util
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+REQUIREMENTS = all(importlib.util.find_spec(name) for name in ("spacy", "pytesseract", "pdf2image"))
+
+
+@unittest.skipUnless(REQUIREMENTS, "spacy, pytesseract and pdf2image are required")
+class TestExtractZip(unittest.TestCase):
+    def setUp(self):
+        from api.batch import extract_zip, UploadTooLarge
+        self.extract_zip = extract_zip
+        self.UploadTooLarge = UploadTooLarge
+        self.tmpdir = tempfile.mkdtemp()
+        self.zip_path = os.path.join(self.tmpdir, "batch.zip")
+        with zipfile.ZipFile(self.zip_path, "w") as archive:
+            archive.writestr("contracts/lease.pdf", b"%PDF-1.4 lease")
+            archive.writestr("loan.PDF", b"%PDF-1.4 loan")
+            archive.writestr("notes.txt", b"not a contract")
+            archive.writestr("__MACOSX/contracts/._lease.pdf", b"resource fork")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_extracts_only_pdfs(self):
+        documents = self.extract_zip(self.zip_path, directory=self.tmpdir)
+        self.assertEqual([d.filename for d in documents], ["lease.pdf", "loan.PDF"])
+        with open(documents[0].path, "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1.4 lease")
+        self.assertEqual(documents[1].sha256, hashlib.sha256(b"%PDF-1.4 loan").hexdigest())
+
+    def test_file_count_limit(self):
+        with self.assertRaises(self.UploadTooLarge):
+            self.extract_zip(self.zip_path, directory=self.tmpdir, max_files=1)
+        self.assertEqual(sorted(os.listdir(self.tmpdir)), ["batch.zip"])
+
+    def test_member_size_limit(self):
+        with self.assertRaises(self.UploadTooLarge):
+            self.extract_zip(self.zip_path, directory=self.tmpdir, max_bytes=10)
+        self.assertEqual(sorted(os.listdir(self.tmpdir)), ["batch.zip"])
+
+    def test_total_unpacked_size_limit(self):
+        # Each member is under the per-file limit, together they are not
+        with zipfile.ZipFile(self.zip_path, "w") as archive:
+            for i in range(5):
+                archive.writestr(f"contract-{i}.pdf", b"%PDF-1.4 " + b"0" * 1000)
+        with self.assertRaises(self.UploadTooLarge):
+            self.extract_zip(self.zip_path, directory=self.tmpdir, max_bytes=2000, max_total_bytes=3000)
+        self.assertEqual(sorted(os.listdir(self.tmpdir)), ["batch.zip"])
+        documents = self.extract_zip(self.zip_path, directory=self.tmpdir, max_bytes=2000, max_total_bytes=6000)
+        self.assertEqual(len(documents), 5)
+        self.assertEqual(sum(document.size for document in documents), 5 * 1009)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import importlib.util
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+REQUIREMENTS = all(importlib.util.find_spec(name) for name in ("pytesseract", "pdf2image", "cv2"))
+
+
+class FakeExecutor:
+    # Stands in for the OCR pool: every submitted document stays in progress
+    # until the test finishes it
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.futures = []
+
+    def submit(self, fn, input_path, output_path):
+        future = Future()
+        with self.lock:
+            self.futures.append((output_path, future))
+        return future
+
+    def finish_all(self):
+        with self.lock:
+            futures, self.futures = self.futures, []
+        for output_path, future in futures:
+            with open(output_path, "w") as f:
+                f.write("contract text")
+            future.set_result({"status": "success", "words": 2, "seconds": 0.0})
+        return len(futures)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@unittest.skipUnless(REQUIREMENTS, "pytesseract, pdf2image and opencv are required")
+class TestIngestDaemon(unittest.TestCase):
+    def setUp(self):
+        from src.preprocessing import ingest_daemon
+        self.ingest_daemon = ingest_daemon
+        self.tmpdir = tempfile.mkdtemp()
+        self.raw_dir = os.path.join(self.tmpdir, "raw")
+        self.interim_dir = os.path.join(self.tmpdir, "interim")
+        os.makedirs(self.raw_dir)
+        os.makedirs(self.interim_dir)
+        self.settings = (ingest_daemon.RAW_DIR, ingest_daemon.INTERIM_DIR, ingest_daemon.MANIFEST_FILE)
+        ingest_daemon.RAW_DIR = self.raw_dir
+        ingest_daemon.INTERIM_DIR = self.interim_dir
+        ingest_daemon.MANIFEST_FILE = os.path.join(self.interim_dir, "ocr_manifest.json")
+        self.threads = []
+        self.daemons = []
+
+    def tearDown(self):
+        for daemon in self.daemons:
+            daemon.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout=5)
+        self.ingest_daemon.RAW_DIR, self.ingest_daemon.INTERIM_DIR, self.ingest_daemon.MANIFEST_FILE = self.settings
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write_pdf(self, name, contents=b"%PDF-1.4 contract"):
+        with open(os.path.join(self.raw_dir, name), "wb") as f:
+            f.write(contents)
+
+    def start(self, daemon, target):
+        self.daemons.append(daemon)
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def test_file_is_picked_up_only_once_stable(self):
+        daemon = self.ingest_daemon.IngestDaemon(workers=1)
+        last_seen = {}
+        self.write_pdf("lease.pdf")
+        self.assertEqual(list(daemon.scan(last_seen)), [])
+        # Still being copied in: the size changed since the last scan
+        self.write_pdf("lease.pdf", b"%PDF-1.4 contract, more pages")
+        self.assertEqual(list(daemon.scan(last_seen)), [])
+        [(name, fingerprint)] = list(daemon.scan(last_seen))
+        self.assertEqual(name, "lease.pdf")
+        self.assertEqual(fingerprint["size"], len(b"%PDF-1.4 contract, more pages"))
+        daemon.pending.add("lease.pdf")
+        self.assertEqual(list(daemon.scan(last_seen)), [])
+
+    def test_full_queue_blocks_discovery(self):
+        daemon = self.ingest_daemon.IngestDaemon(workers=1, queue_size=2, poll_seconds=0.01)
+        daemon.executor = executor = FakeExecutor()
+        for i in range(6):
+            self.write_pdf(f"contract-{i}.pdf")
+        self.start(daemon, daemon.watch)
+        self.start(daemon, daemon.work)
+        # One document in progress, two queued, and the watcher waiting to put the fourth
+        self.assertTrue(wait_for(lambda: len(daemon.pending) == 4 and daemon.work_queue.full()))
+        time.sleep(0.2)
+        self.assertEqual(len(daemon.pending), 4)
+        self.assertEqual(len(executor.futures), 1)
+
+        finished = 0
+        while finished < 6:
+            self.assertTrue(wait_for(lambda: executor.futures))
+            finished += executor.finish_all()
+        self.assertTrue(wait_for(lambda: not daemon.pending))
+        self.assertEqual(len(daemon.manifest), 6)
+
+    def test_manifest_is_saved_in_batches(self):
+        daemon = self.ingest_daemon.IngestDaemon(workers=1)
+        fingerprint = {"sha256": "0" * 64, "size": 1, "mtime_ns": 1}
+        for i in range(self.ingest_daemon.MANIFEST_SAVE_DOCUMENTS - 1):
+            daemon.record(f"contract-{i}.pdf", fingerprint, {"status": "success", "seconds": 0.0})
+        self.assertFalse(os.path.exists(self.ingest_daemon.MANIFEST_FILE))
+        daemon.record("last.pdf", fingerprint, {"status": "success", "seconds": 0.0})
+        manifest = self.ingest_daemon.load_manifest(self.ingest_daemon.MANIFEST_FILE)
+        self.assertEqual(len(manifest), self.ingest_daemon.MANIFEST_SAVE_DOCUMENTS)
+        self.assertEqual(daemon.unsaved, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,7 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.postprocessing.rule_engine import apply_rules, deduplicate_entities
+from src.postprocessing.rule_engine import apply_rules, deduplicate_entities, apply_rules_batch
 
 
 class TestEndToEndPipeline(unittest.TestCase):
@@ -94,5 +94,20 @@ class TestQualityMetrics(unittest.TestCase):
         self.assertEqual(len(cleaned), 0)
 
 
+class TestBatchProcessing(unittest.TestCase):
+    def test_batch_matches_per_document_processing(self):
+        documents = [
+            [("15/01/2024", "EFFECTIVE_DATE"), ("Rs. 10 lakh", "TOTAL_AMOUNT"), ("ABC Corp", "PARTY_NAME")],
+            [],
+            [("ABC Corp", "PARTY_NAME"), ("ABC Corp", "PARTY_NAME"), ("X", "PARTY_NAME")],
+        ]
+        
+        batch = apply_rules_batch(documents)
+        
+        self.assertEqual(len(batch), len(documents))
+        for entities, result in zip(documents, batch):
+            self.assertEqual(result, deduplicate_entities(apply_rules(entities)))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
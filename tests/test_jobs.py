@@ -0,0 +1,107 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from api.jobs import JobStore, JobCancelled, QUEUED, RUNNING, DONE, CANCELLED, job_view
+
+
+class TestJobStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = JobStore(os.path.join(self.tmpdir, "jobs.db"))
+
+    def upload(self, contents=b"%PDF-1.4"):
+        fd, path = tempfile.mkstemp(suffix=".pdf", dir=self.tmpdir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(contents)
+        return path
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_lifecycle(self):
+        upload = self.upload()
+        job_id = self.store.create("contract.pdf", upload)
+        self.assertEqual(self.store.get(job_id)["status"], QUEUED)
+        self.assertFalse(os.path.exists(upload))
+        self.assertTrue(os.path.exists(self.store.upload_path(job_id)))
+
+        self.assertEqual(self.store.claim_next(), job_id)
+        self.assertIsNone(self.store.claim_next())
+        self.store.update_progress(job_id, 3, 10)
+        view = job_view(self.store.get(job_id))
+        self.assertEqual(view["status"], RUNNING)
+        self.assertEqual(view["progress"], {"pages_done": 3, "pages_total": 10, "percent": 30.0})
+
+        result = {"success": True, "entities": []}
+        self.store.finish(job_id, DONE, result=result)
+        view = job_view(self.store.get(job_id))
+        self.assertEqual(view["status"], DONE)
+        self.assertEqual(view["result"], result)
+        self.assertFalse(os.path.exists(self.store.upload_path(job_id)))
+
+    def test_failed_create_leaves_no_upload(self):
+        upload = self.upload()
+        with mock.patch.object(self.store, "connect", side_effect=sqlite3.OperationalError("database is locked")):
+            with self.assertRaises(sqlite3.OperationalError):
+                self.store.create("contract.pdf", upload)
+        self.assertEqual([name for name in os.listdir(self.tmpdir) if name.endswith(".pdf")], [])
+
+    def test_claims_in_submission_order(self):
+        first = self.store.create("a.pdf", self.upload(b"a"))
+        second = self.store.create("b.pdf", self.upload(b"b"))
+        self.assertEqual(self.store.claim_next(), first)
+        self.assertEqual(self.store.claim_next(), second)
+
+    def test_cancel_queued_job(self):
+        job_id = self.store.create("contract.pdf", self.upload())
+        self.assertTrue(self.store.cancel(job_id))
+        self.assertEqual(self.store.get(job_id)["status"], CANCELLED)
+        self.assertIsNone(self.store.claim_next())
+        self.assertFalse(os.path.exists(self.store.upload_path(job_id)))
+
+    def test_cancel_reaches_running_job(self):
+        job_id = self.store.create("contract.pdf", self.upload())
+        self.store.claim_next()
+        self.store.update_progress(job_id, 1, 5)
+        self.assertTrue(self.store.cancel(job_id))
+        with self.assertRaises(JobCancelled):
+            self.store.update_progress(job_id, 2, 5)
+        # A late finish from the worker does not overwrite the cancellation
+        self.store.finish(job_id, DONE, result={})
+        self.assertEqual(self.store.get(job_id)["status"], CANCELLED)
+
+    def test_finished_jobs_cannot_be_cancelled_only_deleted(self):
+        job_id = self.store.create("contract.pdf", self.upload())
+        self.store.claim_next()
+        self.store.finish(job_id, DONE, result={})
+        self.assertFalse(self.store.cancel(job_id))
+        self.assertTrue(self.store.delete(job_id))
+        self.assertIsNone(self.store.get(job_id))
+
+    def test_running_jobs_survive_restart(self):
+        job_id = self.store.create("contract.pdf", self.upload())
+        self.store.claim_next()
+        self.store.update_progress(job_id, 4, 10)
+
+        restarted = JobStore(self.store.db_path)
+        self.assertEqual(restarted.requeue_running(), 1)
+        job = restarted.get(job_id)
+        self.assertEqual(job["status"], QUEUED)
+        self.assertEqual(job["pages_done"], 0)
+        self.assertEqual(restarted.claim_next(), job_id)
+
+    def test_job_view_is_json_serializable(self):
+        job_id = self.store.create("contract.pdf", self.upload())
+        json.dumps(job_view(self.store.get(job_id)))
+
+
+if __name__ == '__main__':
+    unittest.main()
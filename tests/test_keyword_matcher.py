@@ -0,0 +1,63 @@
+import unittest
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.postprocessing.keyword_matcher import KeywordMatcher
+
+
+def naive_find_all(phrases, text):
+    lowered = text.lower()
+    matches = set()
+    for phrase in phrases:
+        start = lowered.find(phrase)
+        while start != -1:
+            matches.add((start, start + len(phrase), phrase))
+            start = lowered.find(phrase, start + 1)
+    return matches
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    def test_finds_overlapping_phrases_in_one_pass(self):
+        matcher = KeywordMatcher(["governed by", "governed by the laws of", "laws of"])
+        
+        matches = matcher.find_all("This Agreement shall be Governed By the laws of India")
+        
+        self.assertEqual(
+            sorted(matches),
+            [(24, 35, "governed by"), (24, 47, "governed by the laws of"), (40, 47, "laws of")]
+        )
+    
+    def test_matches_naive_search(self):
+        rng = random.Random(3)
+        phrases = ["ab", "abc", "bca", "c", "aab", "cab"]
+        matcher = KeywordMatcher(phrases)
+        for _ in range(200):
+            text = ''.join(rng.choice("abc ") for _ in range(60))
+            
+            self.assertEqual(set(matcher.find_all(text)), naive_find_all(phrases, text))
+    
+    def test_whole_words(self):
+        matcher = KeywordMatcher(["act"], whole_words=True)
+        
+        self.assertEqual(matcher.find_all("the Act and the contract"), [(4, 7, "act")])
+    
+    def test_is_keyword_requires_exact_match(self):
+        matcher = KeywordMatcher(["board of directors", "act"])
+        
+        self.assertTrue(matcher.is_keyword("Board of Directors"))
+        self.assertFalse(matcher.is_keyword("board"))
+        self.assertFalse(matcher.is_keyword("acts"))
+    
+    def test_remove_prefers_longest_match(self):
+        matcher = KeywordMatcher(["hereinafter", "referred to as", "the party"])
+        
+        cleaned = matcher.remove("ABC Ltd hereinafter referred to as The Party")
+        
+        self.assertEqual(cleaned.split(), ["ABC", "Ltd"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.manifest import load_manifest, save_manifest, update_manifest
+
+
+def record_entries(path, writer, count):
+    for i in range(count):
+        update_manifest(path, {f"{writer}-{i}.pdf": {"status": "success"}})
+
+
+class TestUpdateManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "manifest.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_keeps_entries_written_by_another_writer(self):
+        save_manifest({"a.pdf": {"status": "success"}}, self.path)
+        merged = update_manifest(self.path, {"b.pdf": {"status": "failed"}})
+        self.assertEqual(set(merged), {"a.pdf", "b.pdf"})
+        self.assertEqual(load_manifest(self.path), merged)
+
+    def test_concurrent_writers_lose_no_entries(self):
+        context = multiprocessing.get_context("fork")
+        writers = [context.Process(target=record_entries, args=(self.path, writer, 25)) for writer in range(4)]
+        for process in writers:
+            process.start()
+        for process in writers:
+            process.join()
+        self.assertEqual(len(load_manifest(self.path)), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from api import metrics
+from api.metrics import Registry, Counter, Gauge, Histogram
+from src.utils.stage_timer import stage, collect_timings
+
+
+def timed_work(value):
+    with stage("ocr"):
+        pass
+    with stage("ocr"):
+        pass
+    with stage("ner"):
+        return value * 2
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_renders_labels(self):
+        requests = Counter(self.registry, "test_requests_total", "Requests", ("endpoint", "status"))
+        requests.inc("/extract", "200")
+        requests.inc("/extract", "200")
+        requests.inc("/health", "200")
+        text = self.registry.render()
+        self.assertIn("# TYPE test_requests_total counter", text)
+        self.assertIn('test_requests_total{endpoint="/extract",status="200"} 2', text)
+        self.assertIn('test_requests_total{endpoint="/health",status="200"} 1', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        latency = Histogram(self.registry, "test_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+        latency.observe(0.05, "ocr")
+        latency.observe(0.5, "ocr")
+        latency.observe(5.0, "ocr")
+        text = self.registry.render()
+        self.assertIn('test_seconds_bucket{stage="ocr",le="0.1"} 1', text)
+        self.assertIn('test_seconds_bucket{stage="ocr",le="1"} 2', text)
+        self.assertIn('test_seconds_bucket{stage="ocr",le="+Inf"} 3', text)
+        self.assertIn('test_seconds_count{stage="ocr"} 3', text)
+        self.assertIn('test_seconds_sum{stage="ocr"} 5.55', text)
+
+    def test_gauge_function_is_read_at_scrape_time(self):
+        depth = {"queued": 1}
+        Gauge(self.registry, "test_jobs", "Jobs", ("status",),
+              function=lambda: {(status,): n for status, n in depth.items()})
+        self.assertIn('test_jobs{status="queued"} 1', self.registry.render())
+        depth["queued"] = 4
+        self.assertIn('test_jobs{status="queued"} 4', self.registry.render())
+
+    def test_const_labels_are_added_to_every_series(self):
+        self.registry.const_labels = (("pid", "42"),)
+        Counter(self.registry, "test_total", "Test", ("endpoint",)).inc("/extract")
+        Gauge(self.registry, "test_in_flight", "Test").set(3)
+        text = self.registry.render()
+        self.assertIn('test_total{pid="42",endpoint="/extract"} 1', text)
+        self.assertIn('test_in_flight{pid="42"} 3', text)
+
+    def test_label_values_are_escaped(self):
+        Counter(self.registry, "test_total", "Test", ("name",)).inc('a"b')
+        self.assertIn('test_total{name="a\\"b"} 1', self.registry.render())
+
+
+class TestRuleCacheGauges(unittest.TestCase):
+    def tearDown(self):
+        metrics.worker_rule_caches.clear()
+
+    def test_sums_the_latest_report_of_live_workers(self):
+        stats = lambda hits, size: {"normalize_date": {"hits": hits, "misses": 1, "size": size}}
+        metrics.record_rule_caches(101, stats(5, 2))
+        metrics.record_rule_caches(101, stats(7, 3))
+        metrics.record_rule_caches(102, stats(10, 4))
+        metrics.record_rule_caches(103, stats(100, 50))
+        with mock.patch.object(metrics, "live_worker_pids", return_value={101, 102}):
+            text = metrics.registry.render()
+        self.assertIn('lexiscan_rule_cache_hits{cache="normalize_date"} 17', text)
+        self.assertIn('lexiscan_rule_cache_misses{cache="normalize_date"} 2', text)
+        self.assertIn('lexiscan_rule_cache_entries{cache="normalize_date"} 7', text)
+        self.assertEqual(set(metrics.worker_rule_caches), {101, 102})
+
+
+class TestStageTimer(unittest.TestCase):
+    def test_collects_stages_for_one_call(self):
+        result, timings = collect_timings(timed_work, 21)
+        self.assertEqual(result, 42)
+        self.assertEqual(len(timings["ocr"]), 2)
+        self.assertEqual(len(timings["ner"]), 1)
+
+    def test_stage_is_a_no_op_outside_collection(self):
+        self.assertEqual(timed_work(1), 2)
+        _, timings = collect_timings(timed_work, 1)
+        self.assertEqual(len(timings["ocr"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
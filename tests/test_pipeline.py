@@ -0,0 +1,62 @@
+import unittest
+import os
+import sys
+import importlib.util
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+REQUIREMENTS = all(importlib.util.find_spec(name) for name in ("spacy", "pytesseract", "pdf2image", "cv2"))
+
+
+def entity(text, label):
+    return {"text": text, "label": label}
+
+
+@unittest.skipUnless(REQUIREMENTS, "spacy, pytesseract, pdf2image and opencv are required")
+class TestEarlyExit(unittest.TestCase):
+    def setUp(self):
+        from api import pipeline
+        self.pipeline = pipeline
+        self.saved = (pipeline.rasterize_pdf, pipeline.process_page, pipeline.CRITICAL_LABELS, pipeline.FUZZY_DEDUP)
+
+    def tearDown(self):
+        (self.pipeline.rasterize_pdf, self.pipeline.process_page, self.pipeline.CRITICAL_LABELS,
+         self.pipeline.FUZZY_DEDUP) = self.saved
+
+    def run_pages(self, pages):
+        # pages: the entities found on each page, in order
+        self.pipeline.CRITICAL_LABELS = ["PARTY_NAME", "EFFECTIVE_DATE"]
+        self.pipeline.rasterize_pdf = lambda path, folder, first_page, last_page: list(range(first_page, last_page + 1))
+        self.pipeline.process_page = lambda page: {"text": "x" * 100, "entities": pages[page - 1]}
+        return self.pipeline.extract_entities_until_critical("contract.pdf", 1, len(pages))
+
+    def test_repeated_party_counts_once(self):
+        repeated = [entity("ABC Corp", "PARTY_NAME"), entity("2024-01-15", "EFFECTIVE_DATE")]
+        self.assertFalse(self.pipeline.critical_labels_found(repeated + [entity("abc corp ", "PARTY_NAME")],
+                                                             {"PARTY_NAME": 2}))
+        result = self.run_pages([repeated, [entity("ABC Corp", "PARTY_NAME")], [entity("XYZ Ltd", "PARTY_NAME")], []])
+        self.assertTrue(result["stopped_early"])
+        self.assertEqual(result["pages_processed"], 3)
+
+    def test_reads_every_page_without_a_second_party(self):
+        page = [entity("ABC Corp", "PARTY_NAME"), entity("2024-01-15", "EFFECTIVE_DATE")]
+        result = self.run_pages([page, page, page])
+        self.assertFalse(result["stopped_early"])
+        self.assertEqual(result["pages_processed"], 3)
+
+    def test_fuzzy_dedup_counts_name_variants_once(self):
+        self.assertIn("fuzzy_dedup", self.pipeline.PIPELINE_CONFIG)
+        self.pipeline.FUZZY_DEDUP = True
+        pages = [
+            [entity("ABC Corp", "PARTY_NAME"), entity("2024-01-15", "EFFECTIVE_DATE")],
+            [entity("ABC Corporation Pvt. Ltd", "PARTY_NAME")],
+            [entity("XYZ Industries Ltd", "PARTY_NAME")],
+        ]
+        result = self.run_pages(pages + [[]])
+        self.assertEqual(result["pages_processed"], 3)
+        self.assertEqual([e["text"] for e in result["entities"] if e["label"] == "PARTY_NAME"],
+                         ["ABC Corporation Pvt. Ltd", "XYZ Industries Ltd"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import os
+import sys
+import shutil
+import pstats
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from api import profiling
+from src.utils.stage_timer import stage, collect_timings
+
+
+def slow_sum(n):
+    with stage("ocr"):
+        return sum(i * i for i in range(n))
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.settings = (profiling.PROFILING_ENABLED, profiling.PROFILE_TOKEN)
+
+    def tearDown(self):
+        profiling.PROFILING_ENABLED, profiling.PROFILE_TOKEN = self.settings
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_run_profiled_writes_artifacts(self):
+        result, timings = collect_timings(profiling.run_profiled, "run-1", self.tmpdir, slow_sum, 1000)
+        self.assertEqual(result, sum(i * i for i in range(1000)))
+        self.assertEqual(len(timings["ocr"]), 1)
+        stats = pstats.Stats(os.path.join(self.tmpdir, "run-1.prof"))
+        self.assertTrue(any(name == "slow_sum" for _, _, name in stats.stats))
+        with open(os.path.join(self.tmpdir, "run-1.txt")) as f:
+            self.assertIn("slow_sum", f.read())
+
+    def test_server_timing_sums_stages(self):
+        header = profiling.server_timing({"ocr": [0.5, 0.25], "ner": [0.1]}, total_seconds=1.0)
+        self.assertEqual(header, "ocr;dur=750.0, ner;dur=100.0, total;dur=1000.0")
+
+    def test_profile_id_cannot_escape_directory(self):
+        with self.assertRaises(ValueError):
+            profiling.profile_path("../etc/passwd", ".txt", self.tmpdir)
+        self.assertEqual(profiling.profile_path("abc", ".txt", self.tmpdir), os.path.join(self.tmpdir, "abc.txt"))
+
+    def test_allowed_only_when_enabled_and_token_matches(self):
+        profiling.PROFILING_ENABLED, profiling.PROFILE_TOKEN = False, ""
+        self.assertFalse(profiling.profile_allowed(None))
+        profiling.PROFILING_ENABLED = True
+        self.assertTrue(profiling.profile_allowed(None))
+        profiling.PROFILE_TOKEN = "secret"
+        self.assertFalse(profiling.profile_allowed(None))
+        self.assertFalse(profiling.profile_allowed("wrong"))
+        self.assertTrue(profiling.profile_allowed("secret"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from api.result_cache import ResultCache, cache_key
+
+RESPONSE = {"success": True, "entities": [{"text": "ABC Corp", "label": "PARTY_NAME"}], "metadata": {}}
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_key_covers_file_model_and_config(self):
+        base = cache_key("abc", "model-1", {"ocr_dpi": 300})
+        self.assertEqual(base, cache_key("abc", "model-1", {"ocr_dpi": 300}))
+        self.assertNotEqual(base, cache_key("abd", "model-1", {"ocr_dpi": 300}))
+        self.assertNotEqual(base, cache_key("abc", "model-2", {"ocr_dpi": 300}))
+        self.assertNotEqual(base, cache_key("abc", "model-1", {"ocr_dpi": 200}))
+
+    def test_hit_and_miss(self):
+        cache = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=1024 * 1024)
+        self.assertIsNone(cache.get("k"))
+        cache.put("k", RESPONSE)
+        self.assertEqual(cache.get("k"), RESPONSE)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_persists_across_restarts(self):
+        ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=1024 * 1024).put("k", RESPONSE)
+        reopened = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=1024 * 1024)
+        self.assertEqual(reopened.get("k"), RESPONSE)
+
+    def test_expired_entries_are_dropped(self):
+        cache = ResultCache(self.tmpdir, ttl_seconds=0.05, max_bytes=1024 * 1024)
+        cache.put("k", RESPONSE)
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_size_bound_evicts_least_recently_used(self):
+        cache = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=1024 * 1024)
+        cache.put("probe", RESPONSE)
+        entry_size = cache.total_bytes
+        cache._discard("probe")
+
+        cache = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=int(entry_size * 2.5))
+        cache.put("a", RESPONSE)
+        cache.put("b", RESPONSE)
+        cache.get("a")
+        cache.put("c", RESPONSE)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertLessEqual(cache.total_bytes, cache.max_bytes)
+
+    def test_shared_directory_between_processes(self):
+        first = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=1024 * 1024)
+        second = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=1024 * 1024)
+        first.put("k", RESPONSE)
+        self.assertEqual(second.get("k"), RESPONSE)
+        second._discard("k")
+        self.assertIsNone(first.get("k"))
+        self.assertEqual(first.stats()["entries"], 0)
+
+    def test_size_bound_covers_entries_written_by_others(self):
+        probe = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=1024 * 1024)
+        probe.put("probe", RESPONSE)
+        entry_size = probe.total_bytes
+        probe._discard("probe")
+
+        first = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=int(entry_size * 2.5), rescan_seconds=0)
+        second = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=int(entry_size * 2.5), rescan_seconds=0)
+        first.put("a", RESPONSE)
+        second.put("b", RESPONSE)
+        first.put("c", RESPONSE)
+        self.assertEqual(sorted(os.listdir(self.tmpdir)), ["b.json", "c.json"])
+
+    def test_put_updates_the_index_without_rescanning(self):
+        first = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=1024 * 1024, rescan_seconds=3600)
+        second = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=1024 * 1024)
+        second.put("other", RESPONSE)
+        first.put("k", RESPONSE)
+        first.put("k", RESPONSE)
+        self.assertEqual(sorted(first.index), ["k"])
+        self.assertEqual(first.total_bytes, os.path.getsize(os.path.join(self.tmpdir, "k.json")))
+        # Entries written by other processes are counted at the next rescan
+        first.last_scan -= 3600
+        first.put("k", RESPONSE)
+        self.assertEqual(sorted(first.index), ["k", "other"])
+
+    def test_disabled_when_size_is_zero(self):
+        cache = ResultCache(self.tmpdir, ttl_seconds=60, max_bytes=0)
+        cache.put("k", RESPONSE)
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
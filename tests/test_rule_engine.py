@@ -0,0 +1,158 @@
+import unittest
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.postprocessing.rule_based_processer import RuleBasedProcessor
+from src.postprocessing.rule_engine import apply_rules, deduplicate_entities, LABEL_RULES, CRITICAL_LABELS
+
+LABELS_FILE = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'final_labels.json')
+
+
+class TestNormalizationCache(unittest.TestCase):
+    def test_repeated_values_hit_the_cache(self):
+        processor = RuleBasedProcessor(cache_size=16)
+        
+        for _ in range(3):
+            self.assertEqual(processor.normalize_date("31st December 2025"), "2025-12-31")
+        
+        stats = processor.cache_stats()['normalize_date']
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+    
+    def test_cache_is_bounded(self):
+        processor = RuleBasedProcessor(cache_size=2)
+        
+        for name in ["A Corp", "B Corp", "C Corp", "A Corp"]:
+            processor.clean_party_name(name)
+        
+        stats = processor.cache_stats()['clean_party_name']
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['hits'], 0)
+    
+    def test_cached_amount_cannot_be_mutated(self):
+        processor = RuleBasedProcessor(cache_size=16)
+        
+        first = processor.normalize_amount("INR 10 lakh")
+        first['normalized'] = 'tampered'
+        
+        self.assertEqual(processor.normalize_amount("INR 10 lakh")['normalized'], "1000000.00")
+    
+    def test_zero_size_disables_caching(self):
+        processor = RuleBasedProcessor(cache_size=0)
+        
+        processor.normalize_date("2024-01-15")
+        processor.normalize_date("2024-01-15")
+        
+        self.assertEqual(processor.cache_stats()['normalize_date']['size'], 0)
+
+
+class TestFuzzyDeduplication(unittest.TestCase):
+    def test_corporate_suffix_variants_collapse(self):
+        entities = apply_rules([
+            ("ABC Corp", "PARTY_NAME"),
+            ("XYZ Industries Ltd.", "PARTY_NAME"),
+            ("ABC Corporation", "PARTY_NAME"),
+            ("ABC Corp.", "PARTY_NAME"),
+            ("XYZ Industries Limited", "PARTY_NAME"),
+        ])
+        
+        final = deduplicate_entities(entities, fuzzy=True)
+        
+        self.assertEqual([e['text'] for e in final], ["ABC Corporation", "XYZ Industries Limited"])
+    
+    def test_keep_most_frequent_surface_form(self):
+        entities = [
+            {'text': "ABC Corp", 'label': "PARTY_NAME"},
+            {'text': "ABC Corporation", 'label': "PARTY_NAME"},
+            {'text': "ABC Corp", 'label': "PARTY_NAME"},
+        ]
+        
+        final = deduplicate_entities(entities, fuzzy=True, keep='frequent')
+        
+        self.assertEqual([e['text'] for e in final], ["ABC Corp"])
+    
+    def test_threshold_controls_near_matches(self):
+        entities = [
+            {'text': "Reliance Industries", 'label': "PARTY_NAME"},
+            {'text': "Reliance Industires", 'label': "PARTY_NAME"},
+        ]
+        
+        self.assertEqual(len(deduplicate_entities(entities, fuzzy=True, threshold=0.9)), 1)
+        self.assertEqual(len(deduplicate_entities(entities, fuzzy=True, threshold=0.99)), 2)
+    
+    def test_names_without_a_core_are_kept(self):
+        entities = [
+            {'text': "Ltd.", 'label': "PARTY_NAME"},
+            {'text': "Private Limited", 'label': "PARTY_NAME"},
+            {'text': "M/s. ", 'label': "PARTY_NAME"},
+            {'text': "&", 'label': "PARTY_NAME"},
+            {'text': "m/s. ", 'label': "PARTY_NAME"},
+            {'text': "ABC Corp", 'label': "PARTY_NAME"},
+        ]
+        
+        final = deduplicate_entities(entities, fuzzy=True)
+        
+        self.assertEqual([e['text'] for e in final], ["Ltd.", "Private Limited", "M/s. ", "&", "ABC Corp"])
+    
+    def test_other_labels_use_exact_matching(self):
+        entities = [
+            {'text': "Mumbai", 'label': "JURISDICTION"},
+            {'text': "mumbai", 'label': "JURISDICTION"},
+            {'text': "Mumbai High Court", 'label': "JURISDICTION"},
+        ]
+        
+        self.assertEqual(len(deduplicate_entities(entities, fuzzy=True)), 2)
+        self.assertEqual(
+            len(deduplicate_entities(entities, fuzzy=True, fuzzy_labels=('JURISDICTION',), threshold=0.5)),
+            1
+        )
+
+
+class TestLabelRules(unittest.TestCase):
+    def test_every_annotation_label_has_a_rule(self):
+        with open(LABELS_FILE) as f:
+            labels = [item['text'] for item in json.load(f)]
+        
+        self.assertEqual(sorted(labels), sorted(LABEL_RULES))
+    
+    def test_critical_labels_are_known_labels(self):
+        self.assertTrue(set(CRITICAL_LABELS) <= set(LABEL_RULES))
+    
+    def test_new_label_normalizers(self):
+        cleaned = apply_rules([
+            ("12.5 % p.a.", "INTEREST_RATE"),
+            ("thirty (30) days", "TERMINATION_NOTICE_PERIOD"),
+            ("a period of two years", "CONFIDENTIALITY_PERIOD"),
+            ("governed by the laws of the Republic of India.", "GOVERNING_LAW"),
+            ("first  charge on   plant and machinery", "COLLATERAL"),
+        ])
+        
+        self.assertEqual(
+            [e['text'] for e in cleaned],
+            ["12.5% per annum", "30 days", "2 years", "Republic of India", "first charge on plant and machinery"]
+        )
+    
+    def test_new_label_validators(self):
+        cleaned = apply_rules([
+            ("per annum", "INTEREST_RATE"),
+            ("as agreed", "TERMINATION_NOTICE_PERIOD"),
+            ("12345", "GOVERNING_LAW"),
+        ])
+        
+        self.assertEqual(cleaned, [])
+    
+    def test_profiling_records_each_label(self):
+        processor = RuleBasedProcessor(profile=True)
+        
+        processor.process_entities([("2024-01-15", "EFFECTIVE_DATE"), ("ABC Corp", "PARTY_NAME"), ("ABC Corp", "PARTY_NAME")])
+        
+        profile = processor.rule_profile()
+        self.assertEqual(profile['PARTY_NAME']['calls'], 2)
+        self.assertEqual(profile['EFFECTIVE_DATE']['calls'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
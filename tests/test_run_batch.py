@@ -0,0 +1,111 @@
+import unittest
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import importlib.util
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+REQUIREMENTS = all(importlib.util.find_spec(name) for name in ("pytesseract", "pdf2image", "cv2"))
+
+
+@unittest.skipUnless(REQUIREMENTS, "pytesseract, pdf2image and opencv are required")
+class TestShards(unittest.TestCase):
+    def setUp(self):
+        from src.preprocessing import run_batch
+        self.run_batch = run_batch
+        self.tmpdir = tempfile.mkdtemp()
+        self.raw_dir = os.path.join(self.tmpdir, "raw")
+        self.interim_dir = os.path.join(self.tmpdir, "interim")
+        os.makedirs(self.raw_dir)
+        os.makedirs(self.interim_dir)
+        self.settings = (run_batch.RAW_DIR, run_batch.INTERIM_DIR, run_batch.MANIFEST_FILE, run_batch.run_jobs)
+        run_batch.RAW_DIR = self.raw_dir
+        run_batch.INTERIM_DIR = self.interim_dir
+        run_batch.MANIFEST_FILE = os.path.join(self.interim_dir, "ocr_manifest.json")
+        run_batch.run_jobs = self.fake_run_jobs
+        self.processed = []
+        self.failing = set()
+        self.pdf_files = [f"contract-{i:03d}.pdf" for i in range(40)]
+        for pdf_file in self.pdf_files:
+            with open(os.path.join(self.raw_dir, pdf_file), "wb") as f:
+                f.write(f"%PDF-1.4 {pdf_file}".encode())
+
+    def tearDown(self):
+        (self.run_batch.RAW_DIR, self.run_batch.INTERIM_DIR, self.run_batch.MANIFEST_FILE,
+         self.run_batch.run_jobs) = self.settings
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def fake_run_jobs(self, jobs, workers, on_result):
+        # OCR without Tesseract: every document "succeeds" unless listed in self.failing
+        for pdf_file, input_path, output_path in jobs:
+            self.processed.append(pdf_file)
+            if pdf_file in self.failing:
+                on_result(pdf_file, {"status": "failed", "error": "worker process crashed", "seconds": 0.0})
+                continue
+            with open(output_path, "w") as f:
+                f.write("contract text")
+            on_result(pdf_file, {"status": "success", "words": 2, "seconds": 0.0})
+
+    def run_shards(self, count, indices=None):
+        assigned = {}
+        for index in range(count) if indices is None else indices:
+            self.processed = []
+            self.run_batch.process_pdfs(workers=1, shard=(index, count))
+            assigned[index] = self.processed
+        return assigned
+
+    def test_assignment_is_stable(self):
+        # Nodes compute the assignment independently, so it must never depend
+        # on the process (e.g. the str hash seed) or change between releases
+        shard_of = self.run_batch.shard_of
+        self.assertEqual([shard_of("lease.pdf", count) for count in (2, 3, 4, 7)], [1, 0, 3, 0])
+        self.assertEqual([shard_of("nda_2024.PDF", count) for count in (2, 3, 4, 7)], [0, 1, 0, 5])
+        self.assertTrue(all(shard_of(pdf_file, 1) == 0 for pdf_file in self.pdf_files))
+
+    def test_shards_are_disjoint_and_cover_every_document(self):
+        for count in (1, 2, 3, 5):
+            with self.subTest(count=count):
+                assigned = self.run_shards(count)
+                files = [pdf_file for index in assigned for pdf_file in assigned[index]]
+                self.assertEqual(sorted(files), self.pdf_files)
+                for index, pdf_files in assigned.items():
+                    self.assertTrue(all(self.run_batch.shard_of(f, count) == index for f in pdf_files))
+                # Already merged documents count as done on the next sharded run
+                self.run_batch.merge_shard_manifests()
+                self.assertEqual(self.run_shards(count), {index: [] for index in range(count)})
+                for name in os.listdir(self.interim_dir):
+                    os.remove(os.path.join(self.interim_dir, name))
+
+    def test_merge_keeps_every_entry(self):
+        self.run_shards(3)
+        self.assertEqual(self.run_batch.merge_shard_manifests(), 0)
+        manifest = self.run_batch.load_manifest(self.run_batch.MANIFEST_FILE)
+        self.assertEqual(sorted(manifest), self.pdf_files)
+        self.assertTrue(all(entry["status"] == "success" for entry in manifest.values()))
+
+    def test_merge_reports_stragglers(self):
+        self.failing = {self.pdf_files[0]}
+        assigned = self.run_shards(3, indices=[0, 1])
+        missing = [pdf_file for pdf_file in self.pdf_files if self.run_batch.shard_of(pdf_file, 3) == 2]
+        stragglers = len(missing) + (self.pdf_files[0] not in missing)
+        self.assertEqual(self.run_batch.merge_shard_manifests(), stragglers)
+        manifest = self.run_batch.load_manifest(self.run_batch.MANIFEST_FILE)
+        self.assertEqual(sorted(manifest), sorted(assigned[0] + assigned[1]))
+
+        # Re-running the missing shard and the failed document clears them
+        self.failing = set()
+        self.run_shards(3)
+        self.assertEqual(self.run_batch.merge_shard_manifests(), 0)
+
+    def test_parse_shard(self):
+        self.assertEqual(self.run_batch.parse_shard("1/4"), (1, 4))
+        for value in ("4/4", "-1/4", "0/0", "1", "a/b"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                self.run_batch.parse_shard(value)
+
+
+if __name__ == '__main__':
+    unittest.main()
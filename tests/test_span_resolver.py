@@ -0,0 +1,46 @@
+import unittest
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.postprocessing.span_resolver import resolve_overlaps
+
+
+def naive_resolve(spans):
+    spans = sorted(spans, key=lambda x: (x[0], -(x[1] - x[0])))
+    final = []
+    for span in spans:
+        start, end, _ = span
+        if not any(start < e_end and end > e_start for e_start, e_end, _ in final):
+            final.append(span)
+    return final
+
+
+class TestSpanResolver(unittest.TestCase):
+    def test_longest_span_wins_at_same_start(self):
+        spans = [[10, 14, "EFFECTIVE_DATE"], [10, 25, "TOTAL_AMOUNT"], [20, 30, "PARTY_NAME"]]
+        
+        resolved = resolve_overlaps(spans)
+        
+        self.assertEqual(resolved, [[10, 25, "TOTAL_AMOUNT"]])
+    
+    def test_adjacent_spans_are_kept(self):
+        spans = [[0, 5, "PARTY_NAME"], [5, 9, "JURISDICTION"]]
+        
+        self.assertEqual(resolve_overlaps(spans), spans)
+    
+    def test_matches_quadratic_resolver(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            spans = []
+            for _ in range(200):
+                start = rng.randint(0, 1000)
+                spans.append([start, start + rng.randint(1, 40), rng.choice(["A", "B", "C"])])
+            
+            self.assertEqual(resolve_overlaps(spans), naive_resolve(spans))
+
+
+if __name__ == '__main__':
+    unittest.main()
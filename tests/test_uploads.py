@@ -0,0 +1,108 @@
+import unittest
+import os
+import sys
+import shutil
+import asyncio
+import hashlib
+import tempfile
+import importlib.util
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+REQUIREMENTS = importlib.util.find_spec("python_multipart") or importlib.util.find_spec("multipart")
+BOUNDARY = "testboundary"
+
+
+def multipart_body(parts):
+    body = b""
+    for name, filename, contents in parts:
+        body += (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                 f'Content-Type: application/pdf\r\n\r\n').encode() + contents + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+class FakeRequest:
+    # Delivers the body in small chunks, like a chunked upload without Content-Length
+    def __init__(self, body, content_type=f"multipart/form-data; boundary={BOUNDARY}", chunk_size=64 * 1024):
+        self.headers = {"content-type": content_type}
+        self.body = body
+        self.chunk_size = chunk_size
+        self.chunks_read = 0
+
+    async def stream(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            self.chunks_read += 1
+            yield self.body[start:start + self.chunk_size]
+
+
+@unittest.skipUnless(REQUIREMENTS, "python-multipart is required")
+class TestReceiveFiles(unittest.TestCase):
+    def setUp(self):
+        from api import uploads
+        self.uploads = uploads
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def receive(self, request, **options):
+        return asyncio.run(self.uploads.receive_files(request, directory=self.tmpdir, **options))
+
+    def test_streams_file_parts_to_disk(self):
+        contents = os.urandom(3 * 1024 * 1024 + 17)
+        [upload] = self.receive(FakeRequest(multipart_body([("file", "contract.pdf", contents)])),
+                                max_bytes=10 * 1024 * 1024)
+        self.assertEqual(upload.filename, "contract.pdf")
+        self.assertEqual(upload.size, len(contents))
+        self.assertEqual(upload.sha256, hashlib.sha256(contents).hexdigest())
+        self.assertEqual(os.path.dirname(upload.path), self.tmpdir)
+        with open(upload.path, "rb") as f:
+            self.assertEqual(f.read(), contents)
+
+    def test_several_files_in_request_order(self):
+        body = multipart_body([("files", "a.pdf", b"%PDF a"), ("other", "x.pdf", b"skipped"), ("files", "b.zip", b"PK b")])
+        uploads = self.receive(FakeRequest(body), field="files", suffixes=(".pdf", ".zip"), max_files=5)
+        self.assertEqual([upload.filename for upload in uploads], ["a.pdf", "b.zip"])
+        self.assertTrue(uploads[1].path.endswith(".zip"))
+        self.assertEqual(len(os.listdir(self.tmpdir)), 2)
+
+    def test_oversized_chunked_upload_is_cut_off_and_removed(self):
+        request = FakeRequest(multipart_body([("file", "big.pdf", b"x" * (4 * 1024 * 1024))]))
+        with self.assertRaises(self.uploads.UploadTooLarge):
+            self.receive(request, max_bytes=1024 * 1024)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+        self.assertLess(request.chunks_read, len(request.body) // request.chunk_size)
+
+    def test_invalid_uploads_are_rejected(self):
+        with self.assertRaises(self.uploads.InvalidUpload):
+            self.receive(FakeRequest(multipart_body([("file", "notes.txt", b"text")])))
+        with self.assertRaises(self.uploads.InvalidUpload):
+            self.receive(FakeRequest(multipart_body([("other", "a.pdf", b"%PDF")])))
+        with self.assertRaises(self.uploads.InvalidUpload):
+            self.receive(FakeRequest(b"{}", content_type="application/json"))
+        truncated = multipart_body([("file", "a.pdf", b"%PDF" * 1000)])[:2000]
+        with self.assertRaises(self.uploads.InvalidUpload):
+            self.receive(FakeRequest(truncated, chunk_size=500))
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_too_many_files(self):
+        body = multipart_body([("file", "a.pdf", b"a"), ("file", "b.pdf", b"b")])
+        with self.assertRaises(self.uploads.UploadTooLarge):
+            self.receive(FakeRequest(body))
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_read_body_is_limited(self):
+        self.assertEqual(asyncio.run(self.uploads.read_body(FakeRequest(b"abc"), max_bytes=10)), b"abc")
+        with self.assertRaises(self.uploads.UploadTooLarge):
+            asyncio.run(self.uploads.read_body(FakeRequest(b"x" * 100, chunk_size=10), max_bytes=50))
+
+    def test_content_length_check(self):
+        exceeds_limit, overhead = self.uploads.exceeds_limit, self.uploads.MULTIPART_OVERHEAD
+        self.assertFalse(exceeds_limit(None, max_bytes=100))
+        self.assertFalse(exceeds_limit("100", max_bytes=100))
+        self.assertTrue(exceeds_limit(str(100 + overhead + 1), max_bytes=100))
+        self.assertFalse(exceeds_limit("not-a-number", max_bytes=100))
+
+
+if __name__ == '__main__':
+    unittest.main()